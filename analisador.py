@@ -1,5 +1,7 @@
 # analisador.py
-from tokens import Token, TokenType
+import re
+from rastreio import rastro, DEBUG, INFO
+from tokens import Token, TokenType, TokenBuffer, SIMBOLOS
 
 palavras_reservadas = {"int", "real", "char", "return"}
 
@@ -66,7 +68,7 @@ def analisar_linha(linha, num_linha):
             continue
 
         # Símbolos
-        elif c in "();{}=+":
+        elif c in SIMBOLOS:
             tokens.append(Token(TokenType.SIMBOLO, c, num_linha))
             i += 1
             continue
@@ -77,17 +79,101 @@ def analisar_linha(linha, num_linha):
 
     return tokens
 
-def analisar_arquivo(nome_arquivo):
+# --- Analisador léxico baseado em expressão regular ---
+# As classes de caracteres são calculadas uma única vez a partir dos mesmos
+# predicados usados em analisar_linha (isspace, isalpha, ...), restritas ao
+# ASCII. Linhas com caracteres fora do ASCII são delegadas ao analisador
+# clássico, garantindo exatamente a mesma sequência de tokens.
+def _classe(predicado):
+    return "".join(re.escape(chr(c)) for c in range(128) if predicado(chr(c)))
+
+_ESPACO = _classe(str.isspace)
+_LETRA = _classe(lambda c: c.isalpha() or c == '_')
+_ALNUM = _classe(lambda c: c.isalnum() or c == '_')
+_DIGITO = _classe(str.isdigit)
+
+# Os espaços antes de cada token são consumidos pelo próprio padrão; o grupo
+# 'comentario' também casa com o fim da linha e encerra a análise.
+_PADRAO_LEXICO = re.compile(rf"""
+    [{_ESPACO}]*
+    (?:
+      (?P<comentario>//|\Z)
+    | (?P<identificador>[{_LETRA}][{_ALNUM}]*)
+    | (?P<numero>[{_DIGITO}]+(?:\.[{_DIGITO}]*)?)
+    | "(?P<string>[^"]*)"
+    | "(?P<string_aberta>.*)
+    | '(?P<caractere>.)'
+    | (?P<caractere_invalido>'.*)
+    | (?P<simbolo>[{"".join(re.escape(c) for c in SIMBOLOS)}])
+    | (?P<erro>.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_TIPO_PALAVRA = {p: TokenType.PALAVRA_RESERVADA for p in palavras_reservadas}
+
+def analisar_linha_regex(linha, num_linha):
+    if not linha.isascii():
+        return analisar_linha(linha, num_linha)
+
+    tokens = []
+    for m in _PADRAO_LEXICO.finditer(linha):
+        grupo = m.lastgroup
+        if grupo == 'identificador':
+            lexema = m.group(grupo)
+            tokens.append(Token(_TIPO_PALAVRA.get(lexema, TokenType.IDENTIFICADOR), lexema, num_linha))
+        elif grupo == 'simbolo':
+            tokens.append(Token(TokenType.SIMBOLO, m.group(grupo), num_linha))
+        elif grupo == 'numero':
+            num = m.group(grupo)
+            tokens.append(Token(TokenType.REAL if '.' in num else TokenType.NUMERO, num, num_linha))
+        elif grupo == 'string':
+            tokens.append(Token(TokenType.STRING, m.group(grupo), num_linha))
+        elif grupo == 'caractere':
+            tokens.append(Token(TokenType.CARACTERE, m.group(grupo), num_linha))
+        elif grupo == 'string_aberta':
+            tokens.append(Token(TokenType.ERRO, f"String não terminada: {m.group(grupo)}", num_linha))
+        elif grupo == 'caractere_invalido':
+            tokens.append(Token(TokenType.ERRO, m.group(grupo), num_linha))
+            break
+        elif grupo == 'comentario':
+            break
+        else:
+            tokens.append(Token(TokenType.ERRO, m.group(grupo), num_linha))
+    return tokens
+
+# Analisadores disponíveis, selecionáveis pelo nome em analisar_arquivo
+ANALISADORES = {
+    "regex": analisar_linha_regex,
+    "classico": analisar_linha,
+}
+
+def analisar_fluxo(linhas, analisador="regex"):
+    """Gera os tokens de um iterável de linhas (ex: um arquivo aberto) sob demanda."""
+    analisar = ANALISADORES[analisador]
+    for num, linha in enumerate(linhas, start=1):
+        tokens = analisar(linha.strip(), num)
+        if rastro.lexer:
+            _rastrear_linha(tokens, num)
+        yield from tokens
+
+def _rastrear_linha(tokens, num):
+    for token in tokens:
+        if token.tipo is TokenType.ERRO:
+            rastro.emitir("lexer", INFO, "error", f"Léxico: token inválido '{token.valor}' na linha {num}",
+                          linha=num, valor=token.valor)
+    rastro.emitir("lexer", DEBUG, "line", f"Léxico: linha {num}, {len(tokens)} tokens",
+                  linha=num, tokens=[(token.tipo.value, token.valor) for token in tokens])
+
+def analisar_buffer(linhas, analisador="regex"):
+    """Analisa as linhas para um TokenBuffer compacto, sem manter objetos Token."""
+    buffer = TokenBuffer()
+    buffer.extend(analisar_fluxo(linhas, analisador))
+    return buffer
+
+def analisar_arquivo(nome_arquivo, analisador="regex"):
     try:
         with open(nome_arquivo, "r", encoding="utf-8") as f:
-            linhas = f.readlines()
+            return list(analisar_fluxo(f, analisador))
     except FileNotFoundError:
         print(f"Erro: Arquivo '{nome_arquivo}' não encontrado.")
         return None
-
-    todos_tokens = []
-    for num, linha in enumerate(linhas, start=1):
-        tokens = analisar_linha(linha.strip(), num)
-        todos_tokens.extend(tokens)
-
-    return todos_tokens
\ No newline at end of file
@@ -0,0 +1,729 @@
+# benchmark.py
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from analisador import (analisar_linha, analisar_linha_regex, analisar_arquivo,
+                        analisar_fluxo, analisar_buffer)
+from sintatico import Parser, SyntaxError
+from otimizador import Optimizer, PassManager
+from perfil import contar_nos
+from gerador_codigo import CodeGenerator
+from tokens import Token, TokenType
+from corpus import (gerar_corpus, gerar_programa, gerar_programa_variado, gerar_programa_funcoes,
+                    gerar_expressao)
+import nodes
+
+def _escrever_temporario(fonte):
+    fd, caminho = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(fonte)
+    return caminho
+
+def _tokens_por_segundo(analisar, linhas):
+    inicio = time.perf_counter()
+    total = 0
+    for num, linha in enumerate(linhas, start=1):
+        total += len(analisar(linha.strip(), num))
+    return total / (time.perf_counter() - inicio)
+
+def bench_lexer(num_linhas=100_000):
+    """Mede tokens/s dos dois analisadores léxicos (a concordância é testada em tests/test_analisador.py)."""
+    linhas = gerar_corpus(num_linhas)
+    for nome, analisar in (("classico", analisar_linha), ("regex", analisar_linha_regex)):
+        print(f"lexer {nome:>8}: {_tokens_por_segundo(analisar, linhas):,.0f} tokens/s")
+
+def _pico_memoria(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico, duracao
+
+def bench_pipeline_memoria(num_comandos=50_000):
+    """Compara o pico de memória do parse com lista de tokens e com fluxo sob demanda."""
+    caminho = _escrever_temporario(gerar_programa(num_comandos))
+    try:
+        def com_lista():
+            Parser(analisar_arquivo(caminho)).parse_programa()
+
+        def com_fluxo():
+            with open(caminho, "r", encoding="utf-8") as f:
+                Parser(analisar_fluxo(f)).parse_programa()
+
+        for nome, funcao in (("lista", com_lista), ("fluxo", com_fluxo)):
+            pico, duracao = _pico_memoria(funcao)
+            print(f"parse {nome:>5}: pico {pico / 2**20:8.1f} MiB, {duracao:.2f}s")
+    finally:
+        os.remove(caminho)
+
+def bench_memoria_tokens(num_comandos=50_000):
+    """Compara a memória por token de uma lista de Token e de um TokenBuffer."""
+    linhas = gerar_programa(num_comandos).splitlines()
+
+    def lista():
+        lista.resultado = list(analisar_fluxo(linhas))
+
+    def buffer():
+        buffer.resultado = analisar_buffer(linhas)
+
+    for nome, funcao in (("lista", lista), ("buffer", buffer)):
+        tracemalloc.start()
+        funcao()
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        quantidade = len(funcao.resultado)
+        del funcao.resultado
+        print(f"tokens {nome:>6}: {atual / quantidade:6.1f} bytes/token ({quantidade} tokens)")
+
+    inicio = time.perf_counter()
+    Parser(analisar_buffer(linhas)).parse_programa()
+    print(f"parse a partir do buffer: {time.perf_counter() - inicio:.2f}s")
+
+class _NoComDict:
+    """Base das cópias de nós com __dict__ por instância (o layout anterior a __slots__)."""
+
+def _copiar_ast(raiz, com_dict):
+    """
+    Copia a AST com os mesmos campos, em nós com __slots__ (as classes de
+    nodes.py) ou com __dict__. Valores que não são nós são compartilhados,
+    para que a diferença de memória seja só a do layout dos nós.
+    """
+    classes = {}
+
+    def classe(tipo):
+        if tipo not in classes:
+            classes[tipo] = type(tipo.__name__, (_NoComDict,), {}) if com_dict else tipo
+        return classes[tipo]
+
+    def copiar(valor):
+        if isinstance(valor, list):
+            return [copiar(item) for item in valor]
+        if not isinstance(valor, nodes.Node):
+            return valor
+        copia = object.__new__(classe(type(valor)))
+        for tipo in type(valor).__mro__:
+            for campo in getattr(tipo, "__slots__", ()):
+                setattr(copia, campo, copiar(getattr(valor, campo, None)))
+        return copia
+
+    return copiar(raiz)
+
+def _contar_nos_por_dict(raiz):
+    """Percurso no estilo anterior a child_fields: procura filhos em __dict__."""
+    total = 0
+    pilha = [raiz]
+    while pilha:
+        no = pilha.pop()
+        total += 1
+        for valor in no.__dict__.values():
+            if isinstance(valor, list):
+                pilha.extend(item for item in valor if isinstance(item, _NoComDict))
+            elif isinstance(valor, _NoComDict):
+                pilha.append(valor)
+    return total
+
+def bench_ast(num_comandos=200_000):
+    """
+    Mede a memória por nó da AST e a velocidade de percurso do Optimizer
+    (~1M nós), e compara o layout com __slots__ e child_fields com o anterior
+    (__dict__ por nó e filhos procurados em __dict__) em cópias da AST otimizada.
+    """
+    buffer = analisar_buffer(gerar_programa(num_comandos).splitlines())
+    tracemalloc.start()
+    raiz = Parser(buffer).parse_programa()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    quantidade = contar_nos(raiz)
+
+    inicio = time.perf_counter()
+    Optimizer().visit(raiz)
+    duracao = time.perf_counter() - inicio
+    print(f"ast: {quantidade} nós, {atual / quantidade:.1f} bytes/nó, "
+          f"otimizador {quantidade / duracao:,.0f} nós/s")
+
+    for com_dict, contar in ((True, _contar_nos_por_dict), (False, contar_nos)):
+        tracemalloc.start()
+        copia = _copiar_ast(raiz, com_dict)
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        inicio = time.perf_counter()
+        copiados = contar(copia)
+        duracao = time.perf_counter() - inicio
+        print(f"ast com {'__dict__' if com_dict else '__slots__'}: {atual / copiados:6.1f} bytes/nó, "
+              f"percurso {copiados / duracao:,.0f} nós/s")
+        del copia
+
+def _programa_sintetico(num_comandos):
+    """Monta diretamente uma AST com num_comandos atribuições, sem passar pelo parser."""
+    def tok(tipo, valor):
+        return Token(tipo, valor, 1)
+    corpo = [nodes.VarDeclNode(nodes.TypeNode(tok(TokenType.PALAVRA_RESERVADA, "int")),
+                               tok(TokenType.IDENTIFICADOR, "x"),
+                               nodes.NumberNode(tok(TokenType.NUMERO, "0")))]
+    for i in range(num_comandos):
+        expr = nodes.BinaryOpNode(nodes.IdentifierNode(tok(TokenType.IDENTIFICADOR, "x")),
+                                  tok(TokenType.SIMBOLO, "+"),
+                                  nodes.NumberNode(tok(TokenType.NUMERO, str(i))))
+        corpo.append(nodes.AssignNode(tok(TokenType.IDENTIFICADOR, "x"), expr))
+    corpo.append(nodes.ReturnNode(nodes.IdentifierNode(tok(TokenType.IDENTIFICADOR, "x"))))
+    funcao = nodes.FuncDeclNode(nodes.TypeNode(tok(TokenType.PALAVRA_RESERVADA, "int")),
+                                tok(TokenType.IDENTIFICADOR, "main"), corpo)
+    return nodes.ProgramNode([funcao])
+
+def bench_gerador(tamanhos=(10**5, 10**6)):
+    """Mede a geração de código para cada tipo de destino, de 10^5 a 10^6 comandos."""
+    for num_comandos in tamanhos:
+        raiz = _programa_sintetico(num_comandos)
+        destinos = {
+            "lista": lambda: CodeGenerator(sink=[]).visit(raiz),
+            "stringio": lambda: CodeGenerator(sink=io.StringIO()).visit(raiz),
+            "string": lambda: CodeGenerator().visit(raiz),
+        }
+        fd, caminho = tempfile.mkstemp(suffix=".py")
+        os.close(fd)
+
+        def arquivo():
+            with open(caminho, "w", encoding="utf-8", buffering=1 << 16) as f:
+                CodeGenerator(sink=f).visit(raiz)
+        destinos["arquivo"] = arquivo
+        try:
+            for nome, funcao in destinos.items():
+                pico, duracao = _pico_memoria(funcao)
+                print(f"gerador {num_comandos:>8} comandos, {nome:>8}: {duracao:.2f}s "
+                      f"({num_comandos / duracao:,.0f} comandos/s), pico {pico / 2**20:.1f} MiB")
+        finally:
+            os.remove(caminho)
+
+def bench_servidor(num_pedidos=20):
+    """Compara a latência por pedido do servidor de compilação com um processo novo."""
+    from cliente import CompileClient
+    from concurrent.futures import ThreadPoolExecutor
+
+    caminho_socket = os.path.join(tempfile.mkdtemp(), "compilador.sock")
+    servidor = subprocess.Popen([sys.executable, "servidor.py", "--socket", caminho_socket, "-j", "4"],
+                                stdout=subprocess.DEVNULL)
+    fonte = gerar_programa(50)
+    caminho = _escrever_temporario(fonte)
+    try:
+        while not os.path.exists(caminho_socket):
+            time.sleep(0.05)
+        with CompileClient(caminho_socket) as cliente:
+            cliente.compile(fonte)  # aquece os workers
+
+            def medir(funcao):
+                inicio = time.perf_counter()
+                for _ in range(num_pedidos):
+                    funcao()
+                return (time.perf_counter() - inicio) / num_pedidos * 1000
+
+            frio = [sys.executable, "-c",
+                    "import io, sys; from sintatico import compilar_fonte; "
+                    "compilar_fonte(open(sys.argv[1]), io.StringIO())", caminho]
+            print(f"servidor: processo novo          {medir(lambda: subprocess.run(frio, stdout=subprocess.DEVNULL)):7.2f} ms/pedido")
+            cliente_cli = [sys.executable, "cliente.py", caminho, "-o", os.devnull, "--socket", caminho_socket]
+            print(f"servidor: cliente.py             {medir(lambda: subprocess.run(cliente_cli)):7.2f} ms/pedido")
+            print(f"servidor: conexão persistente    {medir(lambda: cliente.compile(fonte)):7.2f} ms/pedido")
+
+        def pedido_concorrente(_):
+            with CompileClient(caminho_socket) as c:
+                return c.compile(fonte)["ok"]
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(8) as pool:
+            assert all(pool.map(pedido_concorrente, range(num_pedidos * 4)))
+        duracao = (time.perf_counter() - inicio) / (num_pedidos * 4) * 1000
+        print(f"servidor: 8 clientes simultâneos {duracao:7.2f} ms/pedido (vazão)")
+    finally:
+        servidor.terminate()
+        servidor.wait()
+        os.remove(caminho)
+
+def bench_execucao(num_execucoes=20):
+    """Compara executar o programa gerado via subprocess e em processo (code object em cache)."""
+    from executor import CodeObjectCache, executar_arquivo
+    from sintatico import compilar_fonte
+
+    fd, caminho = tempfile.mkstemp(suffix=".py")
+    diretorio_pyc = tempfile.mkdtemp()
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        compilar_fonte(gerar_programa(2000).splitlines(), f)
+    try:
+        def medir(funcao):
+            inicio = time.perf_counter()
+            for _ in range(num_execucoes):
+                funcao()
+            return (time.perf_counter() - inicio) / num_execucoes * 1000
+
+        subprocesso = lambda: subprocess.run([sys.executable, caminho], stdout=subprocess.DEVNULL)
+        print(f"execução: subprocess              {medir(subprocesso):7.2f} ms")
+        print(f"execução: em processo, sem cache  {medir(lambda: executar_arquivo(caminho, CodeObjectCache())):7.2f} ms")
+        print(f"execução: em processo, .pyc       {medir(lambda: executar_arquivo(caminho, CodeObjectCache(diretorio_pyc))):7.2f} ms")
+        em_memoria = CodeObjectCache()
+        print(f"execução: em processo, memória    {medir(lambda: executar_arquivo(caminho, em_memoria)):7.2f} ms")
+    finally:
+        os.remove(caminho)
+
+def bench_backends(num_comandos=100_000):
+    """
+    Compara gerar texto + compile() com traduzir direto para o ast do Python
+    (a equivalência dos dois é testada em tests/test_gerador_ast.py).
+    """
+    from gerador_ast import AstCodeGenerator
+    from sintatico import analisar_fonte
+
+    raiz = analisar_fonte(gerar_programa(num_comandos).splitlines())
+
+    inicio = time.perf_counter()
+    codigo_texto = compile(CodeGenerator().visit(raiz), "output.py", "exec")
+    tempo_texto = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    codigo_ast = AstCodeGenerator().compilar(raiz, "programa.txt")
+    tempo_ast = time.perf_counter() - inicio
+
+    print(f"backend texto: {tempo_texto:.2f}s | backend ast: {tempo_ast:.2f}s ({num_comandos} comandos)")
+
+def bench_propagacao(num_comandos=5000, repeticoes=50):
+    """Compara o código gerado com e sem a propagação de constantes e cópias."""
+    from executor import executar_codigo
+    from semantico import SemanticAnalyzer
+
+    linhas = gerar_programa(num_comandos).splitlines()
+    for propagar in (False, True):
+        raiz = Parser(analisar_fluxo(linhas)).parse_programa()
+        SemanticAnalyzer().visit(raiz)
+        raiz = Optimizer(propagar=propagar).visit(raiz)
+        codigo = CodeGenerator().visit(raiz)
+        code = compile(codigo, "output.py", "exec")
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            executar_codigo(code)
+        duracao = (time.perf_counter() - inicio) / repeticoes * 1000
+        print(f"propagação {'ligada' if propagar else 'desligada':>9}: {codigo.count(chr(10))} linhas, "
+              f"{codigo.count(' + ')} somas, execução {duracao:.2f} ms")
+
+def bench_niveis(num_comandos=50_000):
+    """Tempo de otimização e estatísticas dos passes em cada nível -O."""
+    from semantico import SemanticAnalyzer
+
+    linhas = gerar_programa(num_comandos).splitlines()
+    for nivel in (0, 1, 2):
+        raiz = Parser(analisar_fluxo(linhas)).parse_programa()
+        SemanticAnalyzer().visit(raiz)
+        pass_manager = PassManager.para_nivel(nivel)
+        inicio = time.perf_counter()
+        raiz = pass_manager.run(raiz)
+        duracao = time.perf_counter() - inicio
+        codigo = CodeGenerator().visit(raiz)
+        print(f"-O{nivel}: otimização {duracao * 1000:.1f} ms, {codigo.count(chr(10))} linhas geradas")
+        if nivel:
+            print(pass_manager.relatorio())
+
+def bench_recuperacao(num_comandos=20_000, num_erros=20):
+    """
+    Tempo para encontrar todos os erros de sintaxe de um programa: uma única
+    análise com recuperação contra o ciclo 'compila, corrige o primeiro erro,
+    recompila' (simulado removendo a linha de cada erro encontrado).
+    """
+    rng = random.Random(0)
+    linhas = gerar_programa(num_comandos).splitlines()
+    for num in rng.sample(range(2, len(linhas) - 2), num_erros):
+        linhas[num] = linhas[num].replace(";", " @;", 1)
+
+    inicio = time.perf_counter()
+    parser = Parser(analisar_fluxo(linhas), recuperar=True)
+    parser.parse_programa()
+    uma_vez = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    restantes, compilacoes = list(linhas), 0
+    while True:
+        compilacoes += 1
+        try:
+            Parser(analisar_fluxo(restantes)).parse_programa()
+            break
+        except SyntaxError as erro:
+            del restantes[erro.linha - 1]
+    ciclo = time.perf_counter() - inicio
+    print(f"recuperação: {len(parser.erros)} erros numa análise em {uma_vez * 1000:.1f} ms; "
+          f"sem recuperação, {compilacoes} compilações em {ciclo * 1000:.1f} ms")
+
+def bench_profundidade(tamanhos=(10**3, 10**4, 10**5)):
+    """
+    Compila expressões com milhares de termos (uma cadeia de '+' com a
+    profundidade igual ao número de termos) com um limite de recursão baixo:
+    todos os percursos devem usar pilha explícita e tempo linear (o
+    resultado é conferido em tests/test_sintatico.py).
+    """
+    from sintatico import compilar_fonte
+
+    limite = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        for termos in tamanhos:
+            expressao = " + ".join("x" if i % 2 else str(i % 10) for i in range(termos))
+            linhas = ["int main() {", "    int x = 1;", f"    int y = {expressao};", "    return y;", "}"]
+            chunks = []
+            inicio = time.perf_counter()
+            compilar_fonte(linhas, chunks, nivel=0)
+            compile("".join(chunks), "output.py", "exec")
+            duracao = time.perf_counter() - inicio
+            print(f"profundidade {termos:>7}: {duracao * 1000:8.1f} ms, {duracao / termos * 1e6:.2f} us/termo")
+    finally:
+        sys.setrecursionlimit(limite)
+
+def bench_expressoes(num_expressoes=2000, termos=200):
+    """Vazão do parser de Pratt em expressões longas com todos os operadores."""
+    linhas = ["int main() {", "    int x = 1;", "    real y = 2.5;"]
+    linhas += [f"    x = {gerar_expressao(termos, i)};" for i in range(num_expressoes)]
+    linhas += ["    return x;", "}"]
+    buffer = analisar_buffer(linhas)
+    inicio = time.perf_counter()
+    raiz = Parser(buffer).parse_programa()
+    duracao = time.perf_counter() - inicio
+    print(f"expressões: {len(buffer) / duracao:,.0f} tokens/s, {contar_nos(raiz) / duracao:,.0f} nós/s "
+          f"({num_expressoes} expressões de {termos} termos)")
+
+def bench_reassociacao(num_comandos=2000, termos=20, repeticoes=20):
+    """Somas executadas pelo código gerado com e sem a reassociação das cadeias de '+'."""
+    from executor import executar_codigo
+    from semantico import SemanticAnalyzer
+
+    # 'x' muda a cada comando, então só a reassociação junta as constantes
+    soma = " + ".join(f"x + {i}" if i % 4 == 0 else str(i) for i in range(termos))
+    linhas = ["int main() {", "    int x = 1;"]
+    linhas += [f"    x = {soma} - x * {termos // 4};" for _ in range(num_comandos)]
+    linhas += ["    printf(x);", "    return 0;", "}"]
+    for nomes in (("constant-folding",), ("constant-folding", "reassociation")):
+        raiz = Parser(analisar_fluxo(linhas)).parse_programa()
+        SemanticAnalyzer().visit(raiz)
+        pass_manager = PassManager(nomes, fixpoint=True)
+        raiz = pass_manager.run(raiz)
+        codigo = CodeGenerator().visit(raiz)
+        code = compile(codigo, "output.py", "exec")
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            saida = executar_codigo(code)
+        duracao = (time.perf_counter() - inicio) / repeticoes * 1000
+        otimizacao = sum(s.tempo for s in pass_manager.stats.values()) * 1000
+        print(f"reassociação {'ligada' if len(nomes) > 1 else 'desligada':>9}: {codigo.count(' + ')} somas, "
+              f"otimização {otimizacao:.1f} ms, execução {duracao:.2f} ms, saída {saida[1].strip()}")
+
+def bench_rastreio(num_comandos=50_000, repeticoes=3):
+    """Velocidade da análise semântica com o rastreamento desligado e ligado."""
+    from rastreio import DEBUG, INFO, JsonLinesSink, TextSink, rastreando
+    from semantico import SemanticAnalyzer
+
+    raiz = Parser(analisar_fluxo(gerar_programa_variado(num_comandos).splitlines())).parse_programa()
+    nos = contar_nos(raiz)
+    with open(os.devnull, "w") as nulo:
+        configuracoes = (("desligado", None, None),
+                         ("symtab info, texto", {"symtab": INFO}, [TextSink(nulo)]),
+                         ("symtab debug, texto", {"symtab": DEBUG}, [TextSink(nulo)]),
+                         ("symtab debug, JSON", {"symtab": DEBUG}, [JsonLinesSink(nulo)]))
+        for nome, niveis, destinos in configuracoes:
+            melhor = float("inf")
+            for _ in range(repeticoes):
+                with rastreando(niveis, destinos) if niveis else contextlib.nullcontext():
+                    inicio = time.perf_counter()
+                    SemanticAnalyzer().visit(raiz)
+                    melhor = min(melhor, time.perf_counter() - inicio)
+            print(f"rastreio {nome:<20}: semântico {melhor * 1000:8.1f} ms ({nos / melhor:,.0f} nós/s)")
+
+def bench_observador(num_comandos=5000, num_funcoes=10, edicoes=5):
+    """Latência do modo de observação ao editar uma linha, contra a recompilação completa."""
+    from observador import IncrementalCompiler
+
+    linhas = gerar_programa_funcoes(num_funcoes, num_comandos // num_funcoes).splitlines()
+    compilador = IncrementalCompiler()
+    inicio = time.perf_counter()
+    compilador.atualizar(linhas)
+    completa = time.perf_counter() - inicio
+    tempos = []
+    # As edições vão no começo do corpo da função do meio
+    meio = linhas.index(f"int f{num_funcoes // 2}() {{") + 1
+    for i in range(edicoes):
+        linhas = linhas[:meio] + [f"    int editado{i} = {i} + 1;"] + linhas[meio:]
+        compilador.atualizar(linhas)
+        tempos.append(compilador.estatisticas["tempo"])
+    est = compilador.estatisticas
+    print(f"observador: compilação completa {completa * 1000:.1f} ms, edição de uma linha "
+          f"{min(tempos) * 1000:.1f} ms ({est['linhas_relexadas']} linhas relidas, "
+          f"{est['funcoes_recompiladas']} funções recompiladas, {len(linhas)} linhas)")
+
+def bench_serializacao(num_comandos=20000, repeticoes=3):
+    """
+    Formato binário (serializacao) contra o pickle: tamanho e tempos de
+    gravação/leitura dos tokens e das ASTs antes e depois da otimização (as
+    idas e voltas são testadas em tests/test_serializacao.py).
+    """
+    import pickle
+    from sintatico import analisar_fonte
+    from serializacao import (serializar_tokens, desserializar_tokens, serializar_ast,
+                              desserializar_ast)
+
+    linhas = gerar_programa_variado(num_comandos).splitlines()
+    buffer = analisar_buffer(linhas)
+    raiz = Parser(buffer).parse_programa()
+    otimizada = analisar_fonte(linhas)
+
+    def medir(gravar, ler, objeto):
+        melhor_gravar = melhor_ler = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            dados = gravar(objeto)
+            meio = time.perf_counter()
+            ler(dados)
+            melhor_gravar = min(melhor_gravar, meio - inicio)
+            melhor_ler = min(melhor_ler, time.perf_counter() - meio)
+        return len(dados), melhor_gravar, melhor_ler
+
+    def com_pickle(objeto):
+        return pickle.dumps(objeto, protocol=pickle.HIGHEST_PROTOCOL)
+
+    casos = [("tokens", serializar_tokens, desserializar_tokens, buffer, list(buffer)),
+             ("AST", serializar_ast, desserializar_ast, raiz, raiz),
+             ("AST otimizada", serializar_ast, desserializar_ast, otimizada, otimizada)]
+    for nome, gravar, ler, objeto, objeto_pickle in casos:
+        tamanho, t_gravar, t_ler = medir(gravar, ler, objeto)
+        tamanho_p, t_gravar_p, t_ler_p = medir(com_pickle, pickle.loads, objeto_pickle)
+        print(f"serialização {nome:<14}: binário {tamanho:>9,} bytes, {t_gravar * 1000:7.1f} / "
+              f"{t_ler * 1000:7.1f} ms | pickle {tamanho_p:>9,} bytes, {t_gravar_p * 1000:7.1f} / "
+              f"{t_ler_p * 1000:7.1f} ms (gravação / leitura)")
+
+def bench_paralelo(num_funcoes=16, comandos_por_funcao=2000, jobs=(1, 2, 4, 8)):
+    """
+    Compilação de um programa com muitas funções, com a otimização e a
+    geração por função em 1..N processos (a saída, que não depende do número
+    de processos, é conferida em tests/test_paralelo.py).
+    """
+    from sintatico import compilar_fonte
+
+    linhas = gerar_programa_funcoes(num_funcoes, comandos_por_funcao).splitlines()
+    for n in jobs:
+        inicio = time.perf_counter()
+        compilar_fonte(linhas, io.StringIO(), jobs=n)
+        duracao = time.perf_counter() - inicio
+        print(f"paralelo: {num_funcoes} funções x {comandos_por_funcao} comandos, {n} processo(s): "
+              f"{duracao * 1000:8.1f} ms ({os.cpu_count()} núcleos)")
+
+def bench_interpretador(num_comandos=5000, repeticoes=10):
+    """
+    Execução pelas closures (interpretador.py) contra o caminho de texto:
+    gerar o código, gravar o .py e executá-lo num novo interpretador. Mede a
+    partida (da AST otimizada até o fim do programa) e a execução repetida
+    de main() já compilada, contra o code object do código gerado (a saída
+    igual nos dois caminhos é testada em tests/test_interpretador.py).
+    """
+    from executor import executar_codigo
+    from gerador_codigo import RODAPE_PROGRAMA
+    from interpretador import ClosureCompiler, executar_programa
+    from sintatico import analisar_fonte
+
+    raiz = analisar_fonte(gerar_programa_variado(num_comandos).splitlines())
+    fd, caminho = tempfile.mkstemp(suffix=".py")
+    os.close(fd)
+    try:
+        def via_subprocesso():
+            with open(caminho, "w", encoding="utf-8") as f:
+                CodeGenerator(sink=f).visit(raiz)
+                f.write(RODAPE_PROGRAMA)
+            return subprocess.run([sys.executable, caminho], stdout=subprocess.PIPE, text=True, check=True).stdout
+
+        def via_closures():
+            return executar_programa(raiz)[1]
+
+        def medir(funcao):
+            melhor = float("inf")
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                funcao()
+                melhor = min(melhor, time.perf_counter() - inicio)
+            return melhor * 1000
+
+        print(f"interpretador: partida + execução | subprocess {medir(via_subprocesso):8.2f} ms | "
+              f"closures {medir(via_closures):8.2f} ms ({num_comandos} comandos)")
+
+        code = compile(CodeGenerator().visit(raiz), caminho, "exec")
+        main = ClosureCompiler(io.StringIO()).compilar(raiz)["main"]
+        print(f"interpretador: só a execução      | code object {medir(lambda: executar_codigo(code)):7.2f} ms | "
+              f"closures {medir(main):8.2f} ms")
+    finally:
+        os.remove(caminho)
+
+# --- Benchmark por fase (resultados em JSON, comparação com uma base) ---
+FASES = ("lexico", "sintatico", "semantico", "otimizacao", "geracao")
+TAMANHOS_PADRAO = (10**2, 10**3, 10**4, 10**5, 10**6)
+
+def _medir_fases(linhas, nivel, medir):
+    """
+    Executa o pipeline sobre 'linhas', uma fase por vez; medir(fase, funcao)
+    chama a função e retorna seu resultado. Retorna (tokens, nós da AST).
+    """
+    from semantico import SemanticAnalyzer
+
+    buffer = medir("lexico", lambda: analisar_buffer(linhas))
+    raiz = medir("sintatico", lambda: Parser(buffer).parse_programa())
+    nos = contar_nos(raiz)
+    medir("semantico", lambda: SemanticAnalyzer().visit(raiz))
+    raiz = medir("otimizacao", lambda: PassManager.para_nivel(nivel).run(raiz))
+    medir("geracao", lambda: CodeGenerator().visit(raiz))
+    return len(buffer), nos
+
+def bench_fases(num_comandos, semente=0, nivel=2, repeticoes=3, memoria=True):
+    """
+    Mede cada fase do compilador num programa de num_comandos comandos: o
+    menor tempo entre as repetições, a vazão em comandos/s e, com
+    memoria=True, o pico de memória alocada (tracemalloc, numa execução à parte
+    para não distorcer os tempos).
+    """
+    linhas = gerar_programa_variado(num_comandos, semente).splitlines()
+    tempos = {fase: float("inf") for fase in FASES}
+    picos = {}
+
+    def cronometrar(fase, funcao):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos[fase] = min(tempos[fase], time.perf_counter() - inicio)
+        return resultado
+
+    def medir_pico(fase, funcao):
+        tracemalloc.reset_peak()
+        resultado = funcao()
+        picos[fase] = tracemalloc.get_traced_memory()[1]
+        return resultado
+
+    for _ in range(repeticoes):
+        tokens, nos = _medir_fases(linhas, nivel, cronometrar)
+    if memoria:
+        tracemalloc.start()
+        try:
+            _medir_fases(linhas, nivel, medir_pico)
+        finally:
+            tracemalloc.stop()
+
+    fases = {}
+    for fase in FASES:
+        fases[fase] = {"tempo_s": tempos[fase], "comandos_por_s": num_comandos / tempos[fase]}
+        if memoria:
+            fases[fase]["pico_memoria_bytes"] = picos[fase]
+    return {"comandos": num_comandos, "linhas": len(linhas), "tokens": tokens, "nos": nos,
+            "total_s": sum(tempos.values()), "fases": fases}
+
+def executar_suite(tamanhos=TAMANHOS_PADRAO, semente=0, nivel=2, repeticoes=3, memoria_ate=10**5):
+    """
+    Roda bench_fases em cada tamanho e retorna o relatório (serializável em
+    JSON). A partir de 10^5 comandos cada tamanho é medido uma única vez, e o
+    pico de memória só é medido até 'memoria_ate' comandos: o tracemalloc
+    deixa a execução várias vezes mais lenta.
+    """
+    import datetime
+    import platform
+
+    relatorio = {"versao": 1, "data": datetime.datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "plataforma": platform.platform(),
+                 "semente": semente, "nivel": nivel, "repeticoes": repeticoes, "resultados": {}}
+    for tamanho in tamanhos:
+        resultado = bench_fases(tamanho, semente, nivel, max(1, min(repeticoes, 10**5 // tamanho)),
+                                tamanho <= memoria_ate)
+        relatorio["resultados"][str(tamanho)] = resultado
+        print(f"{tamanho:>9} comandos: " + "  ".join(
+            f"{fase} {resultado['fases'][fase]['tempo_s'] * 1000:.1f} ms" for fase in FASES))
+    return relatorio
+
+def comparar_resultados(atual, base, tolerancia=0.15, minimo_s=0.002):
+    """
+    Compara dois relatórios de executar_suite e retorna a lista de regressões:
+    fases cujo tempo (ou pico de memória) cresceu mais que 'tolerancia' em
+    relação à base. Diferenças de tempo abaixo de 'minimo_s' são ignoradas,
+    pois nos tamanhos pequenos elas são só ruído.
+    """
+    regressoes = []
+    for tamanho, resultado in atual["resultados"].items():
+        anterior = base["resultados"].get(tamanho)
+        if anterior is None:
+            continue
+        for fase, medidas in resultado["fases"].items():
+            antes = anterior["fases"].get(fase)
+            if antes is None:
+                continue
+            for metrica, folga in (("tempo_s", minimo_s), ("pico_memoria_bytes", 0)):
+                if metrica not in medidas or metrica not in antes:
+                    continue
+                razao = medidas[metrica] / antes[metrica] if antes[metrica] else 1.0
+                marca = "  "
+                if razao > 1 + tolerancia and medidas[metrica] - antes[metrica] > folga:
+                    regressoes.append((int(tamanho), fase, metrica, antes[metrica], medidas[metrica]))
+                    marca = "!!"
+                print(f"{marca} {tamanho:>9} {fase:<11} {metrica:<19} {antes[metrica]:>14.6g} -> "
+                      f"{medidas[metrica]:<14.6g} ({(razao - 1) * 100:+.1f}%)")
+    return regressoes
+
+def main_suite(argv):
+    import argparse
+    import json
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark das fases do compilador em programas sintéticos.")
+    arg_parser.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS_PADRAO),
+                            help="números de comandos dos programas gerados (padrão: 10^2 a 10^6)")
+    arg_parser.add_argument("--semente", type=int, default=0, help="semente do gerador de programas")
+    arg_parser.add_argument("-O", type=int, choices=(0, 1, 2), default=2, help="nível de otimização")
+    arg_parser.add_argument("--repeticoes", type=int, default=3, help="repetições por tamanho (vale o menor tempo)")
+    arg_parser.add_argument("--memoria-ate", type=int, default=10**5,
+                            help="mede o pico de memória só até esse número de comandos (padrão: 10^5)")
+    arg_parser.add_argument("-o", "--saida", default="benchmark_resultados.json",
+                            help="arquivo JSON com os resultados (padrão: benchmark_resultados.json)")
+    arg_parser.add_argument("--comparar", metavar="BASE",
+                            help="JSON de uma execução anterior; sai com código 1 se houver regressão")
+    arg_parser.add_argument("--tolerancia", type=float, default=0.15,
+                            help="aumento relativo tolerado antes de acusar regressão (padrão: 0.15)")
+    args = arg_parser.parse_args(argv)
+
+    relatorio = executar_suite(args.tamanhos, args.semente, args.O, args.repeticoes, args.memoria_ate)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if (base.get("semente"), base.get("nivel")) != (relatorio["semente"], relatorio["nivel"]):
+            print("Aviso: a base foi gerada com outra semente ou outro nível de otimização.")
+        print(f"\n--- Comparação com {args.comparar} (tolerância {args.tolerancia:.0%}) ---")
+        regressoes = comparar_resultados(relatorio, base, args.tolerancia)
+        print(f"{len(regressoes)} regressão(ões) encontrada(s).")
+        return 1 if regressoes else 0
+    return 0
+
+if __name__ == "__main__":
+    # 'python3 benchmark.py suite ...' roda o benchmark por fase; sem
+    # argumentos, roda os micro-benchmarks abaixo.
+    if sys.argv[1:2] == ["suite"]:
+        sys.exit(main_suite(sys.argv[2:]))
+    bench_lexer()
+    bench_pipeline_memoria()
+    bench_memoria_tokens()
+    bench_ast()
+    bench_gerador()
+    bench_servidor()
+    bench_execucao()
+    bench_backends()
+    bench_propagacao()
+    bench_niveis()
+    bench_recuperacao()
+    bench_profundidade()
+    bench_expressoes()
+    bench_reassociacao()
+    bench_rastreio()
+    bench_observador()
+    bench_serializacao()
+    bench_paralelo()
+    bench_interpretador()
@@ -0,0 +1,202 @@
+# cache.py
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+# Módulos cujo código-fonte compõe a "versão" do compilador: qualquer mudança
+# neles invalida automaticamente as entradas antigas do cache.
+MODULOS_COMPILADOR = ("tokens.py", "analisador.py", "nodes.py", "sintatico.py", "visitor.py",
+                      "semantico.py", "otimizador.py", "gerador_codigo.py", "serializacao.py",
+                      "paralelo.py")
+
+# Subdiretório do cache onde ficam os code objects ('<hash>.pyc') de
+# executor.CodeObjectCache; eles contam para o limite de tamanho do cache.
+SUBDIRETORIO_PYC = "pyc"
+
+# Ao despejar, o cache é reduzido a essa fração do limite, para que as
+# próximas gravações não disparem outra varredura logo em seguida.
+FRACAO_APOS_DESPEJO = 0.9
+
+_versao = None
+
+def versao_compilador():
+    """Hash do código-fonte dos módulos do compilador (calculado uma vez)."""
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256()
+        base = os.path.dirname(os.path.abspath(__file__))
+        for nome in MODULOS_COMPILADOR:
+            with open(os.path.join(base, nome), "rb") as f:
+                h.update(nome.encode())
+                h.update(f.read())
+        _versao = h.hexdigest()
+    return _versao
+
+def hash_arquivo(nome_arquivo, tamanho_bloco=1 << 20):
+    """Hash SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(nome_arquivo, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+class CompilationCache:
+    """
+    Cache em disco endereçado por conteúdo. A chave combina o hash do
+    código-fonte, a versão do compilador e as opções de compilação; cada
+    entrada guarda o código Python gerado ('<chave>.py') e, opcionalmente,
+    artefatos intermediários ('<chave>.pkl', ex: a AST otimizada, já
+    serializada por serializacao.serializar_ast).
+
+    O tamanho total, incluindo os .pyc de SUBDIRETORIO_PYC, é limitado a
+    'limite_bytes'. O total é medido uma vez e depois somado a cada gravação;
+    só quando a soma passa do limite o diretório é varrido de novo (o que
+    também conta o que outros processos gravaram) e as entradas usadas há
+    mais tempo (pela data de modificação, renovada a cada acerto) são
+    removidas até sobrar FRACAO_APOS_DESPEJO do limite.
+    """
+    def __init__(self, diretorio=".compilador_cache", limite_bytes=64 * 2**20):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.diretorio_pyc = os.path.join(diretorio, SUBDIRETORIO_PYC)
+        self._total = None  # tamanho estimado em bytes (None: ainda não medido)
+        os.makedirs(diretorio, exist_ok=True)
+
+    def chave(self, hash_fonte, opcoes=None):
+        h = hashlib.sha256()
+        h.update(versao_compilador().encode())
+        h.update(json.dumps(opcoes or {}, sort_keys=True).encode())
+        h.update(hash_fonte.encode())
+        return h.hexdigest()
+
+    def _caminho(self, chave, extensao):
+        return os.path.join(self.diretorio, chave + extensao)
+
+    def get(self, chave):
+        """Retorna o código gerado guardado para a chave, ou None."""
+        caminho = self._caminho(chave, ".py")
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                codigo = f.read()
+        except FileNotFoundError:
+            return None
+        self._tocar(chave)
+        return codigo
+
+    def restaurar(self, chave, destino):
+        """Copia o código guardado para o arquivo 'destino'; retorna se houve acerto."""
+        try:
+            shutil.copyfile(self._caminho(chave, ".py"), destino)
+        except FileNotFoundError:
+            return False
+        self._tocar(chave)
+        return True
+
+    def get_artefatos(self, chave):
+        """Retorna o dicionário de artefatos guardado para a chave, ou None."""
+        try:
+            with open(self._caminho(chave, ".pkl"), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, chave, codigo, artefatos=None):
+        crescimento = self._escrever(self._caminho(chave, ".py"), codigo.encode("utf-8"))
+        self._finalizar_put(chave, artefatos, crescimento)
+
+    def put_arquivo(self, chave, caminho, artefatos=None):
+        """Como put, mas copiando o código de um arquivo já gerado."""
+        with open(caminho, "rb") as f:
+            crescimento = self._escrever(self._caminho(chave, ".py"), f)
+        self._finalizar_put(chave, artefatos, crescimento)
+
+    def _finalizar_put(self, chave, artefatos, crescimento):
+        if artefatos is not None:
+            crescimento += self._escrever(self._caminho(chave, ".pkl"),
+                                          pickle.dumps(artefatos, protocol=pickle.HIGHEST_PROTOCOL))
+        if self._total is not None:
+            self._total += crescimento
+        if self._total is None or self._total > self.limite_bytes:
+            self._despejar()
+
+    def _escrever(self, caminho, dados):
+        """
+        Escreve num arquivo temporário e renomeia, para que leitores
+        concorrentes nunca vejam uma entrada pela metade. 'dados' pode ser
+        bytes ou um arquivo binário aberto. Retorna quantos bytes o cache
+        cresceu (descontando a versão anterior do arquivo, se havia).
+        """
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(dados, bytes):
+                f.write(dados)
+            else:
+                shutil.copyfileobj(dados, f)
+            tamanho = f.tell()
+        try:
+            tamanho -= os.stat(caminho).st_size
+        except FileNotFoundError:
+            pass
+        os.replace(temporario, caminho)
+        return tamanho
+
+    def _tocar(self, chave):
+        for extensao in (".py", ".pkl"):
+            try:
+                os.utime(self._caminho(chave, extensao))
+            except FileNotFoundError:
+                pass
+
+    def _entradas(self):
+        """
+        Varre o cache e retorna {entrada: [tamanho, último uso, arquivos]}: os
+        arquivos de uma chave ('.py' e '.pkl') formam uma entrada, e cada .pyc
+        de SUBDIRETORIO_PYC, outra.
+        """
+        entradas = {}
+        for diretorio, extensoes in ((self.diretorio, (".py", ".pkl")), (self.diretorio_pyc, (".pyc",))):
+            try:
+                arquivos = list(os.scandir(diretorio))
+            except FileNotFoundError:
+                continue  # Sem SUBDIRETORIO_PYC: nada foi executado em processo ainda
+            for arquivo in arquivos:
+                if not arquivo.name.endswith(extensoes):
+                    continue
+                try:
+                    info = arquivo.stat()
+                except FileNotFoundError:
+                    continue  # Removido por outro processo (ex: workers do lote) depois do scandir
+                nome = os.path.join(diretorio, arquivo.name.rsplit(".", 1)[0])
+                entrada = entradas.setdefault(nome, [0, 0, []])
+                entrada[0] += info.st_size
+                entrada[1] = max(entrada[1], info.st_mtime)
+                entrada[2].append(arquivo.path)
+        return entradas
+
+    def _despejar(self):
+        """Mede o cache e, se passou do limite, remove as entradas menos usadas."""
+        entradas = self._entradas()
+        total = sum(tamanho for tamanho, _, _ in entradas.values())
+        if total > self.limite_bytes:
+            alvo = self.limite_bytes * FRACAO_APOS_DESPEJO
+            for tamanho, _, arquivos in sorted(entradas.values(), key=lambda entrada: entrada[1]):
+                if total <= alvo:
+                    break
+                for arquivo in arquivos:
+                    try:
+                        os.remove(arquivo)
+                    except FileNotFoundError:
+                        pass
+                total -= tamanho
+        self._total = total
+
+    def limpar(self):
+        for diretorio, extensoes in ((self.diretorio, (".py", ".pkl", ".tmp")), (self.diretorio_pyc, (".pyc", ".tmp"))):
+            if os.path.isdir(diretorio):
+                for entrada in os.scandir(diretorio):
+                    if entrada.name.endswith(extensoes):
+                        os.remove(entrada.path)
+        self._total = 0
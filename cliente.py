@@ -0,0 +1,78 @@
+# cliente.py
+#
+# Cliente do servidor de compilação (servidor.py). Importa apenas a
+# biblioteca padrão mínima, para que a partida seja o mais rápida possível.
+#
+#   python3 cliente.py teste.txt -o output.py
+import argparse
+import json
+import socket
+import sys
+
+SOCKET_PADRAO = "/tmp/compilador.sock"
+
+class CompileClient:
+    """Conexão persistente com o servidor; cada compile() é um pedido."""
+    def __init__(self, caminho_socket=SOCKET_PADRAO):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(caminho_socket)
+        self.arquivo = self.sock.makefile("rwb")
+
+    def compile(self, fonte, fused=False, perfil=False, O=2):
+        pedido = {"fonte": fonte, "fused": fused, "O": O}
+        if perfil:
+            pedido["perfil"] = True
+        return self._pedir(pedido)
+
+    def estatisticas(self):
+        """Perfil agregado de todas as compilações perfiladas pelo servidor (ou None)."""
+        return self._pedir({"estatisticas": True})["perfil"]
+
+    def _pedir(self, pedido):
+        self.arquivo.write(json.dumps(pedido).encode() + b"\n")
+        self.arquivo.flush()
+        linha = self.arquivo.readline()
+        if not linha:
+            raise ConnectionError("O servidor de compilação encerrou a conexão.")
+        return json.loads(linha)
+
+    def close(self):
+        self.arquivo.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compila um arquivo usando o servidor de compilação.")
+    arg_parser.add_argument("arquivo", help="arquivo fonte")
+    arg_parser.add_argument("-o", "--output", default="output.py", help="arquivo de saída (padrão: output.py)")
+    arg_parser.add_argument("--fused", action="store_true",
+                            help="faz a análise semântica e o constant folding numa única passagem")
+    arg_parser.add_argument("-O", type=int, choices=(0, 1, 2), default=2,
+                            help="nível de otimização pedido ao servidor (padrão: 2)")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="pede ao servidor o perfil das fases e o imprime")
+    arg_parser.add_argument("--socket", default=SOCKET_PADRAO,
+                            help=f"caminho do socket Unix (padrão: {SOCKET_PADRAO})")
+    args = arg_parser.parse_args()
+
+    try:
+        with open(args.arquivo, "r", encoding="utf-8") as f:
+            fonte = f.read()
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{args.arquivo}' não encontrado.")
+        sys.exit(1)
+    with CompileClient(args.socket) as cliente:
+        resposta = cliente.compile(fonte, args.fused, args.profile, args.O)
+    if not resposta["ok"]:
+        print(resposta["erro"])
+        sys.exit(1)
+    if args.profile:
+        from perfil import formatar_perfil
+        print(formatar_perfil(resposta["perfil"]))
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(resposta["codigo"])
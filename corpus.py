@@ -0,0 +1,113 @@
+# corpus.py
+#
+# Geradores de código-fonte sintético, usados pelos benchmarks e pelos
+# testes. A mesma semente gera sempre o mesmo código.
+import random
+
+def gerar_corpus(num_linhas, semente=0):
+    """Gera linhas de código-fonte variadas, incluindo construções inválidas."""
+    rng = random.Random(semente)
+    modelos = [
+        lambda: f"int v{rng.randint(0, 999)} = {rng.randint(0, 10**6)} + {rng.randint(0, 99)};",
+        lambda: f"real s{rng.randint(0, 99)} = {rng.randint(0, 999)}.{rng.randint(0, 99)};",
+        lambda: f"char c = '{rng.choice('abcXYZ_')}';",
+        lambda: f'printf("texto {rng.randint(0, 99)}");',
+        lambda: f"x_{rng.randint(0, 9)} = x_{rng.randint(0, 9)} + 1; // comentário",
+        lambda: "return 0;",
+        lambda: f'printf("sem fim {rng.randint(0, 9)};',
+        lambda: "char z = 'ab';",
+        lambda: f"{rng.randint(0, 9)}.{rng.randint(0, 9)}.{rng.randint(0, 9)} @ # $",
+        lambda: "ação = 1;\x0b\x1c",
+        lambda: "'''",
+        lambda: "",
+        lambda: f"id_{'a' * rng.randint(100, 2000)} = {'9' * rng.randint(100, 2000)};",
+    ]
+    return [rng.choice(modelos)() for _ in range(num_linhas)]
+
+def gerar_programa(num_comandos, semente=0):
+    """Gera o código-fonte de um programa válido com num_comandos comandos."""
+    rng = random.Random(semente)
+    linhas = ["int main() {", "    int v0 = 0;"]
+    declaradas = 1
+    for _ in range(num_comandos):
+        escolha = rng.random()
+        if escolha < 0.4:
+            linhas.append(f"    int v{declaradas} = {rng.randint(0, 999)} + v{rng.randrange(declaradas)};")
+            declaradas += 1
+        elif escolha < 0.8:
+            linhas.append(f"    v{rng.randrange(declaradas)} = v{rng.randrange(declaradas)} + {rng.randint(0, 9)};")
+        else:
+            linhas.append(f'    printf("linha {rng.randint(0, 999)}");')
+    linhas += ["    return 0;", "}"]
+    return "\n".join(linhas) + "\n"
+
+def gerar_programa_variado(num_comandos, semente=0, cadeia_max=16):
+    """
+    Gera um programa válido com num_comandos comandos misturando declarações
+    de todos os tipos, cadeias longas de '+' (até cadeia_max termos), muitos
+    literais e chamadas de printf. A mesma semente gera sempre o mesmo programa.
+    """
+    rng = random.Random(semente)
+    linhas = ["int main() {", "    int v0 = 0;"]
+    inteiros = outros = 1
+
+    def cadeia():
+        termos = [f"v{rng.randrange(inteiros)}" if rng.random() < 0.5 else str(rng.randint(0, 999))
+                  for _ in range(rng.randint(1, cadeia_max))]
+        return " + ".join(termos)
+
+    for _ in range(num_comandos):
+        escolha = rng.random()
+        if escolha < 0.30:
+            linhas.append(f"    int v{inteiros} = {cadeia()};")
+            inteiros += 1
+        elif escolha < 0.40:
+            linhas.append(f"    real r{outros} = {rng.randint(0, 999)}.{rng.randint(0, 99)};")
+            outros += 1
+        elif escolha < 0.45:
+            linhas.append(f"    char c{outros} = '{rng.choice('abcXYZ_')}';")
+            outros += 1
+        elif escolha < 0.75:
+            linhas.append(f"    v{rng.randrange(inteiros)} = {cadeia()};")
+        elif escolha < 0.90:
+            linhas.append(f"    printf({cadeia()});")
+        else:
+            linhas.append(f'    printf("linha {rng.randint(0, 999)}");  // comentário')
+    linhas += ["    return v0;", "}"]
+    return "\n".join(linhas) + "\n"
+
+def gerar_programa_funcoes(num_funcoes, comandos_por_funcao, semente=0):
+    """
+    Gera um programa válido com num_funcoes funções como as de
+    gerar_programa_variado (f1, f2, ... e main por último) que se chamam:
+    cada fN chama a seguinte, declarada depois dela, e main chama f1.
+    """
+    nomes = [f"f{i}" for i in range(1, num_funcoes)] + ["main"]
+    partes = []
+    for i, nome in enumerate(nomes):
+        linhas = gerar_programa_variado(comandos_por_funcao, semente + i).splitlines()
+        linhas[0] = f"int {nome}() {{"
+        chamada = "f1" if nome == "main" else (nomes[i + 1] if i + 2 < len(nomes) else None)
+        if chamada is not None and num_funcoes > 1:
+            linhas.insert(-2, f"    {chamada}();")
+        partes.append("\n".join(linhas) + "\n")
+    return "".join(partes)
+
+def gerar_expressao(num_termos, semente=0):
+    """Expressão com num_termos termos misturando + - * /, menos unário e parênteses."""
+    rng = random.Random(semente)
+    partes = []
+    abertos = 0
+    for i in range(num_termos):
+        if i:
+            partes.append(f" {rng.choice('+-*/')} ")
+        if rng.random() < 0.1:
+            partes.append("(")
+            abertos += 1
+        if rng.random() < 0.1:
+            partes.append("-")
+        partes.append(rng.choice(("x", "y", str(rng.randint(1, 999)), f"{rng.randint(0, 99)}.5")))
+        if abertos and rng.random() < 0.1:
+            partes.append(")")
+            abertos -= 1
+    return "".join(partes) + ")" * abertos
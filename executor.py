@@ -0,0 +1,100 @@
+# executor.py
+#
+# Execução em processo do código gerado: em vez de gravar output.py e iniciar
+# um novo interpretador, o código Python é compilado para um code object, que
+# fica em cache (em memória e em disco, num formato no estilo .pyc), e a
+# função main() é chamada diretamente.
+import hashlib
+import io
+import marshal
+import os
+import tempfile
+from importlib.util import MAGIC_NUMBER, source_hash
+
+class CodeObjectCache:
+    """
+    Cache de code objects indexado pelo hash do código Python. Em disco, cada
+    entrada é um '<hash>.pyc' com o cabeçalho de um .pyc baseado em hash
+    (PEP 552): número mágico do interpretador, flags, hash da fonte e o code
+    object serializado com marshal. Entradas de outra versão do Python são
+    ignoradas e recompiladas.
+    """
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio
+        self.memoria = {}
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def obter(self, codigo_python, nome_arquivo="output.py"):
+        """Retorna o code object do código, compilando-o apenas se necessário."""
+        fonte = codigo_python.encode("utf-8")
+        chave = hashlib.sha256(fonte).hexdigest()
+        code = self.memoria.get(chave)
+        if code is None:
+            code = self._ler(chave, fonte)
+            if code is None:
+                code = compile(codigo_python, nome_arquivo, "exec")
+                self._gravar(chave, fonte, code)
+            self.memoria[chave] = code
+        return code
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + ".pyc")
+
+    def _ler(self, chave, fonte):
+        if not self.diretorio:
+            return None
+        try:
+            with open(self._caminho(chave), "rb") as f:
+                dados = f.read()
+        except FileNotFoundError:
+            return None
+        if dados[:4] != MAGIC_NUMBER or dados[8:16] != source_hash(fonte):
+            return None
+        # Renova a data de modificação: o despejo do CompilationCache, que
+        # também conta estes arquivos, remove primeiro os usados há mais tempo
+        try:
+            os.utime(self._caminho(chave))
+        except FileNotFoundError:
+            pass
+        return marshal.loads(dados[16:])
+
+    def _gravar(self, chave, fonte, code):
+        if not self.diretorio:
+            return
+        # flags = 0b11: .pyc baseado em hash, com verificação do hash
+        dados = MAGIC_NUMBER + (0b11).to_bytes(4, "little") + source_hash(fonte) + marshal.dumps(code)
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(dados)
+        os.replace(temporario, self._caminho(chave))
+
+def executar_codigo(code, saida=None):
+    """
+    Executa um code object gerado pelo compilador e chama sua função main().
+    O que o programa imprime vai para 'saida' (um objeto com write()); sem
+    ela, é capturado. Retorna (valor retornado por main, texto capturado).
+    """
+    captura = io.StringIO() if saida is None else saida
+
+    def _print(*args, **kwargs):
+        kwargs.setdefault("file", captura)
+        print(*args, **kwargs)
+
+    # __name__ diferente de '__main__': o rodapé do código gerado não chama
+    # main() por conta própria.
+    namespace = {"__name__": "programa", "print": _print}
+    exec(code, namespace)
+    if "main" not in namespace:
+        raise NameError("name 'main' is not defined")  # Como em interpretador.executar_programa
+    retorno = namespace["main"]()
+    return retorno, (captura.getvalue() if saida is None else None)
+
+_cache_padrao = CodeObjectCache()
+
+def executar_arquivo(caminho, cache=None, saida=None):
+    """Executa em processo um arquivo Python gerado (ex: output.py)."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        codigo_python = f.read()
+    code = (cache or _cache_padrao).obter(codigo_python, caminho)
+    return executar_codigo(code, saida)
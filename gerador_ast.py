@@ -0,0 +1,166 @@
+# gerador_ast.py
+#
+# Backend alternativo ao CodeGenerator: traduz a AST do compilador
+# diretamente para nós do módulo 'ast' do Python e os compila para um code
+# object, sem passar por código-fonte em texto. Os números de linha vêm dos
+# nós da nossa AST, então os tracebacks em tempo de execução apontam para as
+# linhas do arquivo .txt original.
+import ast
+import gc
+
+from gerador_codigo import PROFUNDIDADE_MAXIMA, TEMPORARIO
+from rastreio import rastro, DEBUG, INFO
+from visitor import NodeVisitor
+
+# Contextos e operadores não têm estado: uma instância de cada é compartilhada
+LOAD, STORE = ast.Load(), ast.Store()
+OPERADORES = {'+': ast.Add(), '-': ast.Sub(), '*': ast.Mult(), '/': ast.Div()}
+OPERADORES_PREFIXOS = {'-': ast.USub()}
+
+def valor_literal(texto):
+    # Mesma interpretação que o CodeGenerator obtém ao emitir o literal entre
+    # aspas (incluindo sequências de escape como \n).
+    if '\\' not in texto:
+        return texto
+    try:
+        return ast.literal_eval(f'"{texto}"')
+    except (SyntaxError, ValueError):
+        return texto
+
+def valor_numero(texto):
+    if '.' in texto:
+        return float(texto)
+    try:
+        return int(texto)
+    except ValueError:
+        return ast.literal_eval(texto)  # ex: "1e+20", calculado pelo otimizador
+
+class AstCodeGenerator(NodeVisitor):
+    """Gera um ast.Module equivalente ao código produzido pelo CodeGenerator."""
+    function_name_map = {'printf': 'print'}
+
+    def __init__(self):
+        # Linha do último nó com posição conhecida; usada pelos nós sem linha
+        # (ex: constantes calculadas pelo otimizador), dispensando uma passada
+        # extra de ast.fix_missing_locations.
+        self.linha_atual = 1
+        # Atribuições a temporários que devem preceder o comando atual (ver
+        # PROFUNDIDADE_MAXIMA) e a profundidade de cada expressão montada
+        self.pendentes = []
+        self.temporarios = 0
+        self.profundidade = {}
+
+    def _pos(self, py_node, linha):
+        if linha is None:
+            linha = self.linha_atual
+        else:
+            self.linha_atual = linha
+        py_node.lineno = py_node.end_lineno = linha
+        py_node.col_offset = py_node.end_col_offset = 0
+        return py_node
+
+    def compilar(self, program_node, nome_arquivo="<programa>"):
+        """Traduz e compila o programa; 'nome_arquivo' aparece nos tracebacks."""
+        # A árvore gerada não tem ciclos e vive só até o compile(); sem o
+        # coletor de ciclos rodando a cada poucos milhares de alocações, a
+        # tradução fica várias vezes mais rápida em programas grandes.
+        gc_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            modulo = self.visit(program_node)
+            return compile(modulo, nome_arquivo, "exec")
+        finally:
+            if gc_ativo:
+                gc.enable()
+
+    def visit_list(self, nodes_list):
+        # Listas de comandos: a linha de cada comando vale para as expressões
+        # sem posição dentro dele.
+        resultado = []
+        for node in nodes_list:
+            linha = getattr(node, 'linha', None)
+            if linha is not None:
+                self.linha_atual = linha
+            comando = self.visit(node)
+            if self.pendentes:
+                resultado.extend(self.pendentes)
+                self.pendentes.clear()
+            resultado.append(comando)
+        return resultado
+
+    def visit_ProgramNode(self, node):
+        return ast.Module(body=self.visit_list(node.declarations), type_ignores=[])
+
+    def visit_FuncDeclNode(self, node):
+        if rastro.codegen:
+            rastro.emitir("codegen", INFO, "function", f"Geração: função '{node.name}' ({len(node.body)} comandos)",
+                          nome=node.name, comandos=len(node.body))
+        argumentos = ast.arguments(posonlyargs=[], args=[], vararg=None, kwonlyargs=[],
+                                   kw_defaults=[], kwarg=None, defaults=[])
+        self.temporarios = 0  # Numeração local de cada função, como no CodeGenerator
+        corpo = self.visit_list(node.body) or [self._pos(ast.Pass(), node.linha)]
+        funcao = self._pos(ast.FunctionDef(name=node.name, args=argumentos, body=corpo,
+                                           decorator_list=[], returns=None), node.linha)
+        funcao.end_lineno = max(funcao.lineno, corpo[-1].end_lineno)
+        return funcao
+
+    def _atribuicao(self, nome, valor, linha):
+        alvo = self._pos(ast.Name(id=nome, ctx=STORE), linha)
+        return self._pos(ast.Assign(targets=[alvo], value=valor), linha)
+
+    def visit_VarDeclNode(self, node):
+        valor = self.visit(node.expr_node) if node.expr_node else self._pos(ast.Constant(None), node.linha)
+        return self._atribuicao(node.var_name, valor, node.linha)
+
+    def visit_AssignNode(self, node):
+        return self._atribuicao(node.var_name, self.visit(node.expr_node), node.linha)
+
+    def visit_FuncCallStmtNode(self, node):
+        nome = self.function_name_map.get(node.name, node.name)
+        funcao = self._pos(ast.Name(id=nome, ctx=LOAD), node.linha)
+        # Assim como no CodeGenerator, apenas o primeiro argumento é usado
+        argumentos = [self.visit(node.arg_list[0])] if node.arg_list else []
+        chamada = self._pos(ast.Call(func=funcao, args=argumentos, keywords=[]), node.linha)
+        return self._pos(ast.Expr(value=chamada), node.linha)
+
+    def visit_ReturnNode(self, node):
+        return self._pos(ast.Return(value=self.visit(node.expr_node)), node.linha)
+
+    def visit_BinaryOpNode(self, node):
+        expr = self.visit_postorder(node, self._combinar)
+        self.profundidade.clear()
+        return expr
+
+    visit_UnaryOpNode = visit_BinaryOpNode
+
+    def _combinar(self, node, filhos):
+        # Mesma divisão de expressões profundas que o CodeGenerator faz
+        profundidade = max(self.profundidade.get(id(filho), 0) for filho in filhos) + 1
+        if len(filhos) == 1:
+            expr = ast.UnaryOp(op=OPERADORES_PREFIXOS[node.op], operand=filhos[0])
+        else:
+            expr = ast.BinOp(left=filhos[0], op=OPERADORES[node.op], right=filhos[1])
+        expr = self._pos(expr, node.linha)
+        if profundidade < PROFUNDIDADE_MAXIMA:
+            self.profundidade[id(expr)] = profundidade
+            return expr
+        nome = TEMPORARIO.format(self.temporarios)
+        self.temporarios += 1
+        if rastro.codegen:
+            rastro.emitir("codegen", DEBUG, "temporary",
+                          f"Geração: sub-expressão da linha {node.linha} calculada antes em '{nome}'",
+                          nome=nome, linha=node.linha)
+        self.pendentes.append(self._atribuicao(nome, expr, self.linha_atual))
+        return self._pos(ast.Name(id=nome, ctx=LOAD), None)
+
+    def visit_IdentifierNode(self, node):
+        return self._pos(ast.Name(id=node.value, ctx=LOAD), node.linha)
+
+    def visit_NumberNode(self, node):
+        return self._pos(ast.Constant(valor_numero(node.value)), node.linha)
+
+    def visit_StringNode(self, node):
+        return self._pos(ast.Constant(valor_literal(node.value)), node.linha)
+
+    def visit_CharNode(self, node):
+        return self._pos(ast.Constant(valor_literal(node.value)), node.linha)
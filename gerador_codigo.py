@@ -1,32 +1,64 @@
 # gerador_codigo.py
-import nodes
+from rastreio import rastro, DEBUG, INFO
+from tokens import PRECEDENCIA_BINARIA, PRECEDENCIA_PREFIXA
+from visitor import NodeVisitor
 
-class CodeGenerator:
-    def __init__(self):
+# As precedências da linguagem (tokens.py) coincidem com as do Python para
+# esses operadores; folhas não precisam de parênteses.
+ATOMO = max(list(PRECEDENCIA_BINARIA.values()) + list(PRECEDENCIA_PREFIXA.values())) + 1
+
+# Profundidade máxima de uma expressão emitida. O compilador do Python estoura
+# a recursão (e o tokenizador, o limite de parênteses aninhados) em
+# expressões muito profundas; sub-expressões que chegam a esse limite são
+# calculadas antes, em variáveis temporárias. O '·' é válido em nomes do
+# Python, mas não nos da linguagem fonte, então não há colisão.
+PROFUNDIDADE_MAXIMA = 100
+TEMPORARIO = "_t·{}"
+
+# Chamada à função principal, emitida depois de todas as funções
+RODAPE_PROGRAMA = "\nif __name__ == '__main__':\n    main()\n"
+
+class CodeGenerator(NodeVisitor):
+    """
+    Gera código Python escrevendo fragmentos num destino ('sink'): uma lista
+    de pedaços, ou qualquer objeto com write() (io.StringIO, um arquivo aberto
+    com buffer...). Sem sink, os pedaços são acumulados internamente e
+    visit(ProgramNode) devolve o código completo; com sink, devolve None e o
+    código vai sendo escrito conforme é gerado.
+    """
+    def __init__(self, sink=None):
         self.indent_level = 0
-        self.python_code = ""
+        self.temporarios = 0
+        self.sink = sink
+        self.chunks = [] if sink is None else None
+        # emit(fragmento) escreve um pedaço de código no destino
+        if sink is None:
+            self.emit = self.chunks.append
+        elif isinstance(sink, list):
+            self.emit = sink.append
+        else:
+            self.emit = sink.write
 
     def _indent(self):
         return "    " * self.indent_level
 
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node):
-        raise NotImplementedError(f"Visita não implementada para o nó: {type(node).__name__}")
-
     def visit_list(self, nodes_list):
         for node in nodes_list:
             self.visit(node)
             
     def visit_ProgramNode(self, node):
         self.visit_list(node.declarations)
-        return self.python_code
+        if self.chunks is not None:
+            return "".join(self.chunks)
 
     def visit_FuncDeclNode(self, node):
-        self.python_code += f"def {node.name}():\n"
+        if rastro.codegen:
+            rastro.emitir("codegen", INFO, "function", f"Geração: função '{node.name}' ({len(node.body)} comandos)",
+                          nome=node.name, comandos=len(node.body))
+        self.emit(f"def {node.name}():\n")
+        # Os temporários são locais de cada função: a numeração recomeça, e o
+        # código de uma função não depende das outras
+        self.temporarios = 0
         self.indent_level += 1
         self.visit_list(node.body)
         self.indent_level -= 1
@@ -34,13 +66,13 @@ class CodeGenerator:
     def visit_VarDeclNode(self, node):
         if node.expr_node:
             expr_code = self.visit(node.expr_node)
-            self.python_code += f"{self._indent()}{node.var_name} = {expr_code}\n"
+            self.emit(f"{self._indent()}{node.var_name} = {expr_code}\n")
         else:
-            self.python_code += f"{self._indent()}{node.var_name} = None\n"
+            self.emit(f"{self._indent()}{node.var_name} = None\n")
             
     def visit_AssignNode(self, node):
         expr_code = self.visit(node.expr_node)
-        self.python_code += f"{self._indent()}{node.var_name} = {expr_code}\n"
+        self.emit(f"{self._indent()}{node.var_name} = {expr_code}\n")
         
     def visit_FuncCallStmtNode(self, node):
         function_name_map = {
@@ -53,16 +85,54 @@ class CodeGenerator:
         arg_code = ""
         if node.arg_list:
             arg_code = self.visit(node.arg_list[0])
-        self.python_code += f"{self._indent()}{target_function_name}({arg_code})\n"
+        self.emit(f"{self._indent()}{target_function_name}({arg_code})\n")
 
     def visit_ReturnNode(self, node):
         expr_code = self.visit(node.expr_node)
-        self.python_code += f"{self._indent()}return {expr_code}\n"
+        self.emit(f"{self._indent()}return {expr_code}\n")
 
     def visit_BinaryOpNode(self, node):
-        left_code = self.visit(node.left)
-        right_code = self.visit(node.right)
-        return f"({left_code} {node.op_token.valor} {right_code})"
+        codigo, _, _ = self.visit_postorder(node, self._combinar)
+        return codigo
+
+    visit_UnaryOpNode = visit_BinaryOpNode
+
+    def _combinar(self, node, filhos):
+        """
+        Monta o código de uma operação a partir dos filhos, cada um uma string
+        (folha) ou uma tupla (código, precedência, profundidade). Só põe os
+        parênteses necessários: num operando prefixo ou esquerdo, se ele tem
+        precedência menor; no direito, se tem precedência menor ou igual.
+        """
+        filhos = [filho if filho.__class__ is tuple else (filho, ATOMO, 0) for filho in filhos]
+        if len(filhos) == 1:
+            precedencia = PRECEDENCIA_PREFIXA[node.op]
+            operando, prec_op, profundidade = filhos[0]
+            if prec_op < precedencia:
+                operando = f"({operando})"
+            codigo = f"{node.op}{operando}"
+        else:
+            precedencia = PRECEDENCIA_BINARIA[node.op]
+            (esquerda, prec_esq, prof_esq), (direita, prec_dir, prof_dir) = filhos
+            if prec_esq < precedencia:
+                esquerda = f"({esquerda})"
+            if prec_dir <= precedencia:
+                direita = f"({direita})"
+            codigo = f"{esquerda} {node.op} {direita}"
+            profundidade = max(prof_esq, prof_dir)
+        profundidade += 1
+        if profundidade < PROFUNDIDADE_MAXIMA:
+            return codigo, precedencia, profundidade
+        # As expressões não têm efeitos colaterais: calcular esta parte antes
+        # do comando não muda o resultado.
+        nome = TEMPORARIO.format(self.temporarios)
+        self.temporarios += 1
+        if rastro.codegen:
+            rastro.emitir("codegen", DEBUG, "temporary",
+                          f"Geração: sub-expressão da linha {node.linha} calculada antes em '{nome}'",
+                          nome=nome, linha=node.linha)
+        self.emit(f"{self._indent()}{nome} = {codigo}\n")
+        return nome, ATOMO, 0
 
     def visit_IdentifierNode(self, node):
         return node.value
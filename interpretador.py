@@ -0,0 +1,233 @@
+# interpretador.py
+#
+# Execução direta da AST otimizada, sem gerar código Python: cada função é
+# compilada uma única vez numa lista de closures, uma por comando, que lêem
+# e escrevem as variáveis num quadro (uma lista criada a cada chamada, com
+# uma posição por variável local: o 'slot' dado pela SymbolTable). Não há
+# output.py, compile() nem subprocess; o programa roda neste processo, e
+# printf escreve num destino qualquer.
+#
+# O comportamento é o do código gerado pelo CodeGenerator: as operações são
+# as do Python ('/' é a divisão real), o texto impresso é o mesmo e as
+# expressões profundas são divididas nos mesmos pontos (ver
+# gerador_codigo.PROFUNDIDADE_MAXIMA), com temporários no fim do quadro, de
+# modo que as closures aninhadas também não esbarram no limite de recursão.
+import gc
+import io
+import operator
+
+from gerador_ast import valor_literal, valor_numero
+from gerador_codigo import PROFUNDIDADE_MAXIMA
+from rastreio import rastro, DEBUG, INFO
+from semantico import FUNCOES_EMBUTIDAS
+from visitor import NodeVisitor
+
+OPERADORES = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+OPERADORES_PREFIXOS = {'-': operator.neg}
+
+# Operandos de uma expressão compilada: (tipo, dado, profundidade), onde o
+# dado é o valor (CONSTANTE), a posição no quadro (SLOT) ou uma closure que
+# recebe o quadro e calcula o valor (CALCULO). Operações sobre constantes e
+# variáveis viram closures especializadas, sem chamadas intermediárias.
+CONSTANTE, SLOT, CALCULO = 0, 1, 2
+
+def _closure(operando):
+    tipo, dado, _ = operando
+    if tipo == CONSTANTE:
+        return lambda quadro: dado
+    if tipo == SLOT:
+        return lambda quadro: quadro[dado]
+    return dado
+
+def _binaria(op, esquerda, direita):
+    (tipo_e, e, _), (tipo_d, d, _) = esquerda, direita
+    if tipo_e == SLOT:
+        if tipo_d == SLOT:
+            return lambda quadro: op(quadro[e], quadro[d])
+        if tipo_d == CONSTANTE:
+            return lambda quadro: op(quadro[e], d)
+        return lambda quadro: op(quadro[e], d(quadro))
+    if tipo_e == CALCULO:
+        if tipo_d == SLOT:
+            return lambda quadro: op(e(quadro), quadro[d])
+        if tipo_d == CONSTANTE:
+            return lambda quadro: op(e(quadro), d)
+        return lambda quadro: op(e(quadro), d(quadro))
+    if tipo_d == SLOT:
+        return lambda quadro: op(e, quadro[d])
+    d = _closure(direita)
+    return lambda quadro: op(e, d(quadro))
+
+def _atribuir(slot, operando):
+    tipo, dado, _ = operando
+    if tipo == CONSTANTE:
+        def comando(quadro):
+            quadro[slot] = dado
+    elif tipo == SLOT:
+        def comando(quadro):
+            quadro[slot] = quadro[dado]
+    else:
+        def comando(quadro):
+            quadro[slot] = dado(quadro)
+    return comando
+
+class ClosureCompiler(NodeVisitor):
+    """
+    Compila um programa (AST analisada e otimizada) em closures. O que
+    printf imprime vai para 'saida' (um objeto com write()). compilar()
+    retorna o dicionário {nome: função} com as funções do programa, que são
+    chamadas sem argumentos, como as do código gerado.
+    """
+    def __init__(self, saida):
+        self.escrever = saida.write
+        self.funcoes = {}
+        self.comandos = []      # comandos da função sendo compilada
+        self.temporarios = 0
+        self.locais = 0         # posições das variáveis locais no quadro
+
+    def compilar(self, program_node):
+        # Como em gerador_ast.compilar: as closures não formam ciclos
+        gc_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            self.visit(program_node)
+        finally:
+            if gc_ativo:
+                gc.enable()
+        return self.funcoes
+
+    def visit_ProgramNode(self, node):
+        for decl in node.declarations:
+            self.visit(decl)
+
+    def visit_FuncDeclNode(self, node):
+        if rastro.codegen:
+            rastro.emitir("codegen", INFO, "function", f"Closures: função '{node.name}' ({len(node.body)} comandos)",
+                          nome=node.name, comandos=len(node.body))
+        self.locais = self.temporarios = 0
+        self.comandos = comandos = []
+        retorno = None
+        for stmt in node.body:
+            retorno = self.visit(stmt)
+            if retorno is not None:
+                retorno = _closure(retorno)
+                break  # Os comandos depois do return nunca executam
+        tamanho = self.locais + self.temporarios
+        comandos = tuple(comandos)
+
+        if retorno is None:
+            def funcao():
+                quadro = [None] * tamanho
+                for comando in comandos:
+                    comando(quadro)
+        else:
+            def funcao():
+                quadro = [None] * tamanho
+                for comando in comandos:
+                    comando(quadro)
+                return retorno(quadro)
+        funcao.__name__ = funcao.__qualname__ = node.name
+        self.funcoes[node.name] = funcao
+
+    # Comandos: acrescentam suas closures a self.comandos; só o return
+    # devolve algo (o operando do valor retornado)
+    def visit_VarDeclNode(self, node):
+        if node.expr_node:
+            self.comandos.append(_atribuir(self._slot(node.symbol, node.var_name), self.visit(node.expr_node)))
+        else:
+            self.comandos.append(_atribuir(self._slot(node.symbol, node.var_name), (CONSTANTE, None, 0)))
+
+    def visit_AssignNode(self, node):
+        self.comandos.append(_atribuir(self._slot(node.symbol, node.var_name), self.visit(node.expr_node)))
+
+    def visit_FuncCallStmtNode(self, node):
+        # Assim como no CodeGenerator, apenas o primeiro argumento é usado
+        argumento = _closure(self.visit(node.arg_list[0])) if node.arg_list else None
+        if node.name in FUNCOES_EMBUTIDAS:
+            escrever = self.escrever
+            if argumento is None:
+                def comando(quadro):
+                    escrever("\n")
+            else:
+                def comando(quadro):
+                    escrever(f"{argumento(quadro)}\n")
+        else:
+            # Ligação tardia: a função chamada pode ser declarada depois desta
+            funcoes, nome = self.funcoes, node.name
+            if argumento is None:
+                def comando(quadro):
+                    funcoes[nome]()
+            else:
+                def comando(quadro):
+                    argumento(quadro)
+                    raise TypeError(f"{nome}() takes 0 positional arguments but 1 was given")
+        self.comandos.append(comando)
+
+    def visit_ReturnNode(self, node):
+        return self.visit(node.expr_node)
+
+    def visit_ErrorNode(self, node):
+        raise ValueError(f"Programa com erros de compilação (linha {node.linha}): {node.message}")
+
+    def _slot(self, symbol, nome):
+        if symbol is None or not symbol.scope_level:
+            raise ValueError(f"'{nome}' não é uma variável local resolvida pela análise semântica")
+        self.locais = max(self.locais, symbol.slot + 1)
+        return symbol.slot
+
+    # Expressões: retornam operandos (ver CONSTANTE, SLOT, CALCULO)
+    def visit_BinaryOpNode(self, node):
+        return self.visit_postorder(node, self._combinar)
+
+    visit_UnaryOpNode = visit_BinaryOpNode
+
+    def _combinar(self, node, filhos):
+        profundidade = max(filho[2] for filho in filhos) + 1
+        if len(filhos) == 1:
+            calculo = _closure(filhos[0])
+            op = OPERADORES_PREFIXOS[node.op]
+            expr = lambda quadro: op(calculo(quadro))
+        else:
+            expr = _binaria(OPERADORES[node.op], filhos[0], filhos[1])
+        if profundidade < PROFUNDIDADE_MAXIMA:
+            return CALCULO, expr, profundidade
+        # Mesma divisão de expressões profundas que o CodeGenerator faz
+        # Os temporários contam do fim do quadro: as variáveis locais usam o começo
+        self.temporarios += 1
+        slot = -self.temporarios
+        if rastro.codegen:
+            rastro.emitir("codegen", DEBUG, "temporary",
+                          f"Closures: sub-expressão da linha {node.linha} calculada antes no slot {slot}",
+                          slot=slot, linha=node.linha)
+        self.comandos.append(_atribuir(slot, (CALCULO, expr, profundidade)))
+        return SLOT, slot, 0
+
+    def visit_IdentifierNode(self, node):
+        symbol = node.symbol
+        if symbol is not None and symbol.scope_level:
+            return SLOT, self._slot(symbol, node.value), 0
+        # Nome global (uma função usada como valor): resolvido na execução
+        funcoes, nome = self.funcoes, node.value
+        return CALCULO, lambda quadro: funcoes[nome], 0
+
+    def visit_NumberNode(self, node):
+        return CONSTANTE, valor_numero(node.value), 0
+
+    def visit_StringNode(self, node):
+        return CONSTANTE, valor_literal(node.value), 0
+
+    visit_CharNode = visit_StringNode
+
+def executar_programa(program_node, saida=None):
+    """
+    Compila o programa em closures e chama sua função main(). O que ele
+    imprime vai para 'saida' (um objeto com write()); sem ela, é capturado.
+    Retorna (valor retornado por main, texto capturado), como
+    executor.executar_codigo.
+    """
+    captura = io.StringIO() if saida is None else saida
+    funcoes = ClosureCompiler(captura).compilar(program_node)
+    if "main" not in funcoes:
+        raise NameError("name 'main' is not defined")
+    retorno = funcoes["main"]()
+    return retorno, (captura.getvalue() if saida is None else None)
@@ -0,0 +1,180 @@
+# lote.py
+#
+# Compilação em lote: compila muitos arquivos fonte em paralelo, num pool de
+# processos, gerando um arquivo .py para cada entrada.
+#
+#   python3 lote.py programas/ -j 8 -o saida/
+#   python3 lote.py a.txt b.txt c.txt
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+def coletar_fontes(caminhos, extensao=".txt"):
+    """
+    Expande diretórios (recursivamente, pelos arquivos com 'extensao') e
+    retorna pares (arquivo fonte, caminho relativo usado para nomear a saída).
+    """
+    fontes = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, arquivos in os.walk(caminho):
+                for nome in sorted(arquivos):
+                    if nome.endswith(extensao):
+                        completo = os.path.join(raiz, nome)
+                        fontes.append((completo, os.path.relpath(completo, caminho)))
+        else:
+            fontes.append((caminho, os.path.basename(caminho)))
+    return fontes
+
+def caminho_saida(fonte, relativo, diretorio_saida=None):
+    base = os.path.splitext(relativo if diretorio_saida else fonte)[0] + ".py"
+    return os.path.join(diretorio_saida, base) if diretorio_saida else base
+
+def _normalizar(caminho):
+    return os.path.normcase(os.path.abspath(caminho))
+
+def verificar_destinos(fontes, destinos):
+    """
+    Confere os destinos antes de começar o lote e retorna, para cada entrada,
+    o erro que impede compilá-la ou None: uma fonte .py (a saída a
+    sobrescreveria), um destino que é uma das fontes do lote ou um destino
+    compartilhado por mais de uma entrada (ex: a.txt de duas raízes com -o).
+    """
+    entradas = {_normalizar(fonte) for fonte, _ in fontes}
+    por_destino = {}
+    for i, destino in enumerate(destinos):
+        por_destino.setdefault(_normalizar(destino), []).append(i)
+    erros = []
+    for i, ((fonte, _), destino) in enumerate(zip(fontes, destinos)):
+        mesmo_destino = [fontes[j][0] for j in por_destino[_normalizar(destino)] if j != i]
+        if os.path.splitext(fonte)[1].lower() == ".py":
+            erros.append(f"A entrada '{fonte}' é um arquivo .py: a saída a sobrescreveria.")
+        elif _normalizar(destino) in entradas:
+            erros.append(f"O destino '{destino}' é um dos arquivos fonte do lote.")
+        elif mesmo_destino:
+            erros.append(f"O destino '{destino}' também é o de {', '.join(repr(f) for f in mesmo_destino)}.")
+        else:
+            erros.append(None)
+    return erros
+
+# Um CompilationCache por diretório em cada worker: o tamanho medido do cache
+# é reaproveitado entre os arquivos, em vez de varrer o diretório a cada um
+_caches = {}
+
+def compilar_um(fonte, destino, fused=False, diretorio_cache=None, nivel=2, perfilar=False):
+    """
+    Compila um arquivo (executado nos processos do pool). Nunca propaga
+    exceções: retorna um dicionário com o resultado e os tempos. Com
+    perfilar=True, o cache é ignorado e o resultado inclui o perfil das
+    fases em "perfil" (ver perfil.CompileProfiler).
+    """
+    from sintatico import compilar_arquivo, SyntaxError
+    from cache import CompilationCache, hash_arquivo
+    from perfil import CompileProfiler
+
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    resultado = {"fonte": fonte, "destino": destino, "ok": True, "erro": None, "cache": False, "perfil": None}
+    perfil = CompileProfiler() if perfilar else None
+    try:
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        cache = chave = None
+        if diretorio_cache:
+            cache = _caches.get(diretorio_cache)
+            if cache is None:
+                cache = _caches[diretorio_cache] = CompilationCache(diretorio_cache)
+            chave = cache.chave(hash_arquivo(fonte), {"fused": fused, "O": nivel})
+        if perfil is None and cache is not None and cache.restaurar(chave, destino):
+            resultado["cache"] = True
+        else:
+            compilar_arquivo(fonte, destino, fused, cache, chave, verbose=False, nivel=nivel, perfil=perfil)
+            if perfil is not None:
+                resultado["perfil"] = perfil.como_dict()
+    except (SyntaxError, NameError) as e:
+        resultado.update(ok=False, erro=f"ERRO DE COMPILAÇÃO: {e}")
+    except FileNotFoundError:
+        resultado.update(ok=False, erro=f"Arquivo '{fonte}' não encontrado.")
+    except Exception as e:
+        resultado.update(ok=False, erro=f"{type(e).__name__}: {e}")
+    resultado["tempo"] = time.perf_counter() - inicio
+    resultado["tempo_cpu"] = time.process_time() - inicio_cpu
+    return resultado
+
+def compilar_lote(fontes, diretorio_saida=None, jobs=None, fused=False, diretorio_cache=None, nivel=2,
+                  perfilar=False):
+    """
+    Compila os pares (fonte, relativo) no pool e retorna os resultados na
+    ordem de entrada. As entradas recusadas por verificar_destinos não são
+    compiladas: aparecem como falhas, e nenhum arquivo é escrito por elas.
+    """
+    jobs = jobs or os.cpu_count()
+    destinos = [caminho_saida(fonte, relativo, diretorio_saida) for fonte, relativo in fontes]
+    resultados = [None if erro is None else
+                  {"fonte": fonte, "destino": destino, "ok": False, "erro": erro, "cache": False, "perfil": None,
+                   "tempo": 0.0, "tempo_cpu": 0.0}
+                  for (fonte, _), destino, erro in zip(fontes, destinos, verificar_destinos(fontes, destinos))]
+    pendentes = [i for i, resultado in enumerate(resultados) if resultado is None]
+    if pendentes:
+        # Vários arquivos por tarefa, para diluir o custo de comunicação com os workers
+        chunksize = max(1, len(pendentes) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            compilados = pool.map(compilar_um, [fontes[i][0] for i in pendentes], [destinos[i] for i in pendentes],
+                                  [fused] * len(pendentes), [diretorio_cache] * len(pendentes),
+                                  [nivel] * len(pendentes), [perfilar] * len(pendentes), chunksize=chunksize)
+            for i, resultado in zip(pendentes, compilados):
+                resultados[i] = resultado
+    return resultados
+
+def imprimir_resumo(resultados, duracao):
+    falhas = [r for r in resultados if not r["ok"]]
+    for r in falhas:
+        print(f"FALHA {r['fonte']}: {r['erro']}")
+    total = len(resultados)
+    do_cache = sum(r["cache"] for r in resultados)
+    tempo_cpu = sum(r["tempo_cpu"] for r in resultados)
+    print(f"\n--- Resumo do lote ---")
+    print(f"Arquivos: {total} | sucesso: {total - len(falhas)} | falha: {len(falhas)} | do cache: {do_cache}")
+    print(f"Tempo total: {duracao:.2f}s | CPU nos workers: {tempo_cpu:.2f}s | "
+          f"{total / duracao if duracao else 0:.1f} arquivos/s")
+    if resultados:
+        mais_lento = max(resultados, key=lambda r: r["tempo"])
+        print(f"Mais lento: {mais_lento['fonte']} ({mais_lento['tempo']:.3f}s)")
+    perfis = [r["perfil"] for r in resultados if r["perfil"] is not None]
+    if perfis:
+        from perfil import agregar_perfis, formatar_perfil
+        print("\n--- Perfil agregado das fases ---")
+        print(formatar_perfil(agregar_perfis(perfis)))
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compila vários arquivos fonte em paralelo.")
+    arg_parser.add_argument("caminhos", nargs="+", help="arquivos fonte ou diretórios (busca *.txt)")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                            help="número de processos (padrão: número de CPUs)")
+    arg_parser.add_argument("-o", "--output-dir", default=None,
+                            help="diretório de saída (padrão: ao lado de cada fonte)")
+    arg_parser.add_argument("--fused", action="store_true",
+                            help="faz a análise semântica e o constant folding numa única passagem")
+    arg_parser.add_argument("-O", type=int, choices=(0, 1, 2), default=2,
+                            help="nível de otimização (padrão: 2)")
+    arg_parser.add_argument("--no-cache", action="store_true", help="ignora o cache de compilação")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="mede as fases de cada compilação e imprime o perfil agregado")
+    arg_parser.add_argument("--profile-out", metavar="ARQUIVO",
+                            help="com --profile, grava em JSON o perfil agregado e o de cada arquivo")
+    arg_parser.add_argument("--cache-dir", default=".compilador_cache",
+                            help="diretório do cache de compilação (padrão: .compilador_cache)")
+    args = arg_parser.parse_args()
+
+    fontes = coletar_fontes(args.caminhos)
+    inicio = time.perf_counter()
+    resultados = compilar_lote(fontes, args.output_dir, args.jobs, args.fused,
+                               None if args.no_cache else args.cache_dir, args.O, args.profile)
+    imprimir_resumo(resultados, time.perf_counter() - inicio)
+    if args.profile and args.profile_out:
+        import json
+        from perfil import agregar_perfis
+        perfis = {r["fonte"]: r["perfil"] for r in resultados if r["perfil"] is not None}
+        with open(args.profile_out, "w", encoding="utf-8") as f:
+            json.dump({"agregado": agregar_perfis(perfis.values()), "arquivos": perfis}, f, indent=2)
+    sys.exit(1 if any(not r["ok"] for r in resultados) else 0)
@@ -1,84 +1,172 @@
 # nodes.py
+#
+# Os nós usam __slots__ (sem __dict__ por instância) e não guardam o Token de
+# origem: só o valor e a linha. Cada classe declara em 'child_fields' quais
+# atributos são filhos (um nó, uma lista de nós ou None), na ordem em que
+# devem ser percorridos; os visitantes usam esse esquema em vez de __dict__.
 
 class Node:
     """Nó base para todos os nós da AST."""
+    __slots__ = ()
+    child_fields = ()
+
     def __repr__(self):
         return f"<{self.__class__.__name__}>"
 
+    def iter_children(self):
+        """Percorre os filhos diretos do nó, na ordem de 'child_fields'."""
+        for field in self.child_fields:
+            child = getattr(self, field)
+            if isinstance(child, list):
+                yield from child
+            elif child is not None:
+                yield child
+
 class ProgramNode(Node):
     """Nó raiz da AST."""
+    __slots__ = ('declarations',)
+    child_fields = ('declarations',)
+
     def __init__(self, declarations):
         self.declarations = declarations
 
 class FuncDeclNode(Node):
     """Nó para declaração de função. Ex: int main() { ... }"""
+    __slots__ = ('type_node', 'name', 'body', 'linha', 'symbol')
+    child_fields = ('type_node', 'body')
+
     def __init__(self, type_node, name_token, body):
         self.type_node = type_node
         self.name = name_token.valor
+        self.linha = name_token.linha
         self.body = body
+        self.symbol = None
 
 class VarDeclNode(Node):
     """Nó para declaração de variável. Ex: int x = 5;"""
+    __slots__ = ('type_node', 'var_name', 'expr_node', 'linha', 'symbol')
+    child_fields = ('type_node', 'expr_node')
+
     def __init__(self, type_node, var_token, expr_node=None):
         self.type_node = type_node
         self.var_name = var_token.valor
+        self.linha = var_token.linha
         self.expr_node = expr_node
+        self.symbol = None
 
 class AssignNode(Node):
     """Nó para atribuição. Ex: x = 10;"""
+    __slots__ = ('var_name', 'expr_node', 'linha', 'symbol')
+    child_fields = ('expr_node',)
+
     def __init__(self, var_token, expr_node):
         self.var_name = var_token.valor
+        self.linha = var_token.linha
         self.expr_node = expr_node
-        
+        self.symbol = None
+
 class ReturnNode(Node):
     """Nó para o comando return. Ex: return 0;"""
-    def __init__(self, expr_node):
+    __slots__ = ('expr_node', 'linha')
+    child_fields = ('expr_node',)
+
+    def __init__(self, expr_node, linha=None):
         self.expr_node = expr_node
+        self.linha = linha
 
 class FuncCallStmtNode(Node):
     """Nó para uma chamada de função como um comando. Ex: printf("oi");"""
+    __slots__ = ('name', 'arg_list', 'linha', 'symbol')
+    child_fields = ('arg_list',)
+
     def __init__(self, name_token, arg_list):
         self.name = name_token.valor
+        self.linha = name_token.linha
         self.arg_list = arg_list
+        self.symbol = None  # Função (do programa ou embutida) resolvida pela análise semântica
 
 class BinaryOpNode(Node):
     """Nó para uma operação binária. Ex: a + b"""
+    __slots__ = ('left', 'op', 'right', 'linha')
+    child_fields = ('left', 'right')
+
     def __init__(self, left, op_token, right):
         self.left = left
-        self.op_token = op_token
+        self.op = op_token.valor
+        self.linha = op_token.linha
         self.right = right
 
+class UnaryOpNode(Node):
+    """Nó para uma operação prefixa. Ex: -a"""
+    __slots__ = ('op', 'operand', 'linha')
+    child_fields = ('operand',)
+
+    def __init__(self, op_token, operand):
+        self.op = op_token.valor
+        self.linha = op_token.linha
+        self.operand = operand
+
+# Nós de expressão com sub-expressões: são os únicos que formam cadeias
+# profundas (ex: a + b + c + ...), então os visitantes os percorrem com uma
+# pilha explícita (ver visitor.pos_ordem) em vez de recursão.
+OPERACOES = (BinaryOpNode, UnaryOpNode)
+
 class TypeNode(Node):
     """Nó que representa um tipo. Ex: int"""
+    __slots__ = ('value', 'linha')
+
     def __init__(self, token):
-        self.token = token
         self.value = token.valor
+        self.linha = token.linha
 
 class IdentifierNode(Node):
     """Nó para um identificador. Ex: x"""
+    __slots__ = ('value', 'linha', 'symbol')
+
     def __init__(self, token):
-        self.token = token
         self.value = token.valor
+        self.linha = token.linha
+        self.symbol = None  # Symbol resolvido pela análise semântica
 
 class NumberNode(Node):
     """Nó para um número (inteiro ou real)."""
-    # ############################################################### #
-    # A CORREÇÃO ESTÁ AQUI                                            #
-    # Tornamos o construtor mais flexível.                            #
-    # ############################################################### #
+    __slots__ = ('value', 'linha')
+
     def __init__(self, token=None, value=None):
-        self.token = token
         # Usa o 'value' se for fornecido, senão extrai do 'token'
         self.value = value if value is not None else token.valor
-        
+        self.linha = token.linha if token is not None else None
+
 class StringNode(Node):
     """Nó para uma string literal."""
+    __slots__ = ('value', 'linha')
+
     def __init__(self, token):
-        self.token = token
         self.value = token.valor
+        self.linha = token.linha
 
 class CharNode(Node):
     """Nó para um caractere literal."""
+    __slots__ = ('value', 'linha')
+
     def __init__(self, token):
-        self.token = token
-        self.value = token.valor
\ No newline at end of file
+        self.value = token.valor
+        self.linha = token.linha
+
+class ErrorNode(Node):
+    """
+    Ocupa o lugar de um comando com erro de sintaxe, para que a análise
+    semântica continue verificando o resto do programa. Se o comando era uma
+    declaração, 'var_name' guarda o nome declarado (ou None).
+
+    Uma função com o cabeçalho inválido também vira um ErrorNode: 'var_name'
+    é o nome da função e 'body' os comandos do seu corpo.
+    """
+    __slots__ = ('message', 'var_name', 'linha', 'body')
+    child_fields = ('body',)
+
+    def __init__(self, message, linha=None, var_name=None, body=None):
+        self.message = message
+        self.linha = linha
+        self.var_name = var_name
+        self.body = [] if body is None else body
@@ -0,0 +1,248 @@
+# observador.py
+#
+# Modo de observação (watch): acompanha um arquivo fonte e o recompila a
+# cada alteração, reaproveitando o trabalho da compilação anterior. Os
+# tokens de cada linha ficam guardados entre as compilações, e o programa é
+# mantido como uma sequência de funções, cada uma com suas linhas, sua AST
+# otimizada e seu código gerado. Numa alteração:
+#
+#   1. a nova versão é comparada com a anterior (prefixo e sufixo comuns) e
+#      só as linhas do trecho alterado passam de novo pelo analisador léxico;
+#   2. as funções que tocam o trecho são reanalisadas (sintaxe, semântica,
+#      otimização e geração) a partir dos tokens guardados, com as demais
+#      funções do arquivo no escopo global, para as chamadas entre elas;
+#   3. o código delas é trocado no resultado anterior.
+#
+# O custo de uma recompilação depende do tamanho das funções alteradas, não
+# do arquivo. Se o trecho não forma funções completas e válidas (ex: uma
+# chave apagada) ou some com uma função que as outras podem chamar, o
+# programa inteiro é recompilado, o que também relata os erros exatamente
+# como a compilação normal.
+#
+#   python3 observador.py teste.txt -o output.py
+import argparse
+import os
+import time
+
+from analisador import ANALISADORES
+from gerador_codigo import CodeGenerator, RODAPE_PROGRAMA
+from sintatico import SyntaxError, analisar_tokens
+from tokens import TokenType
+
+class FunctionUnit:
+    """Uma função do programa: linhas [inicio, fim) da fonte (base 0), AST otimizada e código gerado."""
+    __slots__ = ('inicio', 'fim', 'node', 'codigo')
+
+    def __init__(self, inicio, fim, node, codigo):
+        self.inicio = inicio
+        self.fim = fim
+        self.node = node
+        self.codigo = codigo
+
+def segmentar(tokens):
+    """
+    Divide os tokens em funções pelas chaves: cada função vai do primeiro
+    token fora de qualquer bloco até o '}' que fecha o seu bloco. Retorna os
+    pares (início, fim) de índices, ou None se as chaves não se fecham.
+    """
+    segmentos = []
+    inicio = None
+    profundidade = 0
+    for i, token in enumerate(tokens):
+        if inicio is None:
+            inicio = i
+        if token.tipo is not TokenType.SIMBOLO:
+            continue
+        if token.valor == '{':
+            profundidade += 1
+        elif token.valor == '}':
+            profundidade -= 1
+            if profundidade < 0:
+                return None
+            if profundidade == 0:
+                segmentos.append((inicio, i + 1))
+                inicio = None
+    if inicio is not None:
+        return None
+    return segmentos
+
+class IncrementalCompiler:
+    """
+    Compilador incremental de um arquivo. atualizar(linhas) recompila o
+    programa com o novo conteúdo e retorna o código Python completo, ou
+    levanta os erros de compilação (como sintatico.analisar_fonte). Depois
+    de uma compilação com erros, a seguinte refaz o programa inteiro, mas
+    ainda reaproveita os tokens das linhas que não mudaram.
+
+    'estatisticas' descreve a última atualização: linhas reanalisadas pelo
+    léxico, funções recompiladas, se a recompilação foi completa e o tempo.
+    """
+    def __init__(self, nivel=2, analisador="regex"):
+        self.nivel = nivel
+        self.analisar = ANALISADORES[analisador]
+        self.linhas = []
+        self.tokens = []      # tokens de cada linha
+        self.funcoes = []
+        self.valido = False   # a última compilação terminou sem erros
+        self.estatisticas = {}
+
+    def codigo(self):
+        return "".join(funcao.codigo for funcao in self.funcoes) + RODAPE_PROGRAMA
+
+    def atualizar(self, linhas):
+        inicio_tempo = time.perf_counter()
+        linhas = list(linhas)
+        antigas = self.linhas
+        # Trecho alterado: linhas [p, fim_antigo) viraram [p, fim_novo)
+        limite = min(len(antigas), len(linhas))
+        p = 0
+        while p < limite and antigas[p] == linhas[p]:
+            p += 1
+        s = 0
+        while s < limite - p and antigas[-1 - s] == linhas[-1 - s]:
+            s += 1
+        fim_antigo, fim_novo = len(antigas) - s, len(linhas) - s
+        self.tokens[p:fim_antigo] = [self.analisar(linha.strip(), num)
+                                     for num, linha in enumerate(linhas[p:fim_novo], start=p + 1)]
+        self.linhas = linhas
+        self.estatisticas = {"linhas_relexadas": fim_novo - p, "funcoes_recompiladas": 0, "completa": False}
+
+        if p == fim_antigo == fim_novo and self.valido:
+            pass  # Nada mudou
+        elif not self.valido or not self._recompilar_trecho(p, fim_antigo, fim_novo):
+            self._recompilar_tudo()
+        self.estatisticas["tempo"] = time.perf_counter() - inicio_tempo
+        return self.codigo()
+
+    def _tokens_das_linhas(self, inicio, fim):
+        """Tokens das linhas [inicio, fim), com a linha corrigida (as linhas anteriores podem ter mudado)."""
+        tokens = []
+        for num in range(inicio, fim):
+            for token in self.tokens[num]:
+                token.linha = num + 1
+                tokens.append(token)
+        return tokens
+
+    def _compilar_funcoes(self, tokens, globais):
+        """Compila as funções dos tokens, com as funções 'globais' (nomes) definidas fora deles."""
+        programa = analisar_tokens(tokens, nivel=self.nivel, globais=globais)
+        resultado = []
+        for node in programa.declarations:
+            partes = []
+            CodeGenerator(sink=partes).visit(node)
+            resultado.append((node, "".join(partes)))
+        return resultado
+
+    def _recompilar_tudo(self):
+        self.valido = False
+        self.funcoes = []
+        tokens = self._tokens_das_linhas(0, len(self.linhas))
+        programa = analisar_tokens(tokens, nivel=self.nivel)  # Levanta os erros de compilação
+        funcoes = []
+        for (inicio, fim), node in zip(segmentar(tokens), programa.declarations):
+            partes = []
+            CodeGenerator(sink=partes).visit(node)
+            funcoes.append(FunctionUnit(tokens[inicio].linha - 1, tokens[fim - 1].linha, node, "".join(partes)))
+        self.funcoes = funcoes
+        self.valido = True
+        self.estatisticas.update(completa=True, funcoes_recompiladas=len(funcoes))
+
+    def _recompilar_trecho(self, p, fim_antigo, fim_novo):
+        """
+        Recompila só as funções que tocam as linhas alteradas. Retorna False
+        se o trecho precisa da recompilação completa.
+        """
+        deslocamento = fim_novo - fim_antigo
+        # Funções afetadas: as que tocam o trecho, inclusive nas bordas (uma
+        # linha pode ter o fim de uma função e o início da seguinte)
+        primeira = 0
+        while primeira < len(self.funcoes) and self.funcoes[primeira].fim < p:
+            primeira += 1
+        ultima = primeira
+        while ultima < len(self.funcoes) and self.funcoes[ultima].inicio <= fim_antigo:
+            ultima += 1
+        afetadas = self.funcoes[primeira:ultima]
+        inicio = min([p] + [f.inicio for f in afetadas])
+        fim = max([fim_novo] + [f.fim + deslocamento for f in afetadas])
+
+        tokens = self._tokens_das_linhas(inicio, fim)
+        segmentos = segmentar(tokens)
+        if not segmentos:
+            return False
+        # As funções fora do trecho continuam no escopo global: as recompiladas podem chamá-las
+        mantidas = self.funcoes[:primeira] + self.funcoes[ultima:]
+        try:
+            compiladas = self._compilar_funcoes(tokens, [funcao.node.name for funcao in mantidas])
+        except (SyntaxError, NameError):
+            return False  # A recompilação completa relata os erros
+        if len(compiladas) != len(segmentos):
+            return False
+        # Uma função removida ou renomeada pode ser chamada pelas mantidas, que não são reanalisadas
+        if {funcao.node.name for funcao in afetadas} - {node.name for node, _ in compiladas}:
+            return False
+        novas = [FunctionUnit(tokens[ini].linha - 1, tokens[fim_seg - 1].linha, node, codigo)
+                 for (ini, fim_seg), (node, codigo) in zip(segmentos, compiladas)]
+        funcoes = self.funcoes[:primeira] + novas + self.funcoes[ultima:]
+        for funcao in self.funcoes[ultima:]:
+            funcao.inicio += deslocamento
+            funcao.fim += deslocamento
+        self.funcoes = funcoes
+        self.estatisticas["funcoes_recompiladas"] = len(novas)
+        return True
+
+def ler_linhas(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+def gravar(caminho, codigo):
+    # Arquivo temporário e rename, como em sintatico.compilar_arquivo: quem
+    # executa a saída nunca a vê pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(codigo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except FileNotFoundError:
+            pass
+        raise
+
+def observar(caminho, saida, nivel=2, intervalo=0.2):
+    """Recompila 'caminho' para 'saida' a cada mudança (consultando o arquivo a cada 'intervalo' segundos)."""
+    compilador = IncrementalCompiler(nivel)
+    assinatura = None
+    print(f"Observando {caminho} (Ctrl+C para sair)")
+    while True:
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            info = None
+        nova = (info.st_mtime_ns, info.st_size) if info is not None else None
+        if nova is not None and nova != assinatura:
+            assinatura = nova
+            try:
+                gravar(saida, compilador.atualizar(ler_linhas(caminho)))
+            except (SyntaxError, NameError) as e:
+                print(f"ERRO DE COMPILAÇÃO: {e}")
+            else:
+                est = compilador.estatisticas
+                modo = "completa" if est["completa"] else "incremental"
+                print(f"{saida} atualizado ({modo}): {est['linhas_relexadas']} linhas relidas, "
+                      f"{est['funcoes_recompiladas']} funções recompiladas em {est['tempo'] * 1000:.1f} ms")
+        time.sleep(intervalo)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Recompila um arquivo fonte a cada alteração.")
+    arg_parser.add_argument("arquivo", help="arquivo fonte a observar")
+    arg_parser.add_argument("-o", "--output", default="output.py", help="arquivo gerado (padrão: output.py)")
+    arg_parser.add_argument("-O", type=int, choices=(0, 1, 2), default=2,
+                            help="nível de otimização (padrão: 2)")
+    arg_parser.add_argument("--intervalo", type=float, default=0.2,
+                            help="segundos entre as verificações do arquivo (padrão: 0.2)")
+    args = arg_parser.parse_args()
+    try:
+        observar(args.arquivo, args.output, args.O, args.intervalo)
+    except KeyboardInterrupt:
+        pass
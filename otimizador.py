@@ -1,52 +1,600 @@
 # otimizador.py
+import math
+import operator
+import time
+
 import nodes
+from rastreio import rastro, DEBUG, INFO
+from semantico import SemanticAnalyzer, Symbol
+from tokens import Token, TokenType
+from visitor import NodeVisitor, pos_ordem
+
+# Semântica de cada operador (ver tokens.PRECEDENCIA_BINARIA e
+# PRECEDENCIA_PREFIXA) usada para calcular as constantes
+OPERACOES_BINARIAS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+OPERACOES_PREFIXAS = {'-': operator.neg}
+
+def _valor(texto):
+    """Valor de um NumberNode: int para literais inteiros (aritmética exata), float para os reais."""
+    try:
+        return int(texto)
+    except ValueError:
+        return float(texto)
+
+def _numero(result):
+    """NumberNode com o resultado, ou None se ele não é representável (inf, nan)."""
+    if isinstance(result, float) and not math.isfinite(result):
+        return None
+    # O tipo do resultado é o da operação em Python: int só entre inteiros
+    # (exceto '/'), real caso contrário, mesmo que o valor seja inteiro (5.0)
+    return nodes.NumberNode(token=None, value=str(result))
+
+def _rastrear_dobra(expressao, numero):
+    rastro.emitir("optimizer", DEBUG, "fold",
+                  f"Otimização: Expressão '{expressao}' calculada como '{numero.value}'.",
+                  expressao=expressao, resultado=numero.value)
+
+def fold_binary_op(node):
+    """Calcula em tempo de compilação uma operação entre dois NumberNode."""
+    # A mágica do Constant Folding acontece aqui
+    if isinstance(node.left, nodes.NumberNode) and isinstance(node.right, nodes.NumberNode):
+        left_val = _valor(node.left.value)
+        right_val = _valor(node.right.value)
+        if node.op == '/' and right_val == 0:
+            return node  # A divisão por zero fica para a execução
+        try:
+            result = OPERACOES_BINARIAS[node.op](left_val, right_val)
+        except OverflowError:
+            return node  # Inteiro grande demais para virar real: fica para a execução
+        # Substitui este nó de operação por um simples nó de número
+        numero = _numero(result)
+        if numero is None:
+            return node
+        if rastro.optimizer:
+            _rastrear_dobra(f"{node.left.value} {node.op} {node.right.value}", numero)
+        return numero
+    
+    # Se não puder otimizar, retorna o nó original
+    return node
+
+def fold_unary_op(node):
+    """Calcula em tempo de compilação uma operação prefixa sobre um NumberNode."""
+    if isinstance(node.operand, nodes.NumberNode):
+        numero = _numero(OPERACOES_PREFIXAS[node.op](_valor(node.operand.value)))
+        if numero is None:
+            return node
+        if rastro.optimizer:
+            _rastrear_dobra(f"{node.op}{node.operand.value}", numero)
+        return numero
+    return node
+
+def dobrar(node):
+    """Constant folding de um nó de nodes.OPERACOES cujos filhos já foram otimizados."""
+    if node.__class__ is nodes.BinaryOpNode:
+        return fold_binary_op(node)
+    return fold_unary_op(node)
+
+def _trocar_filhos(node, filhos):
+    for field, filho in zip(node.child_fields, filhos):
+        setattr(node, field, filho)
+
+# --- Propagação de constantes e cópias entre comandos ---
+# Os corpos de função são sequências lineares de comandos (não há desvios),
+# então uma única passada para frente basta para saber o valor de cada
+# variável em cada ponto. As variáveis são identificadas pelo Symbol
+# resolvido na análise semântica (ou pelo nome, se a AST não foi analisada).
+LITERAIS = (nodes.NumberNode, nodes.StringNode, nodes.CharNode)
+
+def _chave(node):
+    if node.symbol is not None:
+        return node.symbol
+    return node.var_name if hasattr(node, 'var_name') else node.value
+
+def _na_linha(node, linha):
+    """Cópia de um literal ou IdentifierNode com a linha de outro ponto do programa."""
+    copia = node.__class__.__new__(node.__class__)
+    for campo in node.__slots__:
+        setattr(copia, campo, getattr(node, campo))
+    copia.linha = linha
+    return copia
+
+def _substituir(expr, valores, stats=None):
+    """
+    Troca variáveis de valor conhecido pelo valor e recalcula as constantes.
+    O valor entra como uma cópia com a linha do uso, não a da definição.
+    """
+    def folha(node):
+        if stats is not None:
+            stats.visitados += 1
+        if isinstance(node, nodes.IdentifierNode):
+            valor = valores.get(_chave(node))
+            if valor is None:
+                return node
+            if stats is not None:
+                stats.reescritos += 1
+            return _na_linha(valor, node.linha)
+        return node
+
+    def combinar(node, filhos):
+        _trocar_filhos(node, filhos)
+        novo = dobrar(node)
+        if stats is not None:
+            stats.visitados += 1
+            if novo is not node:
+                stats.reescritos += 1
+        return novo
+
+    return pos_ordem(expr, folha, combinar)
+
+def _usos(expr, vivos):
+    """Acrescenta a 'vivos' as variáveis lidas pela expressão."""
+    pilha = [expr]
+    while pilha:
+        node = pilha.pop()
+        if isinstance(node, nodes.IdentifierNode):
+            vivos.add(_chave(node))
+        elif isinstance(node, nodes.OPERACOES):
+            pilha.extend(node.iter_children())
+
+def propagar_constantes(body, stats=None):
+    """
+    Propaga constantes (literais) e cópias (x = y) pelos comandos de um corpo
+    de função, substituindo-as nas expressões seguintes e recalculando o que
+    ficar constante. Depois remove os comandos após o primeiro 'return' e as
+    atribuições de valores simples (literais ou cópias) que não são mais lidas.
+    Retorna a nova lista de comandos. Se 'stats' (um PassStats) for dado,
+    acumula nele os nós visitados, reescritos e removidos.
+    """
+    valores = {}   # variável -> literal ou IdentifierNode (cópia)
+    copias = {}    # variável -> variáveis que são cópias dela
+    resultado = []
+    for stmt in body:
+        if stats is not None:
+            stats.visitados += 1
+        if isinstance(stmt, (nodes.VarDeclNode, nodes.AssignNode)):
+            if stmt.expr_node is not None:
+                stmt.expr_node = _substituir(stmt.expr_node, valores, stats)
+            alvo = _chave(stmt)
+            # O valor antigo de 'alvo' deixa de valer, inclusive nas suas cópias
+            valores.pop(alvo, None)
+            for copia in copias.pop(alvo, ()):
+                valores.pop(copia, None)
+            expr = stmt.expr_node
+            if isinstance(expr, LITERAIS):
+                valores[alvo] = expr
+            elif isinstance(expr, nodes.IdentifierNode) and _chave(expr) != alvo:
+                valores[alvo] = expr
+                copias.setdefault(_chave(expr), set()).add(alvo)
+        elif isinstance(stmt, nodes.FuncCallStmtNode):
+            stmt.arg_list = [_substituir(arg, valores, stats) for arg in stmt.arg_list]
+        elif isinstance(stmt, nodes.ReturnNode):
+            stmt.expr_node = _substituir(stmt.expr_node, valores, stats)
+            resultado.append(stmt)
+            break  # Comandos após o return nunca são executados
+        resultado.append(stmt)
 
-class Optimizer:
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+    # Eliminação de atribuições mortas, de trás para frente. Só são removidas
+    # as de expressões simples, que não podem falhar em tempo de execução.
+    vivos = set()
+    mantidos = []
+    for stmt in reversed(resultado):
+        if isinstance(stmt, (nodes.VarDeclNode, nodes.AssignNode)):
+            alvo = _chave(stmt)
+            expr = stmt.expr_node
+            if alvo not in vivos and (expr is None or isinstance(expr, LITERAIS + (nodes.IdentifierNode,))):
+                continue
+            vivos.discard(alvo)
+            _usos(expr, vivos)
+        elif isinstance(stmt, nodes.FuncCallStmtNode):
+            for arg in stmt.arg_list:
+                _usos(arg, vivos)
+        elif isinstance(stmt, nodes.ReturnNode):
+            _usos(stmt.expr_node, vivos)
+        mantidos.append(stmt)
+    mantidos.reverse()
+    if stats is not None:
+        stats.removidos += len(body) - len(mantidos)
+    return mantidos
+
+# --- Reassociação de somas ---
+# O parser monta 'x + 1 + 2 + 3' como ((x + 1) + 2) + 3, e o folding não
+# calcula nada: o operando esquerdo nunca é um NumberNode. A reassociação
+# achata cada cadeia de '+' numa soma n-ária, junta os termos constantes
+# num só e remonta a árvore: x + 6. Só é feita quando todos os termos são
+# inteiros com certeza, pois a soma de inteiros é exata (associativa e
+# comutativa); com reais o arredondamento depende da ordem e com strings
+# o '+' é concatenação.
+
+# Acima desse número de termos a soma é remontada como uma árvore
+# balanceada (profundidade log n) em vez de uma cadeia à esquerda.
+TERMOS_CADEIA = 32
+
+def _literal_inteiro(node):
+    return node.__class__ is nodes.NumberNode and node.value.lstrip('-').isdigit()
+
+def _inteira(expr, inteiras):
+    """Se a expressão certamente produz um int: literais inteiros, variáveis de 'inteiras', + - * e '-' prefixo."""
+    pilha = [expr]
+    while pilha:
+        node = pilha.pop()
+        if isinstance(node, nodes.IdentifierNode):
+            if _chave(node) not in inteiras:
+                return False
+        elif isinstance(node, nodes.BinaryOpNode):
+            if node.op == '/':
+                return False  # Divisão de inteiros produz um real
+            pilha.append(node.left)
+            pilha.append(node.right)
+        elif isinstance(node, nodes.UnaryOpNode):
+            pilha.append(node.operand)
+        elif not _literal_inteiro(node):
+            return False
+    return True
+
+def _variaveis_inteiras(body):
+    """
+    Variáveis do corpo que só guardam valores int. Uma variável 'int' pode
+    receber um real (ex: int m = a / 2;) ou nenhum valor, então parte das
+    declaradas como int e descarta as que recebem algo que não é certamente
+    inteiro, propagando o descarte para as que dependem delas.
+    """
+    declaradas = set()
+    lidas = {}       # variável -> variáveis lidas nos valores atribuídos a ela
+    descartadas = []
+    for stmt in body:
+        if not isinstance(stmt, (nodes.VarDeclNode, nodes.AssignNode)):
+            continue
+        alvo = _chave(stmt)
+        if isinstance(stmt, nodes.VarDeclNode):
+            if stmt.type_node.value == 'int' and stmt.expr_node is not None:
+                declaradas.add(alvo)
+            else:
+                descartadas.append(alvo)
+        if stmt.expr_node is not None:
+            _usos(stmt.expr_node, lidas.setdefault(alvo, set()))
+    # Primeiro descarte: o valor não é inteiro nem supondo que todas as
+    # variáveis declaradas como int o sejam
+    for stmt in body:
+        if isinstance(stmt, (nodes.VarDeclNode, nodes.AssignNode)) and stmt.expr_node is not None:
+            if not _inteira(stmt.expr_node, declaradas):
+                descartadas.append(_chave(stmt))
+    dependentes = {}
+    for alvo, usadas in lidas.items():
+        for usada in usadas:
+            dependentes.setdefault(usada, []).append(alvo)
+    inteiras = set(declaradas)
+    while descartadas:
+        alvo = descartadas.pop()
+        if alvo in inteiras:
+            inteiras.discard(alvo)
+            descartadas.extend(dependentes.get(alvo, ()))
+    return inteiras
+
+class _Raiz:
+    """Posição da raiz de uma expressão, para trocá-la como qualquer filho."""
+    __slots__ = ('expr',)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+def _termos_soma(node):
+    """Posições (nó, campo) dos termos de uma cadeia de '+', da esquerda para a direita."""
+    termos = []
+    pilha = [(node, 'right'), (node, 'left')]
+    while pilha:
+        dono, campo = pilha.pop()
+        filho = getattr(dono, campo)
+        if filho.__class__ is nodes.BinaryOpNode and filho.op == '+':
+            pilha.append((filho, 'right'))
+            pilha.append((filho, 'left'))
+        else:
+            termos.append((dono, campo))
+    return termos
+
+def _somar(termos, linha):
+    """Remonta a soma dos termos: cadeia à esquerda ou, se for longa, árvore balanceada."""
+    def mais(esquerda, direita):
+        return nodes.BinaryOpNode(esquerda, Token(TokenType.SIMBOLO, '+', linha), direita)
+
+    if len(termos) <= TERMOS_CADEIA:
+        soma = termos[0]
+        for termo in termos[1:]:
+            soma = mais(soma, termo)
+        return soma
+    # Soma os termos dois a dois, nível a nível, mantendo a ordem
+    while len(termos) > 1:
+        pares = [mais(termos[i], termos[i + 1]) for i in range(0, len(termos) - 1, 2)]
+        if len(termos) % 2:
+            pares.append(termos[-1])
+        termos = pares
+    return termos[0]
+
+def reassociar(expr, inteiras, stats=None):
+    """
+    Reassocia as cadeias de '+' de inteiros da expressão: os termos
+    constantes são somados num único termo, colocado no fim (e omitido se
+    der zero). Retorna a nova expressão.
+    """
+    raiz = _Raiz(expr)
+    pilha = [(raiz, 'expr')]
+    while pilha:
+        dono, campo = pilha.pop()
+        node = getattr(dono, campo)
+        if stats is not None:
+            stats.visitados += 1
+        if node.__class__ is nodes.BinaryOpNode and node.op == '+':
+            posicoes = _termos_soma(node)
+            termos = [getattr(d, c) for d, c in posicoes]
+            constantes = [t for t in termos if _literal_inteiro(t)]
+            if (len(constantes) > 1 or (constantes and constantes[0].value.lstrip('-') == '0')) \
+                    and _inteira(node, inteiras):
+                total = sum(int(c.value) for c in constantes)
+                outros = [t for t in termos if not _literal_inteiro(t)]
+                if rastro.optimizer:
+                    rastro.emitir("optimizer", DEBUG, "reassociate",
+                                  f"Otimização: {len(constantes)} constantes da soma na linha {node.linha} "
+                                  f"agrupadas em '{total}'.", linha=node.linha, constantes=len(constantes),
+                                  total=total)
+                if not outros:
+                    novo = nodes.NumberNode(value=str(total))
+                elif total < 0:
+                    # x + -3 vira x - 3
+                    novo = nodes.BinaryOpNode(_somar(outros, node.linha), Token(TokenType.SIMBOLO, '-', node.linha),
+                                              nodes.NumberNode(value=str(-total)))
+                elif total:
+                    novo = _somar(outros + [nodes.NumberNode(value=str(total))], node.linha)
+                else:
+                    novo = _somar(outros, node.linha)
+                setattr(dono, campo, novo)
+                if stats is not None:
+                    stats.reescritos += 1
+                    stats.removidos += len(constantes) - (1 if total or not outros else 0)
+                # Os termos restantes ainda podem conter outras somas: a nova
+                # soma é revisitada (tem no máximo uma constante, não nula)
+                posicoes = [(dono, campo)]
+            pilha.extend(posicoes)
+        elif isinstance(node, nodes.OPERACOES):
+            pilha.extend((node, filho) for filho in node.child_fields)
+    return raiz.expr
+
+def reassociar_somas(body, stats=None):
+    """Aplica reassociar a todas as expressões dos comandos de um corpo de função."""
+    inteiras = _variaveis_inteiras(body)
+    for stmt in body:
+        if isinstance(stmt, (nodes.VarDeclNode, nodes.AssignNode, nodes.ReturnNode)):
+            if stmt.expr_node is not None:
+                stmt.expr_node = reassociar(stmt.expr_node, inteiras, stats)
+        elif isinstance(stmt, nodes.FuncCallStmtNode):
+            stmt.arg_list = [reassociar(arg, inteiras, stats) for arg in stmt.arg_list]
+    return body
+
+class Optimizer(NodeVisitor):
+    def __init__(self, propagar=True, reassociar=True):
+        self.propagar = propagar
+        self.reassociar = reassociar
+        # Contadores lidos pelo gerenciador de passes
+        self.visitados = 0
+        self.reescritos = 0
+
+    def visit_list(self, nodes_list):
+        return [self.visit(item) for item in nodes_list]
 
     def generic_visit(self, node):
         # Para nós que não têm um método 'visit' específico,
         # simplesmente chamamos a visita em seus filhos.
-        for attr, value in node.__dict__.items():
-            if isinstance(value, list):
-                new_list = []
-                for item in value:
-                    if isinstance(item, nodes.Node):
-                        new_list.append(self.visit(item))
-                    else:
-                        new_list.append(item)
-                setattr(node, attr, new_list)
-            elif isinstance(value, nodes.Node):
+        self.visitados += 1
+        for attr in node.child_fields:
+            value = getattr(node, attr)
+            if value is not None:
                 setattr(node, attr, self.visit(value))
         return node
 
     def visit_BinaryOpNode(self, node):
-        # Visita os filhos primeiro, caso eles também possam ser otimizados
-        node.left = self.visit(node.left)
-        node.right = self.visit(node.right)
-
-        # A mágica do Constant Folding acontece aqui
-        if isinstance(node.left, nodes.NumberNode) and isinstance(node.right, nodes.NumberNode):
-            print(f"Otimização: Expressão '{node.left.value} {node.op_token.valor} {node.right.value}' será calculada agora.")
-            left_val = float(node.left.value)
-            right_val = float(node.right.value)
-            
-            result = 0
-            if node.op_token.valor == '+': result = left_val + right_val
-            elif node.op_token.valor == '-': result = left_val - right_val
-            elif node.op_token.valor == '*': result = left_val * right_val
-            elif node.op_token.valor == '/': result = left_val / right_val
-            
-            # Se o resultado for inteiro, mantenha como inteiro
-            if result == int(result):
-                result = int(result)
-
-            print(f"Otimização: Resultado calculado como '{result}'.")
-            # Substitui este nó de operação por um simples nó de número
-            return nodes.NumberNode(token=None, value=str(result))
-        
-        # Se não puder otimizar, retorna o nó original
-        return node
\ No newline at end of file
+        # Os filhos são otimizados antes do pai, caso também possam ser
+        # calculados; a pilha explícita evita recursão em cadeias longas.
+        return self.visit_postorder(node, self._dobrar)
+
+    visit_UnaryOpNode = visit_BinaryOpNode
+
+    def _dobrar(self, node, filhos):
+        _trocar_filhos(node, filhos)
+        self.visitados += 1
+        novo = dobrar(node)
+        if novo is not node:
+            self.reescritos += 1
+        return novo
+
+    def visit_FuncDeclNode(self, node):
+        node = self.generic_visit(node)
+        if self.reassociar:
+            node.body = reassociar_somas(node.body)
+        if self.propagar:
+            node.body = propagar_constantes(node.body)
+        return node
+
+class SemanticOptimizer(SemanticAnalyzer):
+    """
+    Análise semântica e constant folding numa única passagem pela AST.
+    Faz as mesmas verificações do SemanticAnalyzer e devolve a árvore
+    otimizada, idêntica à produzida por SemanticAnalyzer seguido de Optimizer.
+    """
+    def __init__(self, propagar=True, erros=None, reassociar=True, globais=()):
+        super().__init__(erros, globais)
+        self.propagar = propagar
+        self.reassociar = reassociar
+        self.visitados = 0
+        self.reescritos = 0
+
+    # Percorrem os filhos substituindo-os pelo resultado da visita
+    visit_list = Optimizer.visit_list
+    generic_visit = Optimizer.generic_visit
+
+    def visitar_corpo(self, node):
+        self.symbol_table.enter_scope()
+        node.body = self.visit(node.body)
+        self.symbol_table.leave_scope()
+        if self.reassociar:
+            node.body = reassociar_somas(node.body)
+        if self.propagar:
+            node.body = propagar_constantes(node.body)
+
+    def visit_VarDeclNode(self, node):
+        if node.expr_node:
+            node.expr_node = self.visit(node.expr_node)
+        node.symbol = Symbol(node.var_name, node.type_node.value)
+        self.define(node.symbol, node.linha)
+        return node
+
+    def visit_AssignNode(self, node):
+        node.expr_node = self.visit(node.expr_node)
+        node.symbol = self.resolve(node.var_name, node.linha)
+        return node
+
+    def visit_IdentifierNode(self, node):
+        node.symbol = self.resolve(node.value, node.linha)
+        return node
+
+    def visit_FuncCallStmtNode(self, node):
+        node.arg_list = self.visit(node.arg_list)
+        node.symbol = self.resolve_funcao(node.name, node.linha)
+        return node
+
+    def visit_ErrorNode(self, node):
+        SemanticAnalyzer.visit_ErrorNode(self, node)
+        return node
+
+    visit_BinaryOpNode = Optimizer.visit_BinaryOpNode
+    visit_UnaryOpNode = Optimizer.visit_BinaryOpNode
+    _dobrar = Optimizer._dobrar
+
+# --- Gerenciador de passes ---
+# Cada otimização é um passe com nome, registrado em PASSES. O PassManager
+# executa uma sequência de passes uma vez ou repetidamente até que nenhum
+# deles altere a árvore (ponto fixo), medindo cada um. Os níveis -O0/-O1/-O2
+# escolhem a sequência em NIVEIS_OTIMIZACAO.
+
+class PassStats:
+    """Estatísticas acumuladas de um passe ao longo de suas execuções."""
+    __slots__ = ('nome', 'execucoes', 'tempo', 'visitados', 'reescritos', 'removidos')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.execucoes = 0
+        self.tempo = 0.0      # segundos (relógio de parede)
+        self.visitados = 0
+        self.reescritos = 0
+        self.removidos = 0
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+class OptimizationPass:
+    """Base dos passes: run(ast, stats) retorna a AST transformada e acumula os contadores em 'stats'."""
+    nome = None
+
+    def run(self, ast, stats):
+        raise NotImplementedError
+
+class ConstantFoldingPass(OptimizationPass):
+    """Calcula as operações entre constantes de todas as expressões."""
+    nome = "constant-folding"
+
+    def run(self, ast, stats):
+        optimizer = Optimizer(propagar=False, reassociar=False)
+        ast = optimizer.visit(ast)
+        stats.visitados += optimizer.visitados
+        stats.reescritos += optimizer.reescritos
+        return ast
+
+class ConstantPropagationPass(OptimizationPass):
+    """Propaga constantes e cópias e remove atribuições mortas em cada função."""
+    nome = "constant-propagation"
+
+    def run(self, ast, stats):
+        for decl in ast.declarations:
+            if isinstance(decl, nodes.FuncDeclNode):
+                decl.body = propagar_constantes(decl.body, stats)
+        return ast
+
+class ReassociationPass(OptimizationPass):
+    """Junta os termos constantes das cadeias de '+' de inteiros em cada função."""
+    nome = "reassociation"
+
+    def run(self, ast, stats):
+        for decl in ast.declarations:
+            if isinstance(decl, nodes.FuncDeclNode):
+                decl.body = reassociar_somas(decl.body, stats)
+        return ast
+
+PASSES = {passe.nome: passe for passe in (ConstantFoldingPass, ReassociationPass, ConstantPropagationPass)}
+
+# nível -> (passes na ordem de execução, iterar até o ponto fixo)
+NIVEIS_OTIMIZACAO = {
+    0: ((), False),
+    1: (("constant-folding",), False),
+    2: (("constant-folding", "reassociation", "constant-propagation"), True),
+}
+
+class PassManager:
+    """
+    Executa os passes 'nomes' (chaves de PASSES) na ordem dada. Com
+    fixpoint=True, repete a sequência até uma rodada não reescrever nem
+    remover nenhum nó, ou até 'max_iteracoes' rodadas.
+    """
+    def __init__(self, nomes=(), fixpoint=False, max_iteracoes=10):
+        for nome in nomes:
+            if nome not in PASSES:
+                raise ValueError(f"Passe de otimização desconhecido: '{nome}'")
+        self.passes = [PASSES[nome]() for nome in nomes]
+        self.fixpoint = fixpoint
+        self.max_iteracoes = max_iteracoes
+        self.stats = {nome: PassStats(nome) for nome in nomes}
+        self.iteracoes = 0
+
+    @classmethod
+    def para_nivel(cls, nivel):
+        """Cria o gerenciador com os passes do nível de otimização (0, 1 ou 2)."""
+        nomes, fixpoint = NIVEIS_OTIMIZACAO[nivel]
+        return cls(nomes, fixpoint)
+
+    def run(self, ast):
+        while self.passes and self.iteracoes < self.max_iteracoes:
+            self.iteracoes += 1
+            alteracoes = 0
+            for passe in self.passes:
+                stats = self.stats[passe.nome]
+                antes = stats.reescritos + stats.removidos
+                inicio = time.perf_counter()
+                ast = passe.run(ast, stats)
+                duracao = time.perf_counter() - inicio
+                stats.tempo += duracao
+                stats.execucoes += 1
+                alteracoes_passe = stats.reescritos + stats.removidos - antes
+                alteracoes += alteracoes_passe
+                if rastro.optimizer:
+                    rastro.emitir("optimizer", INFO, "pass",
+                                  f"Otimização: passe '{passe.nome}' (rodada {self.iteracoes}): "
+                                  f"{alteracoes_passe} alterações em {duracao * 1000:.3f} ms",
+                                  passe=passe.nome, rodada=self.iteracoes, alteracoes=alteracoes_passe,
+                                  tempo=duracao)
+            if not self.fixpoint or not alteracoes:
+                break
+        return ast
+
+    def somar(self, stats, iteracoes):
+        """Acumula as estatísticas de outra execução dos mesmos passes (ex: sobre outra função)."""
+        for nome, outro in stats.items():
+            s = self.stats[nome]
+            for campo in ('execucoes', 'tempo', 'visitados', 'reescritos', 'removidos'):
+                setattr(s, campo, getattr(s, campo) + getattr(outro, campo))
+        self.iteracoes = max(self.iteracoes, iteracoes)
+
+    def relatorio(self):
+        """Tabela com as estatísticas de cada passe, pronta para imprimir."""
+        linhas = [f"{'Passe':<22} {'execuções':>9} {'tempo (ms)':>11} {'visitados':>10} "
+                  f"{'reescritos':>10} {'removidos':>10}"]
+        for s in self.stats.values():
+            linhas.append(f"{s.nome:<22} {s.execucoes:>9} {s.tempo * 1000:>11.3f} {s.visitados:>10} "
+                          f"{s.reescritos:>10} {s.removidos:>10}")
+        linhas.append(f"Rodadas: {self.iteracoes}")
+        return "\n".join(linhas)
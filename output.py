@@ -1,9 +1,5 @@
 def main():
-    valor = 30
-    saldo = 150.75
-    inicial = "J"
     print("Teste")
-    valor = (valor + 5)
     return 0
 
 if __name__ == '__main__':
@@ -0,0 +1,87 @@
+# paralelo.py
+#
+# Otimização e geração de código por função, num pool de processos. Depois
+# da análise semântica, que resolve as chamadas entre funções no escopo
+# global, as funções são independentes: os passes de otimização só olham o
+# corpo de cada função e o código gerado de uma não depende das outras (os
+# temporários são numerados por função). Cada função vira uma tarefa do pool
+# e os resultados são juntados na ordem do programa, de modo que a saída é a
+# mesma da compilação sequencial, com qualquer número de processos.
+#
+# As funções chegam aos workers por herança de memória (fork, onde houver;
+# senão, no formato binário de serializacao) e voltam otimizadas nesse
+# formato, junto com o código gerado e as estatísticas dos passes.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from gerador_codigo import CodeGenerator
+from nodes import ProgramNode
+from otimizador import PassManager
+from rastreio import rastro
+from serializacao import desserializar_ast, serializar_ast
+
+# Programa em compilação, herdado pelos workers criados por fork
+_programa = None
+
+def otimizar_funcao(funcao, nivel=2, gerar=True):
+    """
+    Otimiza uma declaração de função e, com gerar=True, gera o seu código.
+    Retorna (declaração otimizada, código ou None, PassManager usado).
+    """
+    pass_manager = PassManager.para_nivel(nivel)
+    funcao = pass_manager.run(ProgramNode([funcao])).declarations[0]
+    codigo = None
+    if gerar:
+        partes = []
+        CodeGenerator(sink=partes).visit(funcao)
+        codigo = "".join(partes)
+    return funcao, codigo, pass_manager
+
+def _tarefa(funcao, nivel, gerar):
+    # Executada nos workers: 'funcao' é o índice no programa herdado ou a função serializada
+    funcao = _programa.declarations[funcao] if isinstance(funcao, int) else desserializar_ast(funcao)
+    funcao, codigo, pass_manager = otimizar_funcao(funcao, nivel, gerar)
+    return serializar_ast(funcao), codigo, pass_manager.stats, pass_manager.iteracoes
+
+def otimizar_e_gerar(programa, nivel=2, jobs=None, gerar=True):
+    """
+    Otimiza as funções de 'programa' (já analisado) e, com gerar=True, gera
+    o código de cada uma, em até 'jobs' processos (padrão: um por núcleo).
+    Retorna (AST otimizada, lista com o código de cada função ou None,
+    PassManager com as estatísticas de todas as funções).
+
+    Com um único processo, uma única função ou o rastreamento ligado (os
+    eventos dos workers não chegariam aos destinos deste processo), tudo
+    roda aqui mesmo, função por função.
+    """
+    global _programa
+    jobs = jobs or os.cpu_count()
+    funcoes = programa.declarations
+    total = PassManager.para_nivel(nivel)
+    resultados = []
+    if jobs <= 1 or len(funcoes) <= 1 or any(rastro.niveis().values()):
+        for funcao in funcoes:
+            funcao, codigo, pass_manager = otimizar_funcao(funcao, nivel, gerar)
+            total.somar(pass_manager.stats, pass_manager.iteracoes)
+            resultados.append((funcao, codigo))
+    else:
+        fork = "fork" in multiprocessing.get_all_start_methods()
+        contexto = multiprocessing.get_context("fork" if fork else None)
+        # As maiores primeiro: as últimas tarefas a começar são as menores, e
+        # o tempo total fica perto do da maior função
+        ordem = sorted(range(len(funcoes)), key=lambda i: -len(getattr(funcoes[i], 'body', ())))
+        _programa = programa
+        try:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(funcoes)), mp_context=contexto) as pool:
+                futuros = {i: pool.submit(_tarefa, i if fork else serializar_ast(funcoes[i]), nivel, gerar)
+                           for i in ordem}
+                for i in range(len(funcoes)):
+                    dados, codigo, stats, iteracoes = futuros[i].result()
+                    total.somar(stats, iteracoes)
+                    resultados.append((desserializar_ast(dados), codigo))
+        finally:
+            _programa = None
+    programa.declarations = [funcao for funcao, _ in resultados]
+    codigo = [codigo for _, codigo in resultados] if gerar else None
+    return programa, codigo, total
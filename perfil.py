@@ -0,0 +1,147 @@
+# perfil.py
+#
+# Perfil de compilação por fase: tempo de parede e de CPU, quantidade de
+# tokens ou nós processados, pico de memória (tracemalloc) e, opcionalmente,
+# as funções mais caras de cada fase segundo o cProfile. O relatório é um
+# dicionário serializável em JSON, que o lote e o servidor somam com
+# agregar_perfis.
+import contextlib
+import cProfile
+import pstats
+import time
+import tracemalloc
+
+def contar_nos(raiz):
+    """Número de nós da AST (percurso com pilha explícita)."""
+    total = 0
+    pilha = [raiz]
+    while pilha:
+        no = pilha.pop()
+        total += 1
+        pilha.extend(no.iter_children())
+    return total
+
+class PhaseProfile:
+    """Medidas de uma fase."""
+    __slots__ = ('nome', 'tempo', 'tempo_cpu', 'itens', 'unidade', 'pico_memoria', 'funcoes')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.tempo = 0.0
+        self.tempo_cpu = 0.0
+        self.itens = 0          # tokens (fase léxica) ou nós da AST
+        self.unidade = None
+        self.pico_memoria = None
+        self.funcoes = None     # funções mais caras, se o cProfile estiver ligado
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__ if campo != 'nome'}
+
+class CompileProfiler:
+    """
+    Coleta o perfil das fases de uma compilação. Cada fase roda dentro de
+    'with perfil.fase(nome):'; depois, perfil.contar(nome, itens, unidade)
+    registra quantos tokens ou nós ela processou.
+
+    memoria=True mede o pico de memória de cada fase com o tracemalloc;
+    cprofile=True roda cada fase sob o cProfile e guarda as 'top' funções de
+    maior tempo acumulado. Ambos deixam a compilação mais lenta.
+    """
+    def __init__(self, memoria=True, cprofile=False, top=15):
+        self.memoria = memoria
+        self.cprofile = cprofile
+        self.top = top
+        self.fases = {}
+
+    @contextlib.contextmanager
+    def fase(self, nome):
+        medida = self.fases.setdefault(nome, PhaseProfile(nome))
+        iniciou_trace = False
+        if self.memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                iniciou_trace = True
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.cprofile else None
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield medida
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            medida.tempo += time.perf_counter() - inicio
+            medida.tempo_cpu += time.process_time() - inicio_cpu
+            if self.memoria:
+                pico = tracemalloc.get_traced_memory()[1]
+                medida.pico_memoria = max(medida.pico_memoria or 0, pico)
+                if iniciou_trace:
+                    tracemalloc.stop()
+            if profiler is not None:
+                medida.funcoes = self._funcoes(profiler)
+
+    def contar(self, nome, itens, unidade):
+        medida = self.fases[nome]
+        medida.itens += itens
+        medida.unidade = unidade
+
+    def _funcoes(self, profiler):
+        estatisticas = pstats.Stats(profiler)
+        linhas = []
+        for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in estatisticas.stats.items():
+            linhas.append({"funcao": f"{arquivo}:{linha}({funcao})", "chamadas": chamadas,
+                           "tempo_proprio": proprio, "tempo_acumulado": acumulado})
+        linhas.sort(key=lambda f: f["tempo_acumulado"], reverse=True)
+        return linhas[:self.top]
+
+    def como_dict(self):
+        """Relatório serializável em JSON: {"fases": {nome: medidas}, "total": {...}}."""
+        fases = {nome: medida.como_dict() for nome, medida in self.fases.items()}
+        total = {"tempo": sum(m.tempo for m in self.fases.values()),
+                 "tempo_cpu": sum(m.tempo_cpu for m in self.fases.values())}
+        return {"fases": fases, "total": total}
+
+    def relatorio(self):
+        return formatar_perfil(self.como_dict())
+
+def formatar_perfil(perfil):
+    """Tabela legível de um relatório (de CompileProfiler ou de agregar_perfis)."""
+    linhas = [f"{'Fase':<22} {'parede (ms)':>12} {'CPU (ms)':>10} {'itens':>10} {'itens/s':>12} "
+              f"{'pico mem (KiB)':>15}"]
+    for nome, m in perfil["fases"].items():
+        vazao = f"{m['itens'] / m['tempo']:,.0f}" if m["tempo"] else "-"
+        pico = f"{m['pico_memoria'] / 1024:,.1f}" if m["pico_memoria"] is not None else "-"
+        itens = f"{m['itens']} {m['unidade'] or ''}".strip()
+        linhas.append(f"{nome:<22} {m['tempo'] * 1000:>12.3f} {m['tempo_cpu'] * 1000:>10.3f} {itens:>10} "
+                      f"{vazao:>12} {pico:>15}")
+        for f in m.get("funcoes") or ():
+            linhas.append(f"    {f['tempo_acumulado'] * 1000:>9.3f} ms  {f['chamadas']:>8}x  {f['funcao']}")
+    total = perfil["total"]
+    linhas.append(f"{'Total':<22} {total['tempo'] * 1000:>12.3f} {total['tempo_cpu'] * 1000:>10.3f}")
+    if "compilacoes" in perfil:
+        linhas.append(f"Compilações: {perfil['compilacoes']}")
+    return "\n".join(linhas)
+
+def agregar_perfis(perfis):
+    """
+    Soma vários relatórios (dicionários de CompileProfiler.como_dict, ex: um
+    por arquivo do lote): tempos e itens somados, pico de memória máximo.
+    As listas do cProfile não são agregadas.
+    """
+    fases = {}
+    total = {"tempo": 0.0, "tempo_cpu": 0.0}
+    compilacoes = 0
+    for perfil in perfis:
+        compilacoes += perfil.get("compilacoes", 1)
+        for nome, m in perfil["fases"].items():
+            soma = fases.setdefault(nome, {"tempo": 0.0, "tempo_cpu": 0.0, "itens": 0,
+                                           "unidade": m["unidade"], "pico_memoria": None, "funcoes": None})
+            soma["tempo"] += m["tempo"]
+            soma["tempo_cpu"] += m["tempo_cpu"]
+            soma["itens"] += m["itens"]
+            if m["pico_memoria"] is not None:
+                soma["pico_memoria"] = max(soma["pico_memoria"] or 0, m["pico_memoria"])
+        total["tempo"] += perfil["total"]["tempo"]
+        total["tempo_cpu"] += perfil["total"]["tempo_cpu"]
+    return {"fases": fases, "total": total, "compilacoes": compilacoes}
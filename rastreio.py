@@ -0,0 +1,113 @@
+# rastreio.py
+#
+# Rastreamento estruturado do compilador. Cada evento pertence a uma
+# categoria (lexer, symtab, optimizer, codegen) e tem um nível (info ou
+# debug); só são emitidos os eventos das categorias ligadas, até o nível
+# escolhido para cada uma. Os eventos vão para um ou mais destinos: texto
+# legível (a mensagem, como os antigos prints) ou JSON Lines, um objeto por
+# linha, para consumo por outras ferramentas.
+#
+# Com o rastreamento desligado, cada ponto de rastreamento custa só a
+# verificação de um atributo:
+#
+#     if rastro.symtab:
+#         rastro.emitir("symtab", DEBUG, "lookup", f"Buscando por '{name}'...", nome=name)
+#
+# 'rastro' é o rastreador global do processo; configure-o com ligar/desligar
+# (ou pelo contexto 'rastreando'), nunca rebinde o nome.
+import contextlib
+import json
+import sys
+import time
+
+CATEGORIAS = ("lexer", "symtab", "optimizer", "codegen")
+
+INFO, DEBUG = 1, 2
+NIVEIS = {"info": INFO, "debug": DEBUG}
+NOMES_NIVEIS = {valor: nome for nome, valor in NIVEIS.items()}
+
+class TextSink:
+    """Escreve a mensagem de cada evento, uma por linha (padrão: stdout)."""
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo
+
+    def escrever(self, evento):
+        print(evento["mensagem"], file=self.arquivo or sys.stdout)
+
+class JsonLinesSink:
+    """Escreve cada evento como um objeto JSON numa linha."""
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+
+    def escrever(self, evento):
+        self.arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+
+class Tracer:
+    """
+    Rastreador com um atributo por categoria, que vale o nível máximo
+    emitido (0 = desligada). Os pontos de rastreamento testam esse atributo
+    antes de montar a mensagem e chamar emitir.
+    """
+    __slots__ = CATEGORIAS + ('destinos', 'inicio')
+
+    def __init__(self):
+        self.desligar()
+
+    def ligar(self, niveis, destinos=None):
+        """Liga as categorias de 'niveis' ({categoria: nível}) e troca os destinos (padrão: texto no stdout)."""
+        for categoria, nivel in niveis.items():
+            if categoria not in CATEGORIAS:
+                raise ValueError(f"Categoria de rastreamento desconhecida: '{categoria}'")
+            setattr(self, categoria, nivel)
+        self.destinos = list(destinos) if destinos is not None else [TextSink()]
+        self.inicio = time.perf_counter()
+
+    def desligar(self):
+        for categoria in CATEGORIAS:
+            setattr(self, categoria, 0)
+        self.destinos = []
+        self.inicio = time.perf_counter()
+
+    def niveis(self):
+        return {categoria: getattr(self, categoria) for categoria in CATEGORIAS}
+
+    def emitir(self, categoria, nivel, evento, mensagem, **campos):
+        if nivel > getattr(self, categoria):
+            return
+        registro = {"t": round(time.perf_counter() - self.inicio, 6), "categoria": categoria,
+                    "nivel": NOMES_NIVEIS[nivel], "evento": evento, "mensagem": mensagem}
+        registro.update(campos)
+        for destino in self.destinos:
+            destino.escrever(registro)
+
+rastro = Tracer()
+
+def interpretar_categorias(especificacao):
+    """
+    Converte 'symtab:debug,optimizer' em {categoria: nível}. Sem ':nível',
+    vale info; 'all' liga todas as categorias.
+    """
+    niveis = {}
+    for item in especificacao.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        nome, _, nivel = item.partition(":")
+        if nome != "all" and nome not in CATEGORIAS:
+            raise ValueError(f"Categoria de rastreamento desconhecida: '{nome}'")
+        if nivel and nivel not in NIVEIS:
+            raise ValueError(f"Nível de rastreamento desconhecido: '{nivel}' (use info ou debug)")
+        for categoria in (CATEGORIAS if nome == "all" else (nome,)):
+            niveis[categoria] = NIVEIS[nivel or "info"]
+    return niveis
+
+@contextlib.contextmanager
+def rastreando(niveis, destinos=None):
+    """Liga o rastreamento durante o bloco 'with' e restaura a configuração anterior."""
+    anteriores, destinos_anteriores = rastro.niveis(), rastro.destinos
+    rastro.ligar(niveis, destinos)
+    try:
+        yield rastro
+    finally:
+        rastro.desligar()
+        rastro.ligar(anteriores, destinos_anteriores)
@@ -1,93 +1,208 @@
 # semantico.py
-import nodes
+from nodes import FuncDeclNode
+from rastreio import rastro, DEBUG, INFO
+from visitor import NodeVisitor
+
+# Funções embutidas, definidas no escopo global antes das do programa
+FUNCOES_EMBUTIDAS = ('print', 'printf')
 
 class Symbol:
     """Representa um símbolo (variável ou função) na tabela."""
     def __init__(self, name, symbol_type):
         self.name = name
         self.type = symbol_type
+        # Preenchidos pela SymbolTable ao definir o símbolo
+        self.scope_level = None
+        self.slot = None
 
 class SymbolTable:
     """
-    Gerencia uma pilha de escopos. Cada escopo é um dicionário de símbolos.
+    Gerencia uma pilha de escopos. Cada nome tem sua própria pilha de
+    sombreamento em 'symbols' (o topo é a definição visível), de modo que
+    define e lookup custam O(1) independentemente da profundidade. Cada escopo
+    guarda apenas a lista dos nomes que definiu, usada para desfazer todas as
+    suas definições de uma vez ao sair.
+
+    Os símbolos recebem um 'slot': a posição no escopo global ou, dentro de
+    funções, no quadro local (escopos aninhados continuam a numeração do
+    escopo que os contém).
     """
     def __init__(self):
-        self.scoped_tables = [{}]  # Começa com o escopo global (nível 0)
+        self.symbols = {}
+        self.scopes = [[]]  # Começa com o escopo global (nível 0)
+        self.next_slots = [0]
 
     @property
     def current_scope_level(self):
-        return len(self.scoped_tables) - 1
+        return len(self.scopes) - 1
 
     def enter_scope(self):
-        """Entra em um novo escopo empilhando uma nova tabela."""
-        self.scoped_tables.append({})
-        print(f"INFO (Tabela de Símbolos): Entrando no escopo, nível {self.current_scope_level}")
+        """Entra em um novo escopo empilhando uma nova lista de nomes."""
+        first_slot = self.next_slots[-1] if self.current_scope_level > 0 else 0
+        self.scopes.append([])
+        self.next_slots.append(first_slot)
+        if rastro.symtab:
+            rastro.emitir("symtab", INFO, "enter_scope",
+                          f"INFO (Tabela de Símbolos): Entrando no escopo, nível {self.current_scope_level}",
+                          nivel_escopo=self.current_scope_level)
 
     def leave_scope(self):
-        """Sai do escopo atual desempilhando a tabela e seus símbolos."""
-        print(f"INFO (Tabela de Símbolos): Saindo do escopo, voltando para o nível {self.current_scope_level - 1}")
-        for name in self.scoped_tables[-1]:
-            print(f"INFO (Tabela de Símbolos): Removendo símbolo '{name}' do escopo {self.current_scope_level}")
-        self.scoped_tables.pop()
+        """Sai do escopo atual removendo de uma vez todos os seus símbolos."""
+        if rastro.symtab:
+            rastro.emitir("symtab", INFO, "leave_scope",
+                          f"INFO (Tabela de Símbolos): Saindo do escopo, voltando para o nível "
+                          f"{self.current_scope_level - 1}", nivel_escopo=self.current_scope_level - 1)
+        for name in self.scopes[-1]:
+            if rastro.symtab:
+                rastro.emitir("symtab", DEBUG, "remove",
+                              f"INFO (Tabela de Símbolos): Removendo símbolo '{name}' do escopo "
+                              f"{self.current_scope_level}", nome=name, nivel_escopo=self.current_scope_level)
+            shadow_stack = self.symbols[name]
+            shadow_stack.pop()
+            if not shadow_stack:
+                del self.symbols[name]
+        self.scopes.pop()
+        self.next_slots.pop()
 
     def define(self, symbol):
         """Define um símbolo no escopo atual."""
-        print(f"INFO (Tabela de Símbolos): Adicionando símbolo '{symbol.name}' (tipo: {symbol.type}) ao escopo {self.current_scope_level}")
-        table = self.scoped_tables[-1]
-        if symbol.name in table:
+        if rastro.symtab:
+            rastro.emitir("symtab", INFO, "define",
+                          f"INFO (Tabela de Símbolos): Adicionando símbolo '{symbol.name}' (tipo: {symbol.type}) "
+                          f"ao escopo {self.current_scope_level}",
+                          nome=symbol.name, tipo=symbol.type, nivel_escopo=self.current_scope_level)
+        level = self.current_scope_level
+        shadow_stack = self.symbols.setdefault(symbol.name, [])
+        if shadow_stack and shadow_stack[-1].scope_level == level:
             raise NameError(f"Erro: Símbolo '{symbol.name}' já definido neste escopo.")
-        table[symbol.name] = symbol
+        symbol.scope_level = level
+        symbol.slot = self.next_slots[-1]
+        self.next_slots[-1] += 1
+        shadow_stack.append(symbol)
+        self.scopes[-1].append(symbol.name)
 
     def lookup(self, name):
-        """Busca por um símbolo do escopo mais interno para o mais externo."""
-        print(f"INFO (Tabela de Símbolos): Buscando por '{name}'...")
-        for i in range(len(self.scoped_tables) - 1, -1, -1):
-            table = self.scoped_tables[i]
-            if name in table:
-                return table[name]
-        return None
-
-class SemanticAnalyzer:
-    def __init__(self):
+        """Busca pela definição visível de um símbolo (a mais interna)."""
+        if rastro.symtab:
+            rastro.emitir("symtab", DEBUG, "lookup", f"INFO (Tabela de Símbolos): Buscando por '{name}'...",
+                          nome=name)
+        shadow_stack = self.symbols.get(name)
+        return shadow_stack[-1] if shadow_stack else None
+
+class SemanticAnalyzer(NodeVisitor):
+    """
+    Resolve os nomes da AST. Por padrão, o primeiro erro levanta NameError;
+    se uma lista 'erros' for dada, os erros são acrescentados a ela (com o
+    atributo 'linha') e a análise continua.
+
+    As funções do programa ficam no escopo global, junto com as embutidas, e
+    são todas definidas antes de qualquer corpo ser analisado: uma função
+    pode chamar as declaradas depois dela. 'globais' são nomes de funções
+    definidas fora da AST analisada (ex: as outras funções do arquivo, quando
+    o modo de observação recompila só uma parte dele).
+    """
+    def __init__(self, erros=None, globais=()):
+        self.erros = erros
         self.symbol_table = SymbolTable()
-        self.symbol_table.define(Symbol('print', 'function'))
-
-    def visit(self, node):
-        # ############################################################### #
-        # A CORREÇÃO ESTÁ AQUI                                            #
-        # Verificamos se o nó é uma lista e a percorremos.                #
-        # ############################################################### #
-        if isinstance(node, list):
-            for item in node:
-                self.visit(item)
-            return
-
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        for name in FUNCOES_EMBUTIDAS + tuple(globais):
+            self.symbol_table.define(Symbol(name, 'function'))
+
+    def visit_list(self, nodes_list):
+        for item in nodes_list:
+            self.visit(item)
 
     def generic_visit(self, node):
-        for child in node.__dict__.values():
-            if isinstance(child, list):
-                for item in child:
-                    if isinstance(item, nodes.Node):
-                        self.visit(item)
-            elif isinstance(child, nodes.Node):
-                self.visit(child)
+        # Os descendentes sem método 'visit' próprio (operações, return,
+        # chamadas...) são percorridos na mesma pilha explícita, de modo que
+        # expressões profundas não geram recursão.
+        pilha = list(node.iter_children())
+        pilha.reverse()
+        while pilha:
+            child = pilha.pop()
+            handler = self._dispatch.get(child.__class__) or self._resolve(child.__class__)
+            if handler is SemanticAnalyzer.generic_visit:
+                netos = list(child.iter_children())
+                netos.reverse()
+                pilha.extend(netos)
+            else:
+                handler(self, child)
     
+    # As declarações e referências resolvidas recebem o Symbol correspondente
+    # em 'node.symbol', para que as fases seguintes não precisem buscá-lo.
+    def visit_ProgramNode(self, node):
+        for decl in node.declarations:
+            if isinstance(decl, FuncDeclNode):
+                self.declarar_funcao(decl)
+        for decl in node.declarations:
+            # Função com o cabeçalho inválido (ErrorNode): o nome ainda é
+            # definido, para que as chamadas a ela não gerem erros
+            if not isinstance(decl, FuncDeclNode) and decl.var_name is not None \
+                    and self.symbol_table.lookup(decl.var_name) is None:
+                self.symbol_table.define(Symbol(decl.var_name, 'function'))
+        for decl in node.declarations:
+            self.visitar_corpo(decl)
+        return node
+
     def visit_FuncDeclNode(self, node):
-        self.symbol_table.define(Symbol(node.name, 'function'))
+        self.declarar_funcao(node)
+        self.visitar_corpo(node)
+        return node
+
+    def declarar_funcao(self, node):
+        node.symbol = Symbol(node.name, 'function')
+        self.define(node.symbol, node.linha)
+
+    def visitar_corpo(self, node):
         self.symbol_table.enter_scope()
-        self.visit(node.body)  # Agora esta chamada funcionará corretamente
+        self.visit(node.body)
         self.symbol_table.leave_scope()
 
     def visit_VarDeclNode(self, node):
         if node.expr_node:
             self.visit(node.expr_node)
-        var_symbol = Symbol(node.var_name, node.type_node.value)
-        self.symbol_table.define(var_symbol)
+        node.symbol = Symbol(node.var_name, node.type_node.value)
+        self.define(node.symbol, node.linha)
+
+    def visit_AssignNode(self, node):
+        self.visit(node.expr_node)
+        node.symbol = self.resolve(node.var_name, node.linha)
 
     def visit_IdentifierNode(self, node):
-        symbol = self.symbol_table.lookup(node.value)
+        node.symbol = self.resolve(node.value, node.linha)
+
+    def visit_FuncCallStmtNode(self, node):
+        self.visit(node.arg_list)
+        node.symbol = self.resolve_funcao(node.name, node.linha)
+
+    def visit_ErrorNode(self, node):
+        # O nome de uma declaração com erro de sintaxe ainda é definido, para
+        # que seus usos não gerem erros em cascata.
+        if node.var_name is not None and self.symbol_table.lookup(node.var_name) is None:
+            self.symbol_table.define(Symbol(node.var_name, 'erro'))
+
+    def define(self, symbol, linha=None):
+        try:
+            self.symbol_table.define(symbol)
+        except NameError as erro:
+            self._erro(erro, linha)
+
+    def resolve(self, name, linha=None):
+        symbol = self.symbol_table.lookup(name)
+        if not symbol:
+            self._erro(NameError(f"Erro: Variável '{name}' não foi declarada."), linha)
+        return symbol
+
+    def resolve_funcao(self, name, linha=None):
+        symbol = self.symbol_table.lookup(name)
         if not symbol:
-            raise NameError(f"Erro: Variável '{node.value}' não foi declarada.")
\ No newline at end of file
+            self._erro(NameError(f"Erro: Função '{name}' não foi declarada."), linha)
+        elif symbol.type != 'function':
+            self._erro(NameError(f"Erro: '{name}' não é uma função."), linha)
+            return None
+        return symbol
+
+    def _erro(self, erro, linha):
+        if self.erros is None:
+            raise erro
+        erro.linha = linha
+        self.erros.append(erro)
\ No newline at end of file
@@ -0,0 +1,332 @@
+# serializacao.py
+#
+# Formato binário compacto e versionado para sequências de tokens e ASTs,
+# usado para guardar resultados intermediários (ex: no cache), enviá-los a
+# outros processos e inspecioná-los. Bem menor que o pickle, que guarda
+# cada Token e cada nó como um objeto com nome de classe, enum e atributos,
+# e várias vezes mais rápido em programas grandes (ver
+# benchmark.bench_serializacao).
+#
+# Estrutura de um arquivo (inteiros little-endian):
+#
+#   cabeçalho   b"CMPB", versão (1 byte), conteúdo (1 byte: T = tokens, A = AST)
+#   seções      cada uma: número de itens (uint32) e os dados
+#
+# A primeira seção é a tabela de strings: os comprimentos (uint32, em
+# caracteres) e o texto UTF-8 de todas as strings concatenadas. Nas demais
+# seções, strings são índices nessa tabela e -1 representa None.
+#
+# Tokens (T): os nomes dos TokenType na ordem dos códigos usados, e as três
+# colunas de um tokens.TokenBuffer (tipo, linha, lexema).
+#
+# AST (A): os Symbol resolvidos pela análise semântica (nome, tipo, escopo,
+# slot) e os nós como registros de inteiros em pós-ordem: os filhos vêm
+# antes do pai, cujo registro é o código do nó, seus campos escalares e o
+# tamanho de suas listas de filhos. A leitura é uma única passada com uma
+# pilha, sem recursão, mesmo em expressões muito profundas.
+import gc
+import struct
+import sys
+from array import array
+
+import nodes
+from semantico import Symbol
+from tokens import TIPOS, TokenBuffer, TokenType
+
+MAGICO = b"CMPB"
+VERSAO = 3  # 2: FuncCallStmtNode guarda o Symbol da função chamada; 3: ErrorNode.body
+CABECALHO = struct.Struct("<4sBc")
+CONTAGEM = struct.Struct("<I")
+
+# Campos escalares de cada nó: 's' string, 'i' inteiro ou None (linha),
+# 'y' Symbol. Filhos: os campos de child_fields, com '*' nos que são listas.
+# Os códigos dos nós são a posição nesta tabela (0 = filho ausente); mudá-la
+# exige uma nova VERSAO.
+ESQUEMA = (
+    (nodes.ProgramNode, (), ("*declarations",)),
+    (nodes.FuncDeclNode, (("name", "s"), ("linha", "i"), ("symbol", "y")), ("type_node", "*body")),
+    (nodes.VarDeclNode, (("var_name", "s"), ("linha", "i"), ("symbol", "y")), ("type_node", "expr_node")),
+    (nodes.AssignNode, (("var_name", "s"), ("linha", "i"), ("symbol", "y")), ("expr_node",)),
+    (nodes.ReturnNode, (("linha", "i"),), ("expr_node",)),
+    (nodes.FuncCallStmtNode, (("name", "s"), ("linha", "i"), ("symbol", "y")), ("*arg_list",)),
+    (nodes.BinaryOpNode, (("op", "s"), ("linha", "i")), ("left", "right")),
+    (nodes.UnaryOpNode, (("op", "s"), ("linha", "i")), ("operand",)),
+    (nodes.TypeNode, (("value", "s"), ("linha", "i")), ()),
+    (nodes.IdentifierNode, (("value", "s"), ("linha", "i"), ("symbol", "y")), ()),
+    (nodes.NumberNode, (("value", "s"), ("linha", "i")), ()),
+    (nodes.StringNode, (("value", "s"), ("linha", "i")), ()),
+    (nodes.CharNode, (("value", "s"), ("linha", "i")), ()),
+    (nodes.ErrorNode, (("message", "s"), ("linha", "i"), ("var_name", "s")), ("*body",)),
+)
+AUSENTE = 0
+CODIGO_NO = {classe: codigo for codigo, (classe, _, _) in enumerate(ESQUEMA, start=1)}
+
+def _little_endian(coluna):
+    if sys.byteorder == "big":
+        coluna = array(coluna.typecode, coluna)
+        coluna.byteswap()
+    return coluna
+
+class _Escritor:
+    """Monta as seções de um arquivo, com a tabela de strings compartilhada."""
+    def __init__(self, conteudo):
+        self.conteudo = conteudo
+        self.strings = []
+        self._indices = {}
+        self.secoes = []
+
+    def string(self, valor):
+        if valor is None:
+            return -1
+        indice = self._indices.get(valor)
+        if indice is None:
+            indice = self._indices[valor] = len(self.strings)
+            self.strings.append(valor)
+        return indice
+
+    def secao(self, coluna):
+        self.secoes.append(CONTAGEM.pack(len(coluna)))
+        self.secoes.append(_little_endian(coluna).tobytes())
+
+    def bytes(self):
+        comprimentos = array('I', map(len, self.strings))
+        texto = "".join(self.strings).encode("utf-8")
+        partes = [CABECALHO.pack(MAGICO, VERSAO, self.conteudo), CONTAGEM.pack(len(comprimentos)),
+                  _little_endian(comprimentos).tobytes(), CONTAGEM.pack(len(texto)), texto]
+        return b"".join(partes + self.secoes)
+
+class _Leitor:
+    def __init__(self, dados, conteudo):
+        dados = memoryview(dados)
+        if len(dados) < CABECALHO.size:
+            raise ValueError("Dados serializados truncados")
+        magico, versao, tipo = CABECALHO.unpack_from(dados)
+        if magico != MAGICO:
+            raise ValueError("Não é um arquivo serializado do compilador")
+        if versao != VERSAO:
+            raise ValueError(f"Versão {versao} do formato não suportada (esperada: {VERSAO})")
+        if tipo != conteudo:
+            raise ValueError(f"O arquivo contém '{tipo.decode()}', esperado '{conteudo.decode()}'")
+        self.dados = dados
+        self.pos = CABECALHO.size
+        comprimentos = self.coluna('I')
+        texto = bytes(self.bloco()).decode("utf-8")
+        self.strings = strings = []
+        inicio = 0
+        for comprimento in comprimentos:
+            strings.append(texto[inicio:inicio + comprimento])
+            inicio += comprimento
+
+    def bloco(self):
+        (tamanho,) = CONTAGEM.unpack_from(self.dados, self.pos)
+        inicio = self.pos + CONTAGEM.size
+        self.pos = inicio + tamanho
+        if self.pos > len(self.dados):
+            raise ValueError("Dados serializados truncados")
+        return self.dados[inicio:self.pos]
+
+    def coluna(self, typecode):
+        coluna = array(typecode)
+        (itens,) = CONTAGEM.unpack_from(self.dados, self.pos)
+        inicio = self.pos + CONTAGEM.size
+        self.pos = inicio + itens * coluna.itemsize
+        if self.pos > len(self.dados):
+            raise ValueError("Dados serializados truncados")
+        coluna.frombytes(self.dados[inicio:self.pos])
+        return _little_endian(coluna)
+
+# --- Tokens ---
+
+def serializar_tokens(tokens):
+    """Serializa um TokenBuffer ou qualquer iterável de Token."""
+    if not isinstance(tokens, TokenBuffer):
+        tokens = TokenBuffer(tokens)
+    escritor = _Escritor(b"T")
+    # A tabela de strings começa pela tabela de lexemas do buffer, então os
+    # índices da coluna de lexemas são gravados como estão
+    escritor.strings = list(tokens.strings)
+    escritor._indices = dict(tokens._indices)
+    escritor.secao(array('I', (escritor.string(tipo.value) for tipo in TIPOS)))
+    escritor.secao(tokens.tipos)
+    escritor.secao(tokens.linhas)
+    escritor.secao(tokens.valores)
+    return escritor.bytes()
+
+def desserializar_tokens(dados):
+    """Lê tokens serializados como um TokenBuffer (sem criar objetos Token)."""
+    leitor = _Leitor(dados, b"T")
+    nomes = [leitor.strings[i] for i in leitor.coluna('I')]
+    tipos = leitor.coluna('B')
+    linhas = leitor.coluna('I')
+    valores = leitor.coluna('I')
+    # Os códigos gravados seguem a ordem dos TokenType de quem gravou
+    atuais = [TIPOS.index(TokenType(nome)) for nome in nomes]
+    if atuais != list(range(len(atuais))):
+        tipos = array('B', bytes(atuais[codigo] for codigo in tipos))
+    buffer = TokenBuffer()
+    buffer.tipos, buffer.linhas, buffer.valores = tipos, linhas, valores
+    buffer.strings = leitor.strings
+    buffer._indices = {valor: indice for indice, valor in enumerate(leitor.strings)}
+    return buffer
+
+# --- AST ---
+
+# Por classe: (código, escalares [(campo, tipo)], filhos [(campo, é lista)]).
+# Cada nó tem no máximo uma lista de filhos, cujo tamanho fecha o registro.
+_STRING, _INTEIRO, _SIMBOLO = 0, 1, 2
+_TIPOS_ESCALARES = {"s": _STRING, "i": _INTEIRO, "y": _SIMBOLO}
+_FORMATOS = {classe: (CODIGO_NO[classe], tuple((campo, _TIPOS_ESCALARES[tipo]) for campo, tipo in escalares),
+                      tuple((campo.lstrip("*"), campo[0] == "*") for campo in filhos))
+             for classe, escalares, filhos in ESQUEMA}
+assert all(sum(lista for _, lista in filhos) <= 1 for _, _, filhos in _FORMATOS.values())
+
+def serializar_ast(raiz):
+    """Serializa uma AST (antes ou depois da análise semântica e da otimização)."""
+    escritor = _Escritor(b"A")
+    string = escritor.string
+    simbolos = {}       # id(Symbol) -> índice
+    tabela = array('i')
+
+    # Pré-ordem com os filhos empilhados na ordem: de trás para frente, a
+    # sequência é a pós-ordem, sem marcar na pilha os nós já expandidos.
+    ordem = []
+    pilha = [raiz]
+    while pilha:
+        node = pilha.pop()
+        ordem.append(node)
+        if node is not None:
+            for campo, lista in _FORMATOS[node.__class__][2]:
+                if lista:
+                    pilha.extend(getattr(node, campo))
+                else:
+                    pilha.append(getattr(node, campo))
+
+    registros = []
+    gravar = registros.append
+    for node in reversed(ordem):
+        if node is None:
+            gravar(AUSENTE)
+            continue
+        codigo, escalares, filhos = _FORMATOS[node.__class__]
+        gravar(codigo)
+        for campo, tipo in escalares:
+            valor = getattr(node, campo)
+            if valor is None:
+                gravar(-1)
+            elif tipo == _STRING:
+                gravar(string(valor))
+            elif tipo == _INTEIRO:
+                gravar(valor)
+            else:
+                indice = simbolos.get(id(valor))
+                if indice is None:
+                    indice = simbolos[id(valor)] = len(simbolos)
+                    tabela.extend((string(valor.name), string(valor.type), _inteiro(valor.scope_level),
+                                   _inteiro(valor.slot)))
+                gravar(indice)
+        for campo, lista in filhos:
+            if lista:
+                gravar(len(getattr(node, campo)))
+
+    escritor.secao(tabela)
+    escritor.secao(array('i', registros))
+    return escritor.bytes()
+
+def _inteiro(valor):
+    return -1 if valor is None else valor
+
+def desserializar_ast(dados):
+    """Reconstrói a AST serializada, com os Symbol compartilhados entre os nós."""
+    leitor = _Leitor(dados, b"A")
+    strings = leitor.strings
+    tabela = leitor.coluna('i')
+    simbolos = []
+    for i in range(0, len(tabela), 4):
+        symbol = Symbol(strings[tabela[i]], strings[tabela[i + 1]])
+        symbol.scope_level = None if tabela[i + 2] < 0 else tabela[i + 2]
+        symbol.slot = None if tabela[i + 3] < 0 else tabela[i + 3]
+        simbolos.append(symbol)
+    registros = leitor.coluna('i').tolist()
+
+    # Por código: a classe, os escalares e os filhos na ordem em que saem da pilha
+    formatos = [None] * (len(ESQUEMA) + 1)
+    for classe, (codigo, escalares, filhos) in _FORMATOS.items():
+        formatos[codigo] = (classe, escalares, filhos[::-1])
+    # Como em gerador_ast.compilar: a árvore não tem ciclos, e o coletor de
+    # ciclos, disparado a cada poucos milhares de nós criados, domina o tempo
+    gc_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        pilha = []
+        empilhar, desempilhar = pilha.append, pilha.pop
+        proximo = iter(registros).__next__
+        for codigo in iter(proximo, None):
+            if codigo == AUSENTE:
+                empilhar(None)
+                continue
+            classe, escalares, filhos = formatos[codigo]
+            node = classe.__new__(classe)
+            for campo, tipo in escalares:
+                valor = proximo()
+                if valor < 0:
+                    valor = None
+                elif tipo == _STRING:
+                    valor = strings[valor]
+                elif tipo == _SIMBOLO:
+                    valor = simbolos[valor]
+                setattr(node, campo, valor)
+            for campo, lista in filhos:
+                if lista:
+                    tamanho = proximo()
+                    if tamanho:
+                        valor = pilha[-tamanho:]
+                        del pilha[-tamanho:]
+                    else:
+                        valor = []
+                else:
+                    valor = desempilhar()
+                setattr(node, campo, valor)
+            empilhar(node)
+    except StopIteration:
+        raise ValueError("AST serializada truncada") from None
+    finally:
+        if gc_ativo:
+            gc.enable()
+    if len(pilha) != 1:
+        raise ValueError("AST serializada inválida")
+    return pilha[0]
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        description="Grava os tokens ou a AST otimizada de um arquivo fonte no formato binário, ou mostra "
+                    "o conteúdo de um arquivo gravado.")
+    arg_parser.add_argument("arquivo", help="arquivo fonte (com -o) ou arquivo binário a inspecionar")
+    arg_parser.add_argument("-o", "--output", metavar="SAIDA", help="grava o resultado da compilação em SAIDA")
+    arg_parser.add_argument("--tokens", action="store_true", help="com -o, grava os tokens em vez da AST")
+    arg_parser.add_argument("-O", type=int, choices=(0, 1, 2), default=2,
+                            help="com -o, nível de otimização da AST gravada (padrão: 2)")
+    args = arg_parser.parse_args()
+
+    if args.output:
+        from analisador import analisar_buffer
+        from sintatico import analisar_fonte
+        with open(args.arquivo, "r", encoding="utf-8") as f:
+            linhas = f.readlines()
+        dados = serializar_tokens(analisar_buffer(linhas)) if args.tokens else \
+            serializar_ast(analisar_fonte(linhas, nivel=args.O))
+        with open(args.output, "wb") as f:
+            f.write(dados)
+        print(f"{len(dados)} bytes gravados em {args.output}")
+    else:
+        with open(args.arquivo, "rb") as f:
+            dados = f.read()
+        _, versao, conteudo = CABECALHO.unpack_from(dados)
+        print(f"Formato versão {versao}, {len(dados)} bytes")
+        if conteudo == b"T":
+            for token in desserializar_tokens(dados):
+                print(token)
+        else:
+            from sintatico import print_ast
+            print_ast(desserializar_ast(dados))
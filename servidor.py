@@ -0,0 +1,147 @@
+# servidor.py
+#
+# Servidor de compilação: mantém o compilador carregado num processo
+# residente e atende pedidos por um socket Unix, evitando pagar a partida do
+# interpretador e a importação dos módulos a cada compilação.
+#
+#   python3 servidor.py --socket /tmp/compilador.sock -j 4
+#   python3 cliente.py teste.txt -o output.py
+#
+# Protocolo: uma linha JSON por pedido, {"fonte": "...", "fused": false, "O": 2}
+# ("fused" e o nível de otimização "O" são opcionais), e
+# uma linha JSON por resposta, {"ok": true, "codigo": "..."} ou
+# {"ok": false, "erro": "..."}. Uma conexão pode enviar vários pedidos.
+# Com "perfil": true, a resposta traz também o perfil das fases; o pedido
+# {"estatisticas": true} retorna {"ok": true, "perfil": ...} com a soma dos
+# perfis de todas as compilações perfiladas desde que o servidor subiu.
+import argparse
+import asyncio
+import io
+import json
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from otimizador import NIVEIS_OTIMIZACAO
+
+SOCKET_PADRAO = "/tmp/compilador.sock"
+LIMITE_LINHA = 256 * 2**20  # tamanho máximo de um pedido (bytes)
+
+def _iniciar_worker():
+    # Carrega o compilador uma única vez por worker
+    import sintatico, analisador, semantico, otimizador, gerador_codigo  # noqa: F401
+
+def compilar_pedido(fonte, fused=False, nivel=2, perfilar=False):
+    """Compila um código-fonte (executado nos workers); retorna a resposta do protocolo."""
+    from sintatico import compilar_fonte, SyntaxError
+    from perfil import CompileProfiler
+    chunks = []
+    perfil = CompileProfiler() if perfilar else None
+    try:
+        compilar_fonte(io.StringIO(fonte), chunks, fused, nivel=nivel, perfil=perfil)
+    except (SyntaxError, NameError) as e:
+        return {"ok": False, "erro": f"ERRO DE COMPILAÇÃO: {e}"}
+    except Exception as e:
+        return {"ok": False, "erro": f"{type(e).__name__}: {e}"}
+    resposta = {"ok": True, "codigo": "".join(chunks)}
+    if perfil is not None:
+        resposta["perfil"] = perfil.como_dict()
+    return resposta
+
+class CompileServer:
+    def __init__(self, caminho_socket=SOCKET_PADRAO, jobs=None):
+        self.caminho_socket = caminho_socket
+        self.jobs = jobs
+        self.pool = self._criar_pool()
+        self.perfil_total = None  # soma dos perfis recebidos (perfil.agregar_perfis)
+
+    def _criar_pool(self):
+        return ProcessPoolExecutor(max_workers=self.jobs, initializer=_iniciar_worker)
+
+    def acumular_perfil(self, perfil):
+        from perfil import agregar_perfis
+        parciais = [perfil] if self.perfil_total is None else [self.perfil_total, perfil]
+        self.perfil_total = agregar_perfis(parciais)
+
+    async def responder(self, linha):
+        """Resposta do protocolo para uma linha de pedido."""
+        try:
+            pedido = json.loads(linha)
+            if pedido.get("estatisticas"):
+                return {"ok": True, "perfil": self.perfil_total}
+            fonte = pedido["fonte"]
+            if not isinstance(fonte, str):
+                raise TypeError("'fonte' deve ser uma string")
+            nivel = pedido.get("O", 2)
+            if isinstance(nivel, bool) or nivel not in NIVEIS_OTIMIZACAO:
+                validos = ", ".join(str(n) for n in sorted(NIVEIS_OTIMIZACAO))
+                raise ValueError(f"nível de otimização {nivel!r} inexistente (use {validos})")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            detalhe = f"campo {e} ausente" if isinstance(e, KeyError) else e
+            return {"ok": False, "erro": f"Pedido inválido: {detalhe}"}
+        pool = self.pool
+        try:
+            # A compilação roda no pool: outros pedidos continuam sendo atendidos
+            resposta = await asyncio.get_running_loop().run_in_executor(
+                pool, compilar_pedido, fonte, bool(pedido.get("fused", False)), nivel,
+                bool(pedido.get("perfil", False)))
+        except BrokenProcessPool:
+            # Um worker morreu (ex: falta de memória): o pool inteiro fica
+            # inutilizável, então é trocado por um novo para os próximos pedidos
+            if self.pool is pool:
+                pool.shutdown(wait=False)
+                self.pool = self._criar_pool()
+            return {"ok": False, "erro": "Erro interno: um processo compilador terminou inesperadamente."}
+        if "perfil" in resposta:
+            self.acumular_perfil(resposta["perfil"])
+        return resposta
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    linha = await reader.readline()
+                except ValueError:
+                    # Pedido maior que LIMITE_LINHA: o resto da linha continua no
+                    # socket, então não há como achar o próximo pedido
+                    resposta = {"ok": False, "erro": f"Pedido inválido: maior que {LIMITE_LINHA} bytes"}
+                    writer.write(json.dumps(resposta).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not linha:
+                    break
+                resposta = await self.responder(linha)
+                writer.write(json.dumps(resposta).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def servir(self):
+        if os.path.exists(self.caminho_socket):
+            os.remove(self.caminho_socket)
+        servidor = await asyncio.start_unix_server(self.atender, path=self.caminho_socket,
+                                                   limit=LIMITE_LINHA)
+        print(f"Servidor de compilação escutando em {self.caminho_socket}")
+        # SIGTERM/SIGINT encerram o servidor de forma ordenada, sem deixar
+        # workers órfãos nem o arquivo do socket para trás.
+        parar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sinal in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sinal, parar.set)
+        try:
+            async with servidor:
+                await parar.wait()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(self.caminho_socket):
+                os.remove(self.caminho_socket)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Servidor de compilação residente (socket Unix).")
+    arg_parser.add_argument("--socket", default=SOCKET_PADRAO,
+                            help=f"caminho do socket Unix (padrão: {SOCKET_PADRAO})")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                            help="número de processos compiladores (padrão: número de CPUs)")
+    args = arg_parser.parse_args()
+    asyncio.run(CompileServer(args.socket, args.jobs).servir())
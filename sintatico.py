@@ -1,8 +1,10 @@
 # sintatico.py
-from tokens import Token, TokenType
+import contextlib
+from collections import deque
+from tokens import Token, TokenType, TokenBuffer, PRECEDENCIA_BINARIA, PRECEDENCIA_PREFIXA
 from nodes import (ProgramNode, FuncDeclNode, VarDeclNode, AssignNode, ReturnNode, 
-                   FuncCallStmtNode, BinaryOpNode, TypeNode, IdentifierNode, 
-                   NumberNode, StringNode, CharNode)
+                   FuncCallStmtNode, BinaryOpNode, UnaryOpNode, TypeNode, IdentifierNode, 
+                   NumberNode, StringNode, CharNode, ErrorNode)
 
 # ... (todo o código das classes SyntaxError e Parser permanece o mesmo) ...
 class SyntaxError(Exception):
@@ -12,210 +14,698 @@ class SyntaxError(Exception):
     def __str__(self):
         return f"Syntax Error at line {self.linha}: {super().__str__()}" if self.linha else f"Syntax Error: {super().__str__()}"
 
+class CompilationErrors(SyntaxError):
+    """Reúne todos os erros (de sintaxe e semânticos) encontrados numa compilação."""
+    def __init__(self, erros):
+        super().__init__(f"{len(erros)} erros de compilação")
+        # Erros sem linha (ex: fim inesperado do arquivo) vão para o fim
+        self.erros = sorted(erros, key=lambda e: (getattr(e, 'linha', None) is None, getattr(e, 'linha', None) or 0))
+
+    def __str__(self):
+        linhas = [f"{len(self.erros)} erros encontrados:"]
+        for erro in self.erros:
+            if isinstance(erro, SyntaxError):
+                linhas.append(f"  {erro}")
+            elif getattr(erro, 'linha', None):
+                linhas.append(f"  Semantic Error at line {erro.linha}: {erro}")
+            else:
+                linhas.append(f"  Semantic Error: {erro}")
+        return "\n".join(linhas)
+
+def levantar_erros(erros):
+    """Levanta os erros acumulados: o próprio erro, se for só um, ou um CompilationErrors."""
+    if len(erros) == 1:
+        raise erros[0]
+    if erros:
+        raise CompilationErrors(erros)
+
+# O fim da entrada fica na linha do último token (ver Parser._advance)
+EOF_TOKEN = Token(TokenType.EOF, "EOF", None)
+
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        self.current_token = self.tokens[self.pos] if self.pos < len(self.tokens) else Token(TokenType.EOF, "EOF", -1)
+    """
+    Parser descendente recursivo. Aceita qualquer iterável de tokens (uma lista
+    ou o gerador de analisador.analisar_fluxo), mantendo em memória só o token
+    atual e o buffer de lookahead, ou um TokenBuffer, lido coluna a coluna.
+
+    O token atual fica em self.tipo, self.valor e self.linha; objetos Token só
+    são criados para os tokens que acabam guardados na AST.
+
+    Com recuperar=True, um erro num comando não interrompe a análise (modo
+    pânico): o erro vai para self.erros, os tokens são descartados até o
+    próximo ';' ou '}' e o comando vira um ErrorNode. Os tokens ERRO do
+    analisador léxico também são relatados em self.erros.
+    """
+    def __init__(self, tokens, recuperar=False):
+        if isinstance(tokens, TokenBuffer):
+            self.buffer = tokens
+            self.tokens = None
+        else:
+            self.buffer = None
+            self.tokens = iter(tokens)
+        self.lookahead = deque()
+        self.pos = -1
+        self.recuperar = recuperar
+        self.erros = []
+        self.linha = 1  # Linha do EOF num arquivo vazio
+        self._advance()
+
+    @property
+    def current_token(self):
+        return Token(self.tipo, self.valor, self.linha)
+
+    def _next_token(self):
+        if self.lookahead:
+            return self.lookahead.popleft()
+        return next(self.tokens, EOF_TOKEN)
+
+    def _peek_valor(self, k=1):
+        """Retorna o valor do k-ésimo token após o atual sem consumi-lo."""
+        if self.buffer is not None:
+            i = self.pos + k
+            return self.buffer.valor(i) if i < len(self.buffer) else EOF_TOKEN.valor
+        while len(self.lookahead) < k:
+            self.lookahead.append(next(self.tokens, EOF_TOKEN))
+        return self.lookahead[k - 1].valor
 
     def _advance(self):
         self.pos += 1
-        self.current_token = self.tokens[self.pos] if self.pos < len(self.tokens) else Token(TokenType.EOF, "EOF", -1)
+        buffer = self.buffer
+        if buffer is not None:
+            if self.pos < len(buffer):
+                self.tipo = buffer.tipo(self.pos)
+                self.valor = buffer.valor(self.pos)
+                self.linha = buffer.linha(self.pos)
+            else:
+                self.tipo, self.valor = EOF_TOKEN.tipo, EOF_TOKEN.valor
+        else:
+            token = self._next_token()
+            self.tipo, self.valor = token.tipo, token.valor
+            if token is not EOF_TOKEN:
+                self.linha = token.linha
 
-    def _consume(self, expected_type, expected_value=None):
-        token = self.current_token
-        if token.tipo == TokenType.EOF:
+    def _erro(self, mensagem):
+        """SyntaxError no token atual; num token ERRO, o erro relatado é o léxico."""
+        if self.tipo == TokenType.ERRO:
+            return SyntaxError(f"Invalid token '{self.valor}'", self.linha)
+        return SyntaxError(mensagem, self.linha)
+
+    def _registrar(self, erro):
+        """Guarda o erro em modo de recuperação; senão, o levanta."""
+        if not self.recuperar:
+            raise erro
+        self.erros.append(erro)
+
+    def _sincronizar(self):
+        """
+        Descarta tokens até o fim do comando com erro: consome o próximo ';'
+        ou para antes do próximo '}'. Tokens ERRO descartados no caminho (fora
+        o atual, que causou o erro) também são relatados.
+        """
+        atual = True
+        while self.tipo != TokenType.EOF:
+            if self.tipo == TokenType.SIMBOLO and (self.valor == ';' or self.valor == '}'):
+                if self.valor == ';':
+                    self._advance()
+                return
+            if self.tipo == TokenType.ERRO:
+                if not atual:
+                    self.erros.append(self._erro(None))
+                if self.valor.startswith("String não terminada"):
+                    # A string aberta engoliu o resto da linha, inclusive o ';'
+                    self._advance()
+                    return
+            atual = False
+            self._advance()
+
+    def _expect(self, expected_type, expected_value=None):
+        """Verifica o token atual e avança, sem materializá-lo."""
+        if self.tipo == TokenType.EOF:
             expected_descr = f"'{expected_value}' ({expected_type.value})" if expected_value else expected_type.value
-            raise SyntaxError(f"Unexpected end of input. Expected {expected_descr}.")
-        linha = token.linha
-        if token.tipo != expected_type or (expected_value and token.valor != expected_value):
-            raise SyntaxError(f"Expected '{expected_value or expected_type.value}', got '{token.valor}'", linha)
+            raise SyntaxError(f"Unexpected end of input. Expected {expected_descr}.", self.linha)
+        if self.tipo != expected_type or (expected_value and self.valor != expected_value):
+            raise self._erro(f"Expected '{expected_value or expected_type.value}', got '{self.valor}'")
         self._advance()
+
+    def _consume(self, expected_type, expected_value=None):
+        token = self.current_token
+        self._expect(expected_type, expected_value)
         return token
 
     def parse_programa(self):
-        func_declaration = self.parse_declaracao_funcao()
-        if self.current_token.tipo != TokenType.EOF:
-             raise SyntaxError(f"Unexpected token '{self.current_token.valor}' after program completion.", self.current_token.linha)
-        return ProgramNode([func_declaration])
+        # Uma ou mais funções até o fim do arquivo
+        declarations = [self.parse_declaracao_funcao()]
+        while self.tipo != TokenType.EOF:
+            declarations.append(self.parse_declaracao_funcao())
+        return ProgramNode(declarations)
 
     def parse_declaracao_funcao(self):
-        type_node = self.parse_tipo()
-        name_token = self._consume(TokenType.IDENTIFICADOR)
-        self._consume(TokenType.SIMBOLO, '(')
-        self._consume(TokenType.SIMBOLO, ')')
-        self._consume(TokenType.SIMBOLO, '{')
+        linha = self.linha
+        name_token = None
+        try:
+            type_node = self.parse_tipo()
+            name_token = self._consume(TokenType.IDENTIFICADOR)
+            self._expect(TokenType.SIMBOLO, '(')
+            self._expect(TokenType.SIMBOLO, ')')
+            self._expect(TokenType.SIMBOLO, '{')
+        except SyntaxError as erro:
+            # Cabeçalho inválido: a função vira um ErrorNode com o nome (se
+            # chegou a ser lido) e o corpo, que ainda passa pela análise
+            # semântica para relatar os seus erros.
+            self._registrar(erro)
+            body = []
+            if self._sincronizar_cabecalho(name_token is not None):
+                body = self.parse_lista_comandos()
+                self._fechar_bloco()
+            return ErrorNode(str(erro), linha, name_token.valor if name_token is not None else None, body)
         body = self.parse_lista_comandos()
-        self._consume(TokenType.SIMBOLO, '}')
+        self._fechar_bloco()
         return FuncDeclNode(type_node, name_token, body)
 
+    def _sincronizar_cabecalho(self, nomeado):
+        """
+        Descarta o resto de um cabeçalho de função com erro até o início do
+        corpo: consome o próximo '{'. Se o nome da função já foi lido, um ';'
+        (consumido) ou um '}' também marcam o corpo, cujo '{' faltou. Retorna
+        False se a entrada acabou antes.
+        """
+        while self.tipo != TokenType.EOF:
+            if self.tipo == TokenType.SIMBOLO:
+                if self.valor == '{' or (nomeado and self.valor == ';'):
+                    self._advance()
+                    return True
+                if nomeado and self.valor == '}':
+                    return True
+            self._advance()
+        return False
+
+    def _fechar_bloco(self):
+        try:
+            self._expect(TokenType.SIMBOLO, '}')
+        except SyntaxError as erro:
+            self._registrar(erro)
+
     def parse_tipo(self):
-        token = self.current_token
-        if token.tipo == TokenType.PALAVRA_RESERVADA and token.valor in {"int", "real", "char"}:
-            self._consume(TokenType.PALAVRA_RESERVADA, token.valor)
+        if self.tipo == TokenType.PALAVRA_RESERVADA and self.valor in {"int", "real", "char"}:
+            token = self._consume(TokenType.PALAVRA_RESERVADA, self.valor)
             return TypeNode(token)
-        raise SyntaxError(f"Expected type (int, real, char), got '{token.valor}'", token.linha)
+        raise self._erro(f"Expected type (int, real, char), got '{self.valor}'")
 
     def parse_lista_comandos(self):
         comandos = []
-        while self.current_token.valor != '}':
-            comandos.append(self.parse_comando())
+        while self.valor != '}' and self.tipo != TokenType.EOF:
+            linha = self.linha
+            # Nome declarado pelo comando, para não acusar usos dele caso a
+            # declaração tenha erro
+            declarado = None
+            if self.valor in {"int", "real", "char"}:
+                declarado = self._peek_valor()
+            try:
+                comandos.append(self.parse_comando())
+            except SyntaxError as erro:
+                self._registrar(erro)
+                self._sincronizar()
+                if declarado is not None and not declarado.isidentifier():
+                    declarado = None
+                comandos.append(ErrorNode(str(erro), linha, declarado))
         return comandos
 
     def parse_comando(self):
-        token = self.current_token
-        if token.valor == "return":
+        if self.valor == "return":
             return self.parse_comando_retorno()
-        if token.valor in {"int", "real", "char"}:
+        if self.valor in {"int", "real", "char"}:
             return self.parse_declaracao_variavel()
         
-        if token.tipo == TokenType.IDENTIFICADOR:
-            if self.pos + 1 < len(self.tokens):
-                next_token = self.tokens[self.pos+1]
-                if next_token.valor == '=':
-                    return self.parse_atribuicao()
-                if next_token.valor == '(':
-                    return self.parse_chamada_funcao_stmt()
+        if self.tipo == TokenType.IDENTIFICADOR:
+            next_valor = self._peek_valor()
+            if next_valor == '=':
+                return self.parse_atribuicao()
+            if next_valor == '(':
+                return self.parse_chamada_funcao_stmt()
         
-        raise SyntaxError(f"Unexpected token '{token.valor}' to start a command.", token.linha)
+        raise self._erro(f"Unexpected token '{self.valor}' to start a command.")
 
     def parse_declaracao_variavel(self):
         type_node = self.parse_tipo()
         var_token = self._consume(TokenType.IDENTIFICADOR)
         expr_node = None
-        if self.current_token.valor == '=':
-            self._consume(TokenType.SIMBOLO, '=')
+        if self.valor == '=':
+            self._expect(TokenType.SIMBOLO, '=')
             expr_node = self.parse_expressao()
-        self._consume(TokenType.SIMBOLO, ';')
+        self._expect(TokenType.SIMBOLO, ';')
         return VarDeclNode(type_node, var_token, expr_node)
 
     def parse_atribuicao(self):
         var_token = self._consume(TokenType.IDENTIFICADOR)
-        self._consume(TokenType.SIMBOLO, '=')
+        self._expect(TokenType.SIMBOLO, '=')
         expr_node = self.parse_expressao()
-        self._consume(TokenType.SIMBOLO, ';')
+        self._expect(TokenType.SIMBOLO, ';')
         return AssignNode(var_token, expr_node)
 
     def parse_comando_retorno(self):
-        self._consume(TokenType.PALAVRA_RESERVADA, "return")
+        linha = self.linha
+        self._expect(TokenType.PALAVRA_RESERVADA, "return")
         expr_node = self.parse_expressao()
-        self._consume(TokenType.SIMBOLO, ';')
-        return ReturnNode(expr_node)
+        self._expect(TokenType.SIMBOLO, ';')
+        return ReturnNode(expr_node, linha)
         
     def parse_chamada_funcao_stmt(self):
         name_token = self._consume(TokenType.IDENTIFICADOR)
-        self._consume(TokenType.SIMBOLO, '(')
+        self._expect(TokenType.SIMBOLO, '(')
         arg_list = []
-        if self.current_token.valor != ')':
+        if self.valor != ')':
             arg_list = self.parse_lista_argumentos()
-        self._consume(TokenType.SIMBOLO, ')')
-        self._consume(TokenType.SIMBOLO, ';')
+        self._expect(TokenType.SIMBOLO, ')')
+        self._expect(TokenType.SIMBOLO, ';')
         return FuncCallStmtNode(name_token, arg_list)
 
     def parse_lista_argumentos(self):
         return [self.parse_expressao()]
 
-    def parse_expressao(self):
-        node = self.parse_termo()
-        while self.current_token.valor == '+':
-            op_token = self._consume(TokenType.SIMBOLO, '+')
-            right = self.parse_termo()
+    def parse_expressao(self, precedencia_minima=0):
+        """
+        Parser de Pratt guiado por PRECEDENCIA_BINARIA: lê um operando e,
+        enquanto o próximo operador liga mais forte que 'precedencia_minima',
+        o aplica ao que foi lido até agora. Como todos os operadores são
+        associativos à esquerda, o operando direito é lido com a precedência
+        do próprio operador. Cadeias de um mesmo nível são construídas no laço,
+        sem recursão; a recursão só cresce com o aninhamento de parênteses,
+        prefixos e níveis de precedência.
+        """
+        return self._parse_infixo(self.parse_prefixo(), precedencia_minima)
+
+    def _parse_infixo(self, node, precedencia_minima):
+        simbolo = TokenType.SIMBOLO
+        precedencia = PRECEDENCIA_BINARIA.get(self.valor) if self.tipo == simbolo else None
+        while precedencia is not None and precedencia > precedencia_minima:
+            op_token = self.current_token
+            self._advance()
+            right = self.parse_termo() if self.tipo != simbolo else self.parse_prefixo()
+            seguinte = PRECEDENCIA_BINARIA.get(self.valor) if self.tipo == simbolo else None
+            # Só desce um nível se o operador seguinte ligar mais forte
+            if seguinte is not None and seguinte > precedencia:
+                right = self._parse_infixo(right, precedencia)
+                seguinte = PRECEDENCIA_BINARIA.get(self.valor) if self.tipo == simbolo else None
             node = BinaryOpNode(left=node, op_token=op_token, right=right)
+            precedencia = seguinte
         return node
 
+    def parse_prefixo(self):
+        """Operadores prefixos (PRECEDENCIA_PREFIXA), parênteses ou um termo."""
+        if self.tipo == TokenType.SIMBOLO:
+            precedencia = PRECEDENCIA_PREFIXA.get(self.valor)
+            if precedencia is not None:
+                op_token = self._consume(TokenType.SIMBOLO, self.valor)
+                return UnaryOpNode(op_token, self.parse_expressao(precedencia))
+            if self.valor == '(':
+                self._advance()
+                node = self.parse_expressao()
+                self._expect(TokenType.SIMBOLO, ')')
+                return node
+        return self.parse_termo()
+
     def parse_termo(self):
-        token = self.current_token
-        if token.tipo == TokenType.IDENTIFICADOR:
-            self._advance()
-            return IdentifierNode(token)
-        if token.tipo == TokenType.NUMERO or token.tipo == TokenType.REAL:
-            self._advance()
-            return NumberNode(token)
-        if token.tipo == TokenType.STRING:
-            self._advance()
-            return StringNode(token)
-        if token.tipo == TokenType.CARACTERE:
-            self._advance()
-            return CharNode(token)
-        raise SyntaxError(f"Expected identifier or literal, got '{token.valor}'", token.linha)
+        tipo = self.tipo
+        if tipo == TokenType.IDENTIFICADOR:
+            return IdentifierNode(self._consume(tipo))
+        if tipo == TokenType.NUMERO or tipo == TokenType.REAL:
+            return NumberNode(self._consume(tipo))
+        if tipo == TokenType.STRING:
+            return StringNode(self._consume(tipo))
+        if tipo == TokenType.CARACTERE:
+            return CharNode(self._consume(tipo))
+        raise self._erro(f"Expected identifier or literal, got '{self.valor}'")
 
 
 def print_ast(node, indent=""):
-    node_repr = indent + node.__class__.__name__
-    if hasattr(node, 'name'): node_repr += f" (Name: {node.name})"
-    if hasattr(node, 'var_name'): node_repr += f" (VarName: {node.var_name})"
-    if hasattr(node, 'value'): node_repr += f" (Value: {node.value})"
-    if hasattr(node, 'op_token') and node.op_token: node_repr += f" (Op: {node.op_token.valor})"
-    print(node_repr)
-    new_indent = indent + "  "
-    child_attrs = ['type_node', 'declarations', 'body', 'expr_node', 'arg_list', 'left', 'right']
-    for attr_name in child_attrs:
-        if hasattr(node, attr_name):
+    # Pilha explícita de (nó ou rótulo de campo, indentação): árvores
+    # profundas não esbarram no limite de recursão.
+    pilha = [(node, indent)]
+    while pilha:
+        node, indent = pilha.pop()
+        if isinstance(node, str):
+            print(indent + node)
+            continue
+        node_repr = indent + node.__class__.__name__
+        if hasattr(node, 'name'): node_repr += f" (Name: {node.name})"
+        if hasattr(node, 'var_name'): node_repr += f" (VarName: {node.var_name})"
+        if hasattr(node, 'value'): node_repr += f" (Value: {node.value})"
+        if hasattr(node, 'op'): node_repr += f" (Op: {node.op})"
+        print(node_repr)
+        new_indent = indent + "  "
+        filhos = []
+        for attr_name in node.child_fields:
             child_or_children = getattr(node, attr_name)
             if child_or_children is None: continue
-            print(new_indent + f"({attr_name}) ->")
+            filhos.append((f"({attr_name}) ->", new_indent))
             if isinstance(child_or_children, list):
                 for child in child_or_children:
-                    print_ast(child, new_indent + "  ")
+                    filhos.append((child, new_indent + "  "))
             else:
-                print_ast(child_or_children, new_indent + "  ")
+                filhos.append((child_or_children, new_indent + "  "))
+        filhos.reverse()
+        pilha.extend(filhos)
 
 # --- Bloco Principal de Execução ---
-if __name__ == "__main__":
-    import subprocess
-    from analisador import analisar_arquivo
+def analisar_fonte(linhas, fused=False, verbose=False, nivel=2, perfil=None, jobs=1, codigo=None):
+    """
+    Executa as fases 1 a 4 sobre um iterável de linhas (um arquivo aberto, uma
+    lista...) e retorna a AST otimizada. 'nivel' é o nível de otimização (0, 1
+    ou 2, ver NIVEIS_OTIMIZACAO). Com verbose=True, imprime os cabeçalhos das
+    fases, as estatísticas dos passes e a AST otimizada.
+
+    Com jobs > 1 (e sem fused), a otimização roda por função em até 'jobs'
+    processos (ver paralelo.py); se a lista 'codigo' for dada, o código de
+    cada função também é gerado nos processos e acrescentado a ela.
+
+    Se 'perfil' (um perfil.CompileProfiler) for dado, cada fase é medida
+    nele; nesse caso os tokens são materializados antes do parser, para que
+    as fases léxica e sintática sejam medidas separadamente.
+    """
+    from analisador import analisar_fluxo, analisar_buffer
+
+    # FASES 1 E 2: ANÁLISE LÉXICA E SINTÁTICA
+    # Os tokens são produzidos sob demanda enquanto o parser os consome,
+    # sem materializar o arquivo ou a lista de tokens inteira.
+    if verbose:
+        print("--- Fases 1 e 2: Análise Léxica, Sintática e Construção da AST ---")
+    if perfil is None:
+        tokens = analisar_fluxo(linhas)
+    else:
+        with perfil.fase("lexico"):
+            tokens = analisar_buffer(linhas)
+        perfil.contar("lexico", len(tokens), "tokens")
+    return analisar_tokens(tokens, fused, verbose, nivel, perfil, jobs, codigo)
+
+def analisar_tokens(tokens, fused=False, verbose=False, nivel=2, perfil=None, jobs=1, codigo=None,
+                    globais=()):
+    """
+    Fases 2 a 4 de analisar_fonte sobre tokens já produzidos (qualquer
+    entrada aceita pelo Parser). Retorna a AST otimizada ou levanta os erros
+    de compilação. 'globais' são nomes de funções definidas fora desses
+    tokens (ver SemanticAnalyzer).
+    """
+    log = print if verbose else (lambda *args: None)
     from semantico import SemanticAnalyzer
-    from otimizador import Optimizer
-    from gerador_codigo import CodeGenerator
-    
-    nome_arquivo = "teste.txt"
-    print(f"--- Iniciando Compilação do Arquivo: {nome_arquivo} ---\n")
+    from otimizador import PassManager, SemanticOptimizer
+    from perfil import contar_nos
+    fase = perfil.fase if perfil is not None else (lambda nome: contextlib.nullcontext())
 
-    try:
-        # FASE 1: ANÁLISE LÉXICA
-        print("--- Fase 1: Análise Léxica ---")
-        tokens = analisar_arquivo(nome_arquivo)
-        if not tokens: exit(1)
-        print("Análise léxica concluída.\n")
-
-        # FASE 2: ANÁLISE SINTÁTICA E CONSTRUÇÃO DA AST
-        print("--- Fase 2: Análise Sintática e Construção da AST ---")
-        parser = Parser(tokens)
+    parser = Parser(tokens, recuperar=True)
+    with fase("sintatico"):
         ast_root = parser.parse_programa()
-        print("Análise sintática e construção da AST concluídas.\n")
-        
+    erros = parser.erros
+    if erros:
+        # Com erros de sintaxe não há o que otimizar, mas a análise semântica
+        # ainda roda sobre o resto da árvore para relatar tudo de uma vez.
+        SemanticAnalyzer(erros=erros, globais=globais).visit(ast_root)
+        levantar_erros(erros)
+    log("Análise léxica, sintática e construção da AST concluídas.\n")
+    num_nos = contar_nos(ast_root) if perfil is not None else 0
+    
+    if fused and nivel > 0:
+        # FASES 3 E 4 NUMA ÚNICA PASSAGEM
+        log("--- Fases 3 e 4: Análise Semântica e Otimização (Constant Folding e Propagação de Constantes) ---")
+        with fase("semantico+otimizacao"):
+            optimized_ast = SemanticOptimizer(propagar=nivel >= 2, erros=erros, reassociar=nivel >= 2,
+                                              globais=globais).visit(ast_root)
+        levantar_erros(erros)
+        log("Análise semântica e otimização concluídas com sucesso!\n")
+    else:
         # FASE 3: ANÁLISE SEMÂNTICA
-        print("--- Fase 3: Análise Semântica ---")
-        semantic_analyzer = SemanticAnalyzer()
-        semantic_analyzer.visit(ast_root)
-        print("Análise semântica concluída com sucesso!\n")
+        log("--- Fase 3: Análise Semântica ---")
+        semantic_analyzer = SemanticAnalyzer(erros=erros, globais=globais)
+        with fase("semantico"):
+            semantic_analyzer.visit(ast_root)
+        levantar_erros(erros)
+        log("Análise semântica concluída com sucesso!\n")
 
         # FASE 4: OTIMIZAÇÃO
-        print("--- Fase 4: Otimização (Constant Folding) ---")
-        optimizer = Optimizer()
-        optimized_ast = optimizer.visit(ast_root)
-        print("Otimização concluída.\n")
+        log(f"--- Fase 4: Otimização (-O{nivel}) ---")
+        if jobs > 1:
+            from paralelo import otimizar_e_gerar
+            with fase("otimizacao"):
+                optimized_ast, funcoes, pass_manager = otimizar_e_gerar(ast_root, nivel, jobs,
+                                                                        gerar=codigo is not None)
+            if codigo is not None:
+                codigo.extend(funcoes)
+        else:
+            pass_manager = PassManager.para_nivel(nivel)
+            with fase("otimizacao"):
+                optimized_ast = pass_manager.run(ast_root)
+        log(pass_manager.relatorio())
+        log("Otimização concluída.\n")
+    if perfil is not None:
+        perfil.contar("sintatico", num_nos, "nós")
+        for nome in ("semantico+otimizacao",) if fused and nivel > 0 else ("semantico", "otimizacao"):
+            perfil.contar(nome, num_nos, "nós")
+    if verbose:
         print("--- AST Otimizada ---")
         print_ast(optimized_ast)
         print("---------------------\n")
+    return optimized_ast
 
-        # FASE 5: GERAÇÃO DE CÓDIGO
+def compilar_fonte(linhas, sink, fused=False, verbose=False, nivel=2, perfil=None, jobs=1):
+    """
+    Executa as fases 1 a 5, escrevendo o código Python gerado em 'sink' (ver
+    CodeGenerator). Retorna a AST otimizada. Com jobs > 1, as fases 4 e 5
+    rodam por função em até 'jobs' processos, com o mesmo resultado.
+    """
+    from gerador_codigo import CodeGenerator, RODAPE_PROGRAMA
+    funcoes = [] if jobs > 1 else None
+    optimized_ast = analisar_fonte(linhas, fused, verbose, nivel, perfil, jobs, funcoes)
+
+    # FASE 5: GERAÇÃO DE CÓDIGO
+    if verbose:
         print("--- Fase 5: Geração de Código (Transpilando para Python) ---")
-        code_gen = CodeGenerator()
-        python_code = code_gen.visit(optimized_ast)
-        
-        output_filename = "output.py"
-        with open(output_filename, "w") as f:
-            f.write(python_code)
-            # Adiciona a chamada à função principal se ela existir
-            f.write("\nif __name__ == '__main__':\n    main()\n")
+    code_gen = CodeGenerator(sink=sink)
+    with perfil.fase("geracao") if perfil is not None else contextlib.nullcontext():
+        if funcoes:
+            # Código já gerado por função no pool (ver analisar_fonte)
+            for parte in funcoes:
+                code_gen.emit(parte)
+        else:
+            code_gen.visit(optimized_ast)
+        # Adiciona a chamada à função principal se ela existir
+        code_gen.emit(RODAPE_PROGRAMA)
+    if perfil is not None:
+        from perfil import contar_nos
+        perfil.contar("geracao", contar_nos(optimized_ast), "nós")
+    return optimized_ast
+
+def compilar_arquivo(nome_arquivo, output_filename, fused=False, cache=None, chave=None, guardar_ast=False,
+                     verbose=True, nivel=2, perfil=None, jobs=1):
+    """
+    Compila nome_arquivo (fases 1 a 5), escrevendo o código gerado em
+    output_filename conforme é produzido e, se houver cache, guardando-o.
+
+    O código vai para um arquivo temporário ao lado do destino, que só o
+    substitui se a compilação terminar: com erros, output_filename não é
+    criado nem truncado.
+    """
+    import os
+    with open(nome_arquivo, "r", encoding="utf-8") as arquivo_fonte:
+        temporario = f"{output_filename}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, "w") as f:
+                optimized_ast = compilar_fonte(arquivo_fonte, f, fused, verbose, nivel, perfil, jobs)
+            os.replace(temporario, output_filename)
+        except BaseException:
+            try:
+                os.remove(temporario)
+            except FileNotFoundError:
+                pass
+            raise
+    if verbose:
         print(f"Código Python gerado com sucesso no arquivo: {output_filename}\n")
 
-        # FASE 6: EXECUÇÃO DO CÓDIGO GERADO
-        print(f"--- Executando o script Python gerado ({output_filename})... ---")
+    if cache is not None:
+        from serializacao import serializar_ast
+        # A AST vai no formato binário de serializacao (desserializar_ast a reconstrói)
+        artefatos = {"ast": serializar_ast(optimized_ast)} if guardar_ast else None
+        cache.put_arquivo(chave, output_filename, artefatos)
+
+def criar_perfil(args):
+    """CompileProfiler configurado pelas opções --profile*, ou None se o perfil está desligado."""
+    if not args.profile:
+        return None
+    from perfil import CompileProfiler
+    return CompileProfiler(cprofile=args.profile_cprofile)
+
+def relatar_perfil(args, perfil):
+    if perfil is None:
+        return
+    import json
+    print("--- Perfil da Compilação ---")
+    print(perfil.relatorio())
+    print("----------------------------\n")
+    if args.profile_out:
+        with open(args.profile_out, "w", encoding="utf-8") as f:
+            json.dump(perfil.como_dict(), f, indent=2)
+        print(f"Perfil gravado em {args.profile_out}\n")
+
+@contextlib.contextmanager
+def configurar_rastreio(args):
+    """Liga durante o bloco o rastreamento pedido por --trace (em texto no stdout, ou em JSON Lines com --trace-out)."""
+    if not args.trace:
+        yield
+        return
+    from rastreio import JsonLinesSink, TextSink, rastreando
+    with contextlib.ExitStack() as pilha:
+        if args.trace_out:
+            destinos = [JsonLinesSink(pilha.enter_context(open(args.trace_out, "w", encoding="utf-8")))]
+        else:
+            destinos = [TextSink()]
+        pilha.enter_context(rastreando(args.trace, destinos))
+        yield
+
+def executar_via_texto(args, nome_arquivo, output_filename):
+    """Driver do backend de texto: gera output.py (ou o recupera do cache) e o executa."""
+    import os
+    import subprocess
+    from cache import CompilationCache, hash_arquivo, SUBDIRETORIO_PYC
+
+    cache = chave = None
+    if not args.no_cache:
+        cache = CompilationCache(args.cache_dir, int(args.cache_max_mb * 2**20))
+        chave = cache.chave(hash_arquivo(nome_arquivo), {"fused": args.fused, "O": args.O})
+
+    perfil = criar_perfil(args)
+    # Com --profile ou --trace as fases sempre rodam, para que haja o que medir
+    if perfil is None and not args.trace and cache is not None and cache.restaurar(chave, output_filename):
+        # Fonte, compilador e opções inalterados: todas as fases são puladas
+        print(f"--- Cache: código reaproveitado de uma compilação anterior ({output_filename}) ---\n")
+    else:
+        compilar_arquivo(nome_arquivo, output_filename, args.fused, cache, chave, args.cache_artifacts,
+                         nivel=args.O, perfil=perfil, jobs=args.jobs)
+        relatar_perfil(args, perfil)
+
+    # FASE 6: EXECUÇÃO DO CÓDIGO GERADO
+    print(f"--- Executando o script Python gerado ({output_filename})... ---")
+    if args.run == "inprocess":
+        from executor import CodeObjectCache, executar_arquivo
+        cache_codigo = CodeObjectCache(None if args.no_cache else os.path.join(args.cache_dir, SUBDIRETORIO_PYC))
+        retorno, saida = executar_arquivo(output_filename, cache_codigo)
+        print(saida, end="")
+        print(f"(main retornou {retorno!r})")
+    else:
         subprocess.run(["python3", output_filename])
-        print("------------------------------------------------------")
+    print("------------------------------------------------------")
+
+def executar_via_ast(args, nome_arquivo):
+    """Driver do backend ast: gera o code object direto da AST e o executa neste processo."""
+    from gerador_ast import AstCodeGenerator
+    from executor import executar_codigo
+
+    perfil = criar_perfil(args)
+    with open(nome_arquivo, "r", encoding="utf-8") as arquivo_fonte:
+        optimized_ast = analisar_fonte(arquivo_fonte, args.fused, verbose=True, nivel=args.O, perfil=perfil,
+                                       jobs=args.jobs)
+
+    # FASE 5: GERAÇÃO DO CODE OBJECT (sem código-fonte intermediário)
+    print("--- Fase 5: Geração de Código (AST do Python -> code object) ---")
+    with perfil.fase("geracao") if perfil is not None else contextlib.nullcontext():
+        code = AstCodeGenerator().compilar(optimized_ast, nome_arquivo)
+    print("Code object gerado com sucesso.\n")
+    if perfil is not None:
+        from perfil import contar_nos
+        perfil.contar("geracao", contar_nos(optimized_ast), "nós")
+    relatar_perfil(args, perfil)
+
+    # FASE 6: EXECUÇÃO
+    print("--- Executando o programa compilado... ---")
+    retorno, saida = executar_codigo(code)
+    print(saida, end="")
+    print(f"(main retornou {retorno!r})")
+    print("------------------------------------------------------")
+
+def executar_via_closures(args, nome_arquivo):
+    """Driver do backend de closures: executa a AST otimizada direto, sem gerar código Python."""
+    import sys
+    from interpretador import executar_programa
+
+    perfil = criar_perfil(args)
+    with open(nome_arquivo, "r", encoding="utf-8") as arquivo_fonte:
+        optimized_ast = analisar_fonte(arquivo_fonte, args.fused, verbose=True, nivel=args.O, perfil=perfil,
+                                       jobs=args.jobs)
+    relatar_perfil(args, perfil)
+
+    # FASES 5 E 6: COMPILAÇÃO PARA CLOSURES E EXECUÇÃO (a saída do programa vai direto para o stdout)
+    print("--- Executando o programa (closures sobre a AST)... ---")
+    retorno, _ = executar_programa(optimized_ast, sys.stdout)
+    print(f"(main retornou {retorno!r})")
+    print("------------------------------------------------------")
+
+if __name__ == "__main__":
+    import argparse
+    from rastreio import CATEGORIAS, interpretar_categorias
+
+    arg_parser = argparse.ArgumentParser(description="Compila um programa para Python e o executa.")
+    arg_parser.add_argument("arquivo", nargs="?", default="teste.txt", help="arquivo fonte (padrão: teste.txt)")
+    arg_parser.add_argument("--fused", action="store_true",
+                            help="faz a análise semântica e o constant folding numa única passagem")
+    arg_parser.add_argument("-O", type=int, choices=(0, 1, 2), default=2,
+                            help="nível de otimização: 0 nenhuma, 1 constant folding, 2 folding, "
+                                 "reassociação de somas e propagação de constantes até o ponto fixo "
+                                 "(padrão: 2)")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help="otimiza e gera o código das funções em paralelo, em até JOBS processos "
+                                 "(padrão: 1; 0 = um por núcleo)")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="ignora o cache de compilação e recompila do zero")
+    arg_parser.add_argument("--cache-dir", default=".compilador_cache",
+                            help="diretório do cache de compilação (padrão: .compilador_cache)")
+    arg_parser.add_argument("--cache-max-mb", type=float, default=64,
+                            help="tamanho máximo do cache em MiB (padrão: 64)")
+    arg_parser.add_argument("--cache-artifacts", action="store_true",
+                            help="guarda também a AST otimizada no cache")
+    arg_parser.add_argument("--run", choices=("subprocess", "inprocess"), default="subprocess",
+                            help="executa o código gerado num novo interpretador (padrão) ou neste "
+                                 "processo, com o code object em cache")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="mede cada fase (tempo de parede e de CPU, tokens/nós, pico de memória) "
+                                 "e imprime o perfil; ignora o cache")
+    arg_parser.add_argument("--profile-cprofile", action="store_true",
+                            help="com --profile, roda cada fase sob o cProfile e lista as funções mais caras")
+    arg_parser.add_argument("--profile-out", metavar="ARQUIVO",
+                            help="com --profile, grava o perfil em JSON nesse arquivo")
+    arg_parser.add_argument("--backend", choices=("texto", "ast", "closures"), default="texto",
+                            help="'texto' gera output.py (padrão); 'ast' gera o code object direto "
+                                 "pelo módulo ast do Python e executa neste processo; 'closures' executa "
+                                 "a AST otimizada neste processo, sem gerar código Python")
+    def categorias(especificacao):
+        # A mensagem do ValueError (categoria ou nível desconhecido) aparece no erro do argparse
+        try:
+            return interpretar_categorias(especificacao)
+        except ValueError as erro:
+            raise argparse.ArgumentTypeError(str(erro))
+
+    arg_parser.add_argument("--trace", metavar="CATEGORIAS", type=categorias,
+                            help="rastreia as categorias dadas, ex: 'symtab:debug,optimizer' (categorias: "
+                                 f"{', '.join(CATEGORIAS)} ou all; níveis: info, o padrão, ou debug); ignora o cache")
+    arg_parser.add_argument("--trace-out", metavar="ARQUIVO",
+                            help="com --trace, grava os eventos em JSON Lines nesse arquivo em vez de imprimi-los")
+    args = arg_parser.parse_args()
+    if args.jobs == 0:
+        import os
+        args.jobs = os.cpu_count() or 1
+
+    nome_arquivo = args.arquivo
+    output_filename = "output.py"
+    print(f"--- Iniciando Compilação do Arquivo: {nome_arquivo} ---\n")
+
+    try:
+        with configurar_rastreio(args):
+            if args.backend == "ast":
+                executar_via_ast(args, nome_arquivo)
+            elif args.backend == "closures":
+                executar_via_closures(args, nome_arquivo)
+            else:
+                executar_via_texto(args, nome_arquivo, output_filename)
 
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{nome_arquivo}' não encontrado.")
+        exit(1)
     except (SyntaxError, NameError) as e:
         print(f"\nERRO DE COMPILAÇÃO: {e}")
     except Exception as e:
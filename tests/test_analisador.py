@@ -0,0 +1,20 @@
+import pytest
+
+from analisador import analisar_linha, analisar_linha_regex
+from corpus import gerar_corpus
+
+def _tokens(analisar, linha, num):
+    return [(t.tipo, t.valor, t.linha) for t in analisar(linha.strip(), num)]
+
+@pytest.mark.parametrize("semente", range(3))
+def test_analisadores_concordam_no_corpus(semente):
+    for num, linha in enumerate(gerar_corpus(5000, semente), start=1):
+        assert _tokens(analisar_linha_regex, linha, num) == _tokens(analisar_linha, linha, num), \
+            f"Divergência na linha {num}: {linha!r}"
+
+@pytest.mark.parametrize("linha", [
+    "", "int x = 10;", "real y = 3.14 + 2.;", "char c = 'a';", 'printf("texto");',
+    'printf("sem fim;', "x = y @ 2;", "return 0; // comentário", "a=-b*(c/d);",
+])
+def test_analisadores_concordam_em_casos_de_borda(linha):
+    assert _tokens(analisar_linha_regex, linha, 1) == _tokens(analisar_linha, linha, 1)
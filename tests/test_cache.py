@@ -0,0 +1,53 @@
+import os
+
+from cache import CompilationCache
+
+def test_despejo_ignora_entrada_removida_por_outro_processo(tmp_path, monkeypatch):
+    cache = CompilationCache(str(tmp_path), limite_bytes=10)
+    for i in range(3):
+        cache.put(f"chave{i}", "x = 1\n" * 5)
+
+    # Simula outro processo removendo a entrada entre o scandir e o stat
+    scandir = os.scandir
+
+    def scandir_com_remocao(caminho):
+        entradas = list(scandir(caminho))
+        os.remove(entradas[0].path)
+        return iter(entradas)
+
+    monkeypatch.setattr(os, "scandir", scandir_com_remocao)
+    cache.put("chave3", "x = 1\n" * 5)  # Não levanta FileNotFoundError
+    monkeypatch.undo()
+    assert sum(1 for nome in os.listdir(tmp_path) if nome.endswith(".py")) <= 1
+
+def test_despejo_conta_os_pyc_e_remove_os_menos_usados(tmp_path):
+    cache = CompilationCache(str(tmp_path), limite_bytes=1000)
+    os.makedirs(cache.diretorio_pyc)
+    antigo = os.path.join(cache.diretorio_pyc, "antigo.pyc")
+    with open(antigo, "wb") as f:
+        f.write(b"\0" * 600)
+    os.utime(antigo, (1, 1))
+    cache.put("chave0", "x" * 300)
+    assert os.path.exists(antigo)  # 900 bytes: cabe no limite
+
+    cache.put("chave1", "x" * 300)
+    assert not os.path.exists(antigo)
+    assert sorted(os.listdir(tmp_path)) == ["chave0.py", "chave1.py", "pyc"]
+
+def test_put_so_varre_o_diretorio_ao_passar_do_limite(tmp_path, monkeypatch):
+    cache = CompilationCache(str(tmp_path), limite_bytes=1000)
+    varreduras = []
+    entradas = cache._entradas
+    monkeypatch.setattr(cache, "_entradas", lambda: varreduras.append(1) or entradas())
+
+    for i in range(9):
+        cache.put(f"chave{i}", "x" * 100)
+    assert len(varreduras) == 1  # só a medição inicial
+    cache.put("chave0", "x" * 150)  # substituir uma entrada conta apenas a diferença
+    assert len(varreduras) == 1
+
+    cache.put("chave9", "x" * 100)  # 1050 bytes: varre e despeja até 90% do limite
+    assert len(varreduras) == 2
+    assert cache._total <= 900
+    assert cache._total == sum(os.path.getsize(tmp_path / nome) for nome in os.listdir(tmp_path))
+    assert not os.path.exists(tmp_path / "chave1.py")
@@ -0,0 +1,42 @@
+import json
+import socket
+import threading
+
+from cliente import CompileClient
+from servidor import compilar_pedido
+
+FONTE = "int main() {\n    int x = 1;\n    x = x + 2 + 3;\n    return x;\n}\n"
+
+def _servidor_de_teste(caminho, pedidos):
+    """Atende uma conexão como o servidor de compilação, guardando os pedidos recebidos."""
+    escuta = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    escuta.bind(caminho)
+    escuta.listen(1)
+
+    def atender():
+        conexao, _ = escuta.accept()
+        with conexao, conexao.makefile("rwb") as arquivo:
+            for linha in arquivo:
+                pedido = json.loads(linha)
+                pedidos.append(pedido)
+                resposta = compilar_pedido(pedido["fonte"], pedido.get("fused", False), int(pedido.get("O", 2)))
+                arquivo.write(json.dumps(resposta).encode() + b"\n")
+                arquivo.flush()
+        escuta.close()
+
+    thread = threading.Thread(target=atender, daemon=True)
+    thread.start()
+    return thread
+
+def test_compile_envia_o_nivel_de_otimizacao(tmp_path):
+    caminho, pedidos = str(tmp_path / "s.sock"), []
+    thread = _servidor_de_teste(caminho, pedidos)
+    with CompileClient(caminho) as cliente:
+        padrao = cliente.compile(FONTE)
+        sem_otimizacao = cliente.compile(FONTE, O=0)
+    thread.join(5)
+    assert [p["O"] for p in pedidos] == [2, 0]
+    assert padrao["ok"] and sem_otimizacao["ok"]
+    assert padrao["codigo"] == compilar_pedido(FONTE, nivel=2)["codigo"]
+    assert sem_otimizacao["codigo"] == compilar_pedido(FONTE, nivel=0)["codigo"]
+    assert padrao["codigo"] != sem_otimizacao["codigo"]
@@ -0,0 +1,28 @@
+import pytest
+
+from corpus import gerar_programa, gerar_programa_variado
+from executor import executar_codigo
+from gerador_ast import AstCodeGenerator
+from gerador_codigo import CodeGenerator
+from sintatico import analisar_fonte
+
+def _executar_os_dois(fonte, **opcoes):
+    raiz = analisar_fonte(fonte.splitlines(), **opcoes)
+    via_texto = executar_codigo(compile(CodeGenerator().visit(raiz), "output.py", "exec"))
+    via_ast = executar_codigo(AstCodeGenerator().compilar(raiz, "programa.txt"))
+    return via_texto, via_ast
+
+@pytest.mark.parametrize("fonte", [gerar_programa(2000), gerar_programa_variado(2000)], ids=["simples", "variado"])
+@pytest.mark.parametrize("nivel", [0, 2])
+def test_backend_ast_equivale_ao_texto(fonte, nivel):
+    via_texto, via_ast = _executar_os_dois(fonte, nivel=nivel)
+    assert via_ast == via_texto
+
+def test_backend_ast_com_textos_e_expressoes_profundas():
+    soma = " + ".join("x" if i % 2 else str(i % 10) for i in range(2000))
+    fonte = ("int main() {\n    int x = 1;\n    real y = 2.5 / 4;\n"
+             f"    x = {soma};\n    printf(\"a\\tb\\n\");\n    printf('c');\n"
+             "    printf();\n    printf(-y);\n    return x;\n}\n")
+    via_texto, via_ast = _executar_os_dois(fonte, nivel=0)
+    assert via_ast == via_texto
+    assert via_ast[0] == sum(1 if i % 2 else i % 10 for i in range(2000))
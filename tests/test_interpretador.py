@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from corpus import gerar_programa_funcoes, gerar_programa_variado
+from executor import executar_codigo
+from interpretador import executar_programa
+from sintatico import analisar_fonte, compilar_fonte
+
+def _executar(funcao):
+    # Resultado comparável: (retorno, texto impresso) ou o tipo da exceção
+    try:
+        return funcao()
+    except Exception as erro:
+        return type(erro)
+
+def _comparar(linhas, nivel=2):
+    """Executa o programa pelas closures e pelo código gerado; os resultados devem coincidir."""
+    chunks = []
+    compilar_fonte(linhas, chunks, nivel=nivel)
+    code = compile("".join(chunks), "output.py", "exec")
+    via_codigo = _executar(lambda: executar_codigo(code))
+    via_closures = _executar(lambda: executar_programa(analisar_fonte(linhas, nivel=nivel)))
+    assert via_closures == via_codigo
+    return via_closures
+
+def _main(*comandos):
+    return ["int main() {", *(f"    {comando}" for comando in comandos), "}"]
+
+@pytest.mark.parametrize("nivel", [0, 2])
+@pytest.mark.parametrize("gerar", [lambda: gerar_programa_variado(2000),
+                                   lambda: gerar_programa_funcoes(5, 200)], ids=["variado", "funcoes"])
+def test_programas_gerados(gerar, nivel):
+    retorno, texto = _comparar(gerar().splitlines(), nivel)
+    assert texto
+
+def test_textos_e_printf_sem_argumentos():
+    retorno, texto = _comparar(_main('printf("a\\tb\\\\n");', "printf('c');", "printf();", "char z;", "printf(z);",
+                                     "real r = 7 / 2;", "printf(-r);", "return 0;"))
+    assert texto == "a\tb\\n\nc\n\nNone\n-3.5\n" and retorno == 0
+
+@pytest.mark.parametrize("termos", [99, 100, 101, 3000])
+@pytest.mark.parametrize("nivel", [0, 2])
+def test_expressoes_profundas(termos, nivel):
+    _comparar(_main("int a = 2;", "real x = " + " - ".join(["a"] * termos) + ";", "printf(x);",
+                    "int y = " + "-(" * 150 + "a" + ")" * 150 + ";", "printf(y);",
+                    "return " + " + ".join("a" if i % 3 else str(i) for i in range(termos)) + ";"), nivel)
+
+def test_funcoes_chamadas_antes_de_declaradas():
+    retorno, texto = _comparar(["int main() {", "    f();", "    printf(1);", "    return 0;", "}",
+                                "int f() {", '    printf("f");', "    return 0;", "}",
+                                "int g() {", "    return 1;", "}"])
+    assert texto == "f\n1\n" and retorno == 0
+
+@pytest.mark.parametrize("comandos, erro", [
+    (("int a = 0;", "return 1 / a;"), ZeroDivisionError),
+    (("char z;", "printf(z + 1);", "return 0;"), TypeError),
+    (("int a = 1;", "printf(a);", "main(a);", "return 0;"), TypeError),
+    (("printf(1);", "main();", "return 0;"), RecursionError),
+])
+def test_erros_de_execucao(comandos, erro):
+    assert _comparar(_main(*comandos), nivel=0) is erro
+
+def test_programa_sem_main():
+    linhas = ["int f() {", "    return 1;", "}"]
+    chunks = []
+    compilar_fonte(linhas, chunks)
+    code = compile("".join(chunks), "output.py", "exec")
+    for executar in (lambda: executar_codigo(code), lambda: executar_programa(analisar_fonte(linhas))):
+        with pytest.raises(NameError, match="^name 'main' is not defined$"):
+            executar()
+
+def test_expressoes_aleatorias():
+    def expressao(rng, profundidade):
+        if profundidade == 0 or rng.random() < 0.25:
+            return rng.choice(["a", "b", "c", "0", str(rng.randint(0, 9)), f"{rng.randint(1, 9)}.5"])
+        escolha = rng.random()
+        if escolha < 0.15:
+            return "-" + expressao(rng, profundidade - 1)
+        if escolha < 0.3:
+            return "(" + expressao(rng, profundidade - 1) + ")"
+        return f"{expressao(rng, profundidade - 1)} {rng.choice('+-*/')} {expressao(rng, profundidade - 1)}"
+
+    for semente in range(200):
+        rng = random.Random(semente)
+        linhas = _main("int a = 3;", "int b = -2;", "real c = 0.5;", f"printf({expressao(rng, 4)});",
+                       f"a = {expressao(rng, 5)};", "printf(a);", f"return {expressao(rng, 5)};")
+        for nivel in (0, 2):
+            _comparar(linhas, nivel)
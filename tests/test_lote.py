@@ -0,0 +1,59 @@
+from lote import coletar_fontes, compilar_lote, imprimir_resumo
+
+def test_entrada_com_erro_nao_gera_saida_e_aparece_como_falha(tmp_path, capsys):
+    fontes, saida = tmp_path / "fontes", tmp_path / "saida"
+    fontes.mkdir()
+    (fontes / "a.txt").write_text("int main() {\n    printf(\"a\");\n    return 0;\n}\n", encoding="utf-8")
+    (fontes / "b.txt").write_text("int main() {\n    int x = ;\n    return 0;\n}\n", encoding="utf-8")
+
+    resultados = compilar_lote(coletar_fontes([str(fontes)]), str(saida), jobs=2)
+    por_fonte = {r["fonte"].rsplit("/", 1)[-1]: r for r in resultados}
+    assert por_fonte["a.txt"]["ok"]
+    assert not por_fonte["b.txt"]["ok"]
+    assert "ERRO DE COMPILAÇÃO" in por_fonte["b.txt"]["erro"]
+    assert sorted(p.name for p in saida.iterdir()) == ["a.py"]
+
+    imprimir_resumo(resultados, 1.0)
+    resumo = capsys.readouterr().out
+    assert "FALHA" in resumo and "b.txt" in resumo
+    assert "sucesso: 1 | falha: 1" in resumo
+
+def test_entrada_com_erro_ao_lado_da_fonte(tmp_path):
+    fonte = tmp_path / "b.txt"
+    fonte.write_text("int main() {\n    y = 1;\n    return 0;\n}\n", encoding="utf-8")
+    [resultado] = compilar_lote(coletar_fontes([str(fonte)]), jobs=1)
+    assert not resultado["ok"]
+    assert not (tmp_path / "b.py").exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["b.txt"]
+
+PROGRAMA = "int main() {\n    printf(\"a\");\n    return 0;\n}\n"
+
+def test_entrada_py_nao_e_sobrescrita(tmp_path):
+    fonte = tmp_path / "a.py"
+    fonte.write_text(PROGRAMA, encoding="utf-8")
+    [resultado] = compilar_lote(coletar_fontes([str(fonte)]), jobs=1)
+    assert not resultado["ok"]
+    assert ".py" in resultado["erro"]
+    assert fonte.read_text(encoding="utf-8") == PROGRAMA
+
+def test_destino_que_e_outra_fonte_do_lote(tmp_path):
+    (tmp_path / "a.txt").write_text(PROGRAMA, encoding="utf-8")
+    (tmp_path / "a.py").write_text(PROGRAMA, encoding="utf-8")
+    resultados = compilar_lote(coletar_fontes([str(tmp_path / "a.txt"), str(tmp_path / "a.py")]), jobs=1)
+    assert [r["ok"] for r in resultados] == [False, False]
+    assert "fonte" in resultados[0]["erro"]
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == PROGRAMA
+
+def test_destinos_repetidos_sao_recusados_antes_de_compilar(tmp_path):
+    raiz1, raiz2, unico, saida = (tmp_path / nome for nome in ("r1", "r2", "r3", "saida"))
+    for raiz in (raiz1, raiz2, unico):
+        raiz.mkdir()
+    (raiz1 / "a.txt").write_text(PROGRAMA, encoding="utf-8")
+    (raiz2 / "a.txt").write_text(PROGRAMA, encoding="utf-8")
+    (unico / "b.txt").write_text(PROGRAMA, encoding="utf-8")
+
+    resultados = compilar_lote(coletar_fontes([str(raiz1), str(raiz2), str(unico)]), str(saida), jobs=2)
+    assert [r["ok"] for r in resultados] == [False, False, True]
+    assert str(raiz2 / "a.txt") in resultados[0]["erro"]
+    assert str(raiz1 / "a.txt") in resultados[1]["erro"]
+    assert sorted(p.name for p in saida.iterdir()) == ["b.py"]
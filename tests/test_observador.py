@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from observador import IncrementalCompiler, gravar, segmentar
+from sintatico import SyntaxError, compilar_fonte
+
+PROGRAMA = ["int f() {", "    int a = 1 + 2;", "    printf(a);", "    return a;", "}",
+            "int g() {", "    int b = 3;", "    printf(b * 2);", "    return 0;", "}",
+            "int main() {", "    f();", "    g();", "    return 0;", "}"]
+
+def _completa(linhas):
+    chunks = []
+    compilar_fonte(linhas, chunks)
+    return "".join(chunks)
+
+def _atualizar(compilador, linhas):
+    """Atualiza o compilador, confere o código com o da compilação completa e retorna as estatísticas."""
+    assert compilador.atualizar(linhas) == _completa(linhas)
+    estatisticas = dict(compilador.estatisticas)
+    assert estatisticas.pop("tempo") >= 0
+    return estatisticas
+
+def _estatisticas(relexadas, recompiladas, completa):
+    return {"linhas_relexadas": relexadas, "funcoes_recompiladas": recompiladas, "completa": completa}
+
+def _trocar(linhas, antigo, novo):
+    return [linha.replace(antigo, novo) for linha in linhas]
+
+def test_sequencia_de_edicoes_igual_a_compilacao_completa():
+    compilador = IncrementalCompiler()
+    assert _atualizar(compilador, PROGRAMA) == _estatisticas(15, 3, True)
+    # Nada mudou
+    assert _atualizar(compilador, PROGRAMA) == _estatisticas(0, 0, False)
+
+    # Uma linha dentro de g: só g é recompilada
+    editado = _trocar(PROGRAMA, "b * 2", "b * 3")
+    assert _atualizar(compilador, editado) == _estatisticas(1, 1, False)
+
+    # Uma função nova entre f e g: as vizinhas tocam o trecho e são recompiladas junto
+    com_h = editado[:5] + ["int h() {", "    return 1;", "}"] + editado[5:]
+    assert _atualizar(compilador, com_h) == _estatisticas(3, 3, False)
+
+    # Uma linha inserida desloca as funções seguintes, que não são recompiladas
+    deslocado = com_h[:2] + ["    int c = a * a;"] + com_h[2:]
+    assert _atualizar(compilador, deslocado) == _estatisticas(1, 1, False)
+    assert [(f.inicio, f.fim) for f in compilador.funcoes] == [(0, 6), (6, 9), (9, 14), (14, 19)]
+
+    # Renomear h (que ninguém chama) e depois apagá-la: as outras funções
+    # podem chamar o nome antigo, então a recompilação é completa
+    renomeado = _trocar(deslocado, "int h()", "int k()")
+    assert _atualizar(compilador, renomeado) == _estatisticas(1, 4, True)
+    sem_k = renomeado[:6] + renomeado[9:]
+    assert _atualizar(compilador, sem_k) == _estatisticas(0, 3, True)
+
+    # Uma função nova no fim do arquivo
+    com_fim = sem_k + ["int z() {", "    g();", "    return 2;", "}"]
+    assert _atualizar(compilador, com_fim) == _estatisticas(4, 2, False)
+
+def test_chave_apagada_recompila_tudo():
+    compilador = IncrementalCompiler()
+    _atualizar(compilador, PROGRAMA)
+    sem_chave = PROGRAMA[:9] + PROGRAMA[10:]
+    with pytest.raises(SyntaxError, match="line 10: Expected ';', got '\\('"):
+        compilador.atualizar(sem_chave)
+    assert not compilador.valido
+    assert compilador.estatisticas["funcoes_recompiladas"] == 0
+    # Depois do erro, a compilação seguinte é completa, mas só a linha devolvida é relida
+    assert _atualizar(compilador, PROGRAMA) == _estatisticas(1, 3, True)
+
+def test_funcao_chamada_renomeada():
+    compilador = IncrementalCompiler()
+    _atualizar(compilador, PROGRAMA)
+    with pytest.raises(NameError, match="Função 'g' não foi declarada"):
+        compilador.atualizar(_trocar(PROGRAMA, "int g()", "int g2()"))
+    # Corrigindo também a chamada (a única linha relida), volta a compilar
+    renomeado = _trocar(PROGRAMA, "g()", "g2()")
+    assert _atualizar(compilador, renomeado) == _estatisticas(1, 3, True)
+    assert [f.node.name for f in compilador.funcoes] == ["f", "g2", "main"]
+
+def test_segmentar():
+    from analisador import analisar_fluxo
+    tokens = list(analisar_fluxo(PROGRAMA))
+    segmentos = segmentar(tokens)
+    assert [(tokens[i].linha, tokens[j - 1].linha) for i, j in segmentos] == [(1, 5), (6, 10), (11, 15)]
+    assert segmentar(tokens[:-1]) is None
+    assert segmentar(tokens + tokens[-1:]) is None
+
+def test_gravar_usa_temporario_do_processo(tmp_path, monkeypatch):
+    destino = tmp_path / "output.py"
+    substituidos = []
+    replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda origem, alvo: substituidos.append(origem) or replace(origem, alvo))
+    gravar(str(destino), "x = 1\n")
+    assert destino.read_text() == "x = 1\n"
+    assert substituidos == [f"{destino}.{os.getpid()}.tmp"]
+    assert os.listdir(tmp_path) == ["output.py"]
+
+def test_gravar_com_falha_nao_deixa_temporario(tmp_path):
+    destino = tmp_path / "output.py"
+    destino.mkdir()  # os.replace falha: o destino é um diretório
+    with pytest.raises(OSError):
+        gravar(str(destino), "x = 1\n")
+    assert os.listdir(tmp_path) == ["output.py"]
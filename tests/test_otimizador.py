@@ -0,0 +1,216 @@
+import pytest
+
+import nodes
+from analisador import analisar_fluxo
+from gerador_codigo import CodeGenerator
+from otimizador import NIVEIS_OTIMIZACAO, TERMOS_CADEIA, PassManager, reassociar_somas
+from semantico import SemanticAnalyzer
+from serializacao import serializar_ast
+from sintatico import Parser
+
+def _analisar(linhas):
+    raiz = Parser(analisar_fluxo(linhas)).parse_programa()
+    SemanticAnalyzer().visit(raiz)
+    return raiz
+
+def _main(*comandos):
+    return ["int main() {", *(f"    {comando}" for comando in comandos), "}"]
+
+def _otimizar(linhas, passes, fixpoint=False):
+    """Código gerado depois de executar os passes; retorna (código, PassManager)."""
+    pass_manager = PassManager(passes, fixpoint)
+    return CodeGenerator().visit(pass_manager.run(_analisar(linhas))), pass_manager
+
+def _contadores(pass_manager):
+    return {nome: (s.execucoes, s.visitados, s.reescritos, s.removidos) for nome, s in pass_manager.stats.items()}
+
+PROGRAMA = _main("int x = 2 * 3;", "int y = x + 1 + 2;", "y = y + 4;", "printf(y);", "return y;")
+
+def test_niveis_e_ordem_dos_passes():
+    assert NIVEIS_OTIMIZACAO == {
+        0: ((), False),
+        1: (("constant-folding",), False),
+        2: (("constant-folding", "reassociation", "constant-propagation"), True),
+    }
+    for nivel, (nomes, fixpoint) in NIVEIS_OTIMIZACAO.items():
+        pass_manager = PassManager.para_nivel(nivel)
+        assert [passe.nome for passe in pass_manager.passes] == list(nomes)
+        assert pass_manager.fixpoint is fixpoint
+
+def test_O0_nao_altera_a_ast():
+    raiz = _analisar(PROGRAMA)
+    antes = serializar_ast(raiz)
+    pass_manager = PassManager.para_nivel(0)
+    assert pass_manager.run(raiz) is raiz
+    assert serializar_ast(raiz) == antes
+    assert pass_manager.iteracoes == 0 and pass_manager.stats == {}
+
+def test_O1_so_calcula_constantes():
+    pass_manager = PassManager.para_nivel(1)
+    codigo = CodeGenerator().visit(pass_manager.run(_analisar(PROGRAMA)))
+    assert codigo == ("def main():\n    x = 6\n    y = x + 1 + 2\n    y = y + 4\n    print(y)\n    return y\n")
+    assert pass_manager.iteracoes == 1
+    assert _contadores(pass_manager) == {"constant-folding": (1, 23, 1, 0)}
+
+def test_O2_ate_o_ponto_fixo():
+    pass_manager = PassManager.para_nivel(2)
+    raiz = pass_manager.run(_analisar(PROGRAMA))
+    assert CodeGenerator().visit(raiz) == "def main():\n    print(13)\n    return 13\n"
+    # A segunda rodada não altera nada e encerra a iteração
+    assert pass_manager.iteracoes == 2
+    assert _contadores(pass_manager) == {
+        "constant-folding": (2, 30, 1, 0),
+        "reassociation": (2, 12, 1, 1),
+        "constant-propagation": (2, 18, 6, 3),
+    }
+    # No ponto fixo, otimizar de novo não altera nada
+    de_novo = PassManager.para_nivel(2)
+    de_novo.run(raiz)
+    assert de_novo.iteracoes == 1
+    assert all(s.reescritos == s.removidos == 0 for s in de_novo.stats.values())
+
+def test_limite_de_rodadas_e_rodada_unica():
+    passes = NIVEIS_OTIMIZACAO[2][0]
+    # A primeira rodada altera a árvore: com o limite de uma rodada, não há a de confirmação
+    pass_manager = PassManager(passes, fixpoint=True, max_iteracoes=1)
+    pass_manager.run(_analisar(PROGRAMA))
+    assert pass_manager.iteracoes == 1
+    codigo, pass_manager = _otimizar(PROGRAMA, passes)
+    assert pass_manager.iteracoes == 1
+    assert codigo == "def main():\n    print(13)\n    return 13\n"
+
+def test_passe_desconhecido():
+    with pytest.raises(ValueError, match="Passe de otimização desconhecido: 'inline'"):
+        PassManager(("constant-folding", "inline"))
+
+def test_somar_estatisticas():
+    total = PassManager.para_nivel(2)
+    parciais = []
+    for _ in range(2):
+        pass_manager = PassManager.para_nivel(2)
+        pass_manager.run(_analisar(PROGRAMA))
+        total.somar(pass_manager.stats, pass_manager.iteracoes)
+        parciais.append(_contadores(pass_manager))
+    assert total.iteracoes == 2
+    assert _contadores(total) == {nome: tuple(a + b for a, b in zip(parciais[0][nome], parciais[1][nome]))
+                                  for nome in parciais[0]}
+    assert "Rodadas: 2" in total.relatorio()
+
+def _forma(expr):
+    """Forma da expressão em notação prefixa: (op esquerda direita), (op operando)."""
+    pilha, partes = [expr], []
+    while pilha:
+        node = pilha.pop()
+        if isinstance(node, str):
+            partes.append(node)
+        elif isinstance(node, nodes.BinaryOpNode):
+            pilha += [")", node.right, " ", node.left, f"({node.op} "]
+        elif isinstance(node, nodes.UnaryOpNode):
+            pilha += [")", node.operand, f"({node.op} "]
+        else:
+            partes.append(str(node.value))
+    return "".join(partes)
+
+def _reassociar(*comandos, passes=("reassociation",)):
+    """Formas das expressões dos comandos de main() depois dos passes."""
+    pass_manager = PassManager(passes)
+    corpo = pass_manager.run(_analisar(_main(*comandos))).declarations[0].body
+    formas = []
+    for stmt in corpo:
+        expr = stmt.arg_list[0] if isinstance(stmt, nodes.FuncCallStmtNode) else stmt.expr_node
+        formas.append(_forma(expr) if expr is not None else None)
+    return formas, pass_manager.stats["reassociation"]
+
+def test_reassociacao_junta_as_constantes_inteiras():
+    formas, stats = _reassociar("int x = 5;", "int y = 1 + x + 2;", "return x + 1 + 2 + x * (x + 4 + 5);")
+    assert formas == ["5", "(+ x 3)", "(+ (+ x (* x (+ x 9))) 3)"]
+    assert (stats.reescritos, stats.removidos) == (3, 3)
+
+def test_reassociacao_de_constantes_negativas_e_nulas():
+    # Com o folding antes, '-3' já é um literal
+    formas, _ = _reassociar("int x = 5;", "int y = 2 + x + -3;", "int z = 3 + x + -3;", "int w = 1 + 2 + 3;",
+                            "return 0 + x;", passes=("constant-folding", "reassociation"))
+    assert formas == ["5", "(- x 1)", "x", "6", "x"]
+
+def test_reassociacao_ignora_reais():
+    formas, stats = _reassociar("real r = 1.5;", "real y = 1 + r + 2;", "int x = 1;", "printf(1 + x + 2.5 + 3);",
+                                "return 1 + 2.5 + 3;")
+    assert formas == ["1.5", "(+ (+ 1 r) 2)", "1", "(+ (+ (+ 1 x) 2.5) 3)", "(+ (+ 1 2.5) 3)"]
+    assert stats.reescritos == 0
+
+def test_reassociacao_ignora_cadeias_com_divisao():
+    formas, stats = _reassociar("int x = 5;", "real y = x / 2 + 1 + 2;", "printf(1 + x / x + 2);", "return 0;")
+    assert formas == ["5", "(+ (+ (/ x 2) 1) 2)", "(+ (+ 1 (/ x x)) 2)", "0"]
+    assert stats.reescritos == 0
+
+def test_reassociacao_ignora_variaveis_que_podem_nao_ser_inteiras():
+    # 'm' é int mas recebe um real; 'k' copia 'm'; 'x' perde o valor inteiro
+    # ao receber 'r'; 'n' não tem valor; 'c' é um caractere
+    formas, stats = _reassociar("int a = 5;", "int m = a / 2;", "int k = m;", "real r = 1.5;", "int x = 1;",
+                                "x = r;", "int n;", "char c = 'a';",
+                                "printf(m + 1 + 2);", "printf(k + 1 + 2);", "printf(x + 1 + 2);",
+                                "printf(n + 1 + 2);", "printf(c + 1 + 2);", "return a + 1 + 2;")
+    assert formas[8:] == ["(+ (+ m 1) 2)", "(+ (+ k 1) 2)", "(+ (+ x 1) 2)", "(+ (+ n 1) 2)", "(+ (+ c 1) 2)",
+                          "(+ a 3)"]
+    assert stats.reescritos == 1
+
+def test_reassociacao_de_somas_longas_fica_balanceada():
+    termos = TERMOS_CADEIA * 4
+    soma = " + ".join(f"x{i % 2}" if i % 3 else str(i) for i in range(termos))
+    corpo = _analisar(_main("int x0 = 1;", "int x1 = 2;", f"int y = {soma};", "return y;")).declarations[0].body
+    expr = reassociar_somas(corpo)[2].expr_node
+
+    def profundidade(node):
+        if isinstance(node, nodes.BinaryOpNode):
+            return 1 + max(profundidade(node.left), profundidade(node.right))
+        return 0
+    # As constantes viram um único termo, o último
+    folha = expr
+    while isinstance(folha, nodes.BinaryOpNode):
+        folha = folha.right
+    assert folha.value == str(sum(i for i in range(termos) if not i % 3))
+    folhas = _forma(expr).replace("(+ ", "").replace(")", "").split()
+    assert len(folhas) == termos - termos // 3 and sum(f.isdigit() for f in folhas) == 1
+    assert profundidade(expr) <= 8
+
+def _propagar(linhas):
+    pass_manager = PassManager(("constant-propagation",))
+    raiz = pass_manager.run(_analisar(linhas))
+    return CodeGenerator().visit(raiz), pass_manager.stats["constant-propagation"]
+
+def test_propagacao_entre_reatribuicoes():
+    # 'y' copia 'x' sem valor conhecido; a cópia deixa de valer quando 'x' muda
+    codigo, stats = _propagar(_main("int x;", "int y = x;", "x = 3;", "printf(y);", "y = x;", "x = 4;",
+                                    "printf(y + x);", "return x;"))
+    assert codigo == "def main():\n    x = None\n    y = x\n    print(y)\n    print(7)\n    return 4\n"
+    assert (stats.reescritos, stats.removidos) == (5, 3)
+
+def test_propagacao_com_sombreamento():
+    # Cada 'x' é um Symbol diferente, e o 'f' local esconde a função f
+    codigo, _ = _propagar(["int f() {", "    int x = 7;", "    printf(x);", "    return x;", "}",
+                           "int main() {", "    int x = 1;", "    int f = 3;", "    printf(x + f);", "    x = f;",
+                           "    printf(x);", "    return x;", "}"])
+    assert codigo == ("def f():\n    print(7)\n    return 7\n"
+                      "def main():\n    print(4)\n    print(3)\n    return 3\n")
+
+def test_propagacao_remove_atribuicoes_mortas():
+    # Só as atribuições de valores simples, que não falham na execução, são removidas
+    codigo, stats = _propagar(_main("int x = 1;", "x = 2;", "int z = 0;", "int d = 1 / z;", "int e = z;",
+                                    "real r = 2.5;", "r = r * 2;", "return x;", "printf(x);"))
+    assert codigo == "def main():\n    d = 1 / 0\n    return 2\n"
+    # O printf depois do return também sai
+    assert stats.removidos == 7
+
+def test_valores_propagados_ficam_na_linha_do_uso():
+    from gerador_ast import AstCodeGenerator
+    linhas = _main("int z = 0;", "char c = 'a';", "int y = z;", "printf(c);", "printf(c + y);", "return 1 / y;")
+    raiz = PassManager(("constant-propagation",)).run(_analisar(linhas))
+    printf_c, printf_y, retorno = raiz.declarations[0].body
+    assert (printf_c.arg_list[0].value, printf_c.arg_list[0].linha) == ("a", 5)
+    soma = printf_y.arg_list[0]
+    assert [(n.value, n.linha) for n in (soma.left, soma.right)] == [("a", 6), ("0", 6)]
+    assert (retorno.expr_node.right.value, retorno.expr_node.right.linha) == ("0", 7)
+    # As linhas do code object do backend ast são só as dos comandos que sobraram
+    code = AstCodeGenerator().compilar(raiz, "programa.txt")
+    main = next(c for c in code.co_consts if hasattr(c, "co_lines"))
+    assert {linha for _, _, linha in main.co_lines() if linha is not None} == {1, 5, 6, 7}
@@ -0,0 +1,31 @@
+import io
+
+import pytest
+
+from corpus import gerar_programa_funcoes
+from paralelo import otimizar_e_gerar
+from sintatico import analisar_fonte, compilar_fonte
+
+LINHAS = gerar_programa_funcoes(6, 300).splitlines()
+
+def _compilar(jobs, nivel=2):
+    saida = io.StringIO()
+    compilar_fonte(LINHAS, saida, nivel=nivel, jobs=jobs)
+    return saida.getvalue()
+
+@pytest.mark.parametrize("nivel", [0, 1, 2])
+def test_saida_nao_depende_do_numero_de_processos(nivel):
+    referencia = _compilar(1, nivel)
+    assert "def f1():" in referencia and "def main():" in referencia
+    for jobs in (2, 8):
+        assert _compilar(jobs, nivel) == referencia
+
+def test_estatisticas_somam_as_de_todas_as_funcoes():
+    def estatisticas(jobs):
+        programa = analisar_fonte(LINHAS, nivel=0)
+        _, codigo, pass_manager = otimizar_e_gerar(programa, 2, jobs)
+        numeros = {nome: (s.execucoes, s.visitados, s.reescritos, s.removidos)
+                   for nome, s in pass_manager.stats.items()}
+        return codigo, numeros, pass_manager.iteracoes
+
+    assert estatisticas(3) == estatisticas(1)
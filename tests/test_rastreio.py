@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from rastreio import DEBUG, INFO, interpretar_categorias
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMA = "int main() {\n    int x = 2 * 3;\n    int y = x + 1 + 2;\n    printf(y);\n    return y;\n}\n"
+
+def _compilar(tmp_path, *opcoes):
+    fonte = tmp_path / "programa.txt"
+    fonte.write_text(PROGRAMA, encoding="utf-8")
+    return subprocess.run([sys.executable, os.path.join(RAIZ, "sintatico.py"), str(fonte), "--backend", "closures",
+                           "--no-cache", *opcoes], cwd=tmp_path, capture_output=True, text=True)
+
+def _registros(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        registros = [json.loads(linha) for linha in f]
+    for registro in registros:
+        # Os tempos variam entre execuções
+        assert isinstance(registro.pop("t"), float)
+        if registro["evento"] == "pass":
+            assert registro.pop("tempo") >= 0
+    return registros
+
+def test_trace_out_grava_so_as_categorias_e_niveis_pedidos(tmp_path):
+    # lexer em info (só tokens inválidos, que não há) e optimizer em debug;
+    # symtab e codegen ficam de fora
+    resultado = _compilar(tmp_path, "--trace", "lexer,optimizer:debug", "--trace-out", "rastro.jsonl")
+    assert resultado.returncode == 0, resultado.stderr
+    assert "(main retornou 9)" in resultado.stdout
+    assert "Otimização:" not in resultado.stdout
+
+    def passe(nome, rodada, alteracoes):
+        return {"categoria": "optimizer", "nivel": "info", "evento": "pass", "passe": nome, "rodada": rodada,
+                "alteracoes": alteracoes}
+
+    registros = _registros(tmp_path / "rastro.jsonl")
+    for registro in registros:
+        if registro["evento"] == "pass":
+            assert registro.pop("mensagem").startswith(f"Otimização: passe '{registro['passe']}' "
+                                                       f"(rodada {registro['rodada']}): "
+                                                       f"{registro['alteracoes']} alterações em ")
+    assert registros == [
+        {"categoria": "optimizer", "nivel": "debug", "evento": "fold", "expressao": "2 * 3", "resultado": "6",
+         "mensagem": "Otimização: Expressão '2 * 3' calculada como '6'."},
+        passe("constant-folding", 1, 1),
+        {"categoria": "optimizer", "nivel": "debug", "evento": "reassociate", "linha": 3, "constantes": 2,
+         "total": 3, "mensagem": "Otimização: 2 constantes da soma na linha 3 agrupadas em '3'."},
+        passe("reassociation", 1, 2),
+        {"categoria": "optimizer", "nivel": "debug", "evento": "fold", "expressao": "6 + 3", "resultado": "9",
+         "mensagem": "Otimização: Expressão '6 + 3' calculada como '9'."},
+        passe("constant-propagation", 1, 6),
+        passe("constant-folding", 2, 0),
+        passe("reassociation", 2, 0),
+        passe("constant-propagation", 2, 0),
+    ]
+
+def test_trace_out_com_niveis_de_cada_categoria(tmp_path):
+    resultado = _compilar(tmp_path, "--trace", "lexer:debug,symtab", "--trace-out", "rastro.jsonl")
+    assert resultado.returncode == 0, resultado.stderr
+    registros = _registros(tmp_path / "rastro.jsonl")
+    assert {(r["categoria"], r["nivel"]) for r in registros} == {("lexer", "debug"), ("symtab", "info")}
+    linhas = [r for r in registros if r["evento"] == "line"]
+    assert [r["linha"] for r in linhas] == [1, 2, 3, 4, 5, 6]
+    assert linhas[3]["tokens"] == [["Identificador", "printf"], ["Simbolo", "("], ["Identificador", "y"],
+                                   ["Simbolo", ")"], ["Simbolo", ";"]]
+    assert [(r["evento"], r.get("nome")) for r in registros if r["categoria"] == "symtab"] == [
+        ("define", "print"), ("define", "printf"), ("define", "main"), ("enter_scope", None),
+        ("define", "x"), ("define", "y"), ("leave_scope", None)]
+
+def test_categoria_desconhecida(tmp_path):
+    resultado = _compilar(tmp_path, "--trace", "parser,optimizer")
+    assert resultado.returncode == 2
+    assert "Categoria de rastreamento desconhecida: 'parser'" in resultado.stderr
+
+@pytest.mark.parametrize("especificacao, niveis", [
+    ("optimizer", {"optimizer": INFO}),
+    ("symtab:debug, optimizer", {"symtab": DEBUG, "optimizer": INFO}),
+    ("all", {"lexer": INFO, "symtab": INFO, "optimizer": INFO, "codegen": INFO}),
+    ("all:debug,lexer:info", {"lexer": INFO, "symtab": DEBUG, "optimizer": DEBUG, "codegen": DEBUG}),
+])
+def test_interpretar_categorias(especificacao, niveis):
+    assert interpretar_categorias(especificacao) == niveis
+
+def test_nivel_desconhecido():
+    with pytest.raises(ValueError, match="Nível de rastreamento desconhecido: 'trace'"):
+        interpretar_categorias("optimizer:trace")
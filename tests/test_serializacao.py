@@ -0,0 +1,58 @@
+import pytest
+
+from analisador import analisar_buffer
+from corpus import gerar_programa_funcoes, gerar_programa_variado
+from gerador_codigo import CodeGenerator
+from serializacao import desserializar_ast, desserializar_tokens, serializar_ast, serializar_tokens
+from sintatico import Parser, analisar_fonte
+
+PROGRAMAS = [gerar_programa_variado(3000), gerar_programa_funcoes(4, 200)]
+
+@pytest.mark.parametrize("fonte", PROGRAMAS, ids=["variado", "funcoes"])
+def test_ida_e_volta_dos_tokens(fonte):
+    buffer = analisar_buffer(fonte.splitlines())
+    dados = serializar_tokens(buffer)
+    copia = desserializar_tokens(dados)
+    assert [str(t) for t in copia] == [str(t) for t in buffer]
+    assert serializar_tokens(copia) == dados
+
+@pytest.mark.parametrize("otimizar", [False, True])
+@pytest.mark.parametrize("fonte", PROGRAMAS, ids=["variado", "funcoes"])
+def test_ida_e_volta_da_ast(fonte, otimizar):
+    linhas = fonte.splitlines()
+    arvore = analisar_fonte(linhas) if otimizar else Parser(analisar_buffer(linhas)).parse_programa()
+    dados = serializar_ast(arvore)
+    copia = desserializar_ast(dados)
+    assert serializar_ast(copia) == dados
+    assert CodeGenerator().visit(copia) == CodeGenerator().visit(arvore)
+
+def test_ida_e_volta_de_expressao_profunda():
+    soma = " + ".join("x" if i % 2 else str(i) for i in range(20000))
+    arvore = analisar_fonte(["int main() {", "    int x = 1;", f"    x = {soma};", "    return x;", "}"], nivel=0)
+    copia = desserializar_ast(serializar_ast(arvore))
+    assert CodeGenerator().visit(copia) == CodeGenerator().visit(arvore)
+
+@pytest.mark.parametrize("estragar, mensagem", [
+    (lambda dados: b"XXXX" + dados[4:], "Não é um arquivo serializado"),
+    (lambda dados: dados[:4] + b"\xff" + dados[5:], "Versão 255"),
+    (lambda dados: dados[:len(dados) // 2], "truncados"),
+])
+def test_dados_invalidos(estragar, mensagem):
+    dados = serializar_tokens(analisar_buffer(PROGRAMAS[0].splitlines()))
+    with pytest.raises(ValueError, match=mensagem):
+        desserializar_tokens(estragar(dados))
+
+def test_conteudo_errado():
+    dados = serializar_tokens(analisar_buffer(PROGRAMAS[0].splitlines()))
+    with pytest.raises(ValueError, match="esperado 'A'"):
+        desserializar_ast(dados)
+
+def test_ida_e_volta_de_ast_com_erros_de_sintaxe():
+    linhas = ["int f( {", "    int a = 1 +;", "    return a;", "}", "int main() {", "    return 0;", "}"]
+    arvore = Parser(analisar_buffer(linhas), recuperar=True).parse_programa()
+    dados = serializar_ast(arvore)
+    copia = desserializar_ast(dados)
+    assert serializar_ast(copia) == dados
+    funcao = copia.declarations[0]
+    assert (funcao.var_name, funcao.linha, len(funcao.body)) == ("f", 1, 2)
+    assert funcao.body[0].var_name == "a"
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+
+from servidor import CompileServer, compilar_pedido
+
+FONTE = "int main() {\n    int x = 1;\n    return x;\n}\n"
+
+class _Escrita:
+    """Lado de escrita de uma conexão, guardando as respostas enviadas."""
+    def __init__(self):
+        self.dados, self.fechada = b"", False
+
+    def write(self, dados):
+        self.dados += dados
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.fechada = True
+
+def _atender(servidor, entrada, limite=2**16):
+    async def conexao():
+        reader = asyncio.StreamReader(limit=limite)
+        reader.feed_data(entrada)
+        reader.feed_eof()
+        writer = _Escrita()
+        await servidor.atender(reader, writer)
+        assert writer.fechada
+        return [json.loads(linha) for linha in writer.dados.splitlines()]
+    return asyncio.run(conexao())
+
+def _pedido(**campos):
+    return json.dumps(campos).encode() + b"\n"
+
+def test_pedidos_invalidos_recebem_resposta_de_erro():
+    servidor = CompileServer(jobs=1)
+    try:
+        respostas = _atender(servidor, b"nao e json\n" + _pedido(O=2) + _pedido(fonte=FONTE, O=5)
+                             + _pedido(fonte=FONTE, O="2") + b"[1]\n" + _pedido(fonte=FONTE, O=0))
+    finally:
+        servidor.pool.shutdown()
+    assert [r["ok"] for r in respostas] == [False, False, False, False, False, True]
+    assert all(r["erro"].startswith("Pedido inválido: ") for r in respostas[:5])
+    assert "'fonte' ausente" in respostas[1]["erro"]
+    assert "nível de otimização 5 inexistente (use 0, 1, 2)" in respostas[2]["erro"]
+    assert "'2'" in respostas[3]["erro"]
+    assert respostas[5]["codigo"] == compilar_pedido(FONTE, nivel=0)["codigo"]
+
+def test_pedido_maior_que_o_limite_encerra_a_conexao_com_erro():
+    servidor = CompileServer(jobs=1)
+    try:
+        respostas = _atender(servidor, _pedido(fonte=FONTE * 10) + _pedido(fonte=FONTE), limite=64)
+    finally:
+        servidor.pool.shutdown()
+    assert len(respostas) == 1
+    assert not respostas[0]["ok"] and "Pedido inválido: maior que" in respostas[0]["erro"]
+
+def test_pool_quebrado_responde_com_erro_e_e_substituido():
+    servidor = CompileServer(jobs=1)
+    quebrado = servidor.pool
+    try:
+        # Um worker que morre deixa o pool inteiro inutilizável
+        quebrado.submit(os._exit, 1).exception()
+        respostas = _atender(servidor, _pedido(fonte=FONTE) + _pedido(fonte=FONTE))
+    finally:
+        servidor.pool.shutdown()
+    assert not respostas[0]["ok"] and "terminou inesperadamente" in respostas[0]["erro"]
+    assert respostas[1]["ok"]
+    assert servidor.pool is not quebrado
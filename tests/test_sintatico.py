@@ -0,0 +1,150 @@
+import sys
+
+import pytest
+
+from executor import executar_codigo
+from analisador import analisar_fluxo
+from nodes import BinaryOpNode, ErrorNode, FuncCallStmtNode, FuncDeclNode, ReturnNode, UnaryOpNode, VarDeclNode
+from sintatico import Parser, SyntaxError, analisar_fonte, compilar_arquivo, compilar_fonte
+
+PROGRAMA = "int main() {\n    int x = 1 + 2;\n    printf(x);\n    return x;\n}\n"
+
+@pytest.mark.parametrize("fonte", [
+    "int main() {\n    int x = ;\n    return 0;\n}\n",   # erro de sintaxe
+    "int main() {\n    y = 1;\n    return 0;\n}\n",       # erro semântico
+])
+def test_compilacao_com_erros_nao_cria_a_saida(tmp_path, fonte):
+    entrada, saida = tmp_path / "a.txt", tmp_path / "a.py"
+    entrada.write_text(fonte, encoding="utf-8")
+    with pytest.raises((SyntaxError, NameError)):
+        compilar_arquivo(str(entrada), str(saida), verbose=False)
+    assert list(tmp_path.iterdir()) == [entrada]
+
+def test_compilacao_com_erros_preserva_a_saida_anterior(tmp_path):
+    entrada, saida = tmp_path / "a.txt", tmp_path / "a.py"
+    entrada.write_text(PROGRAMA, encoding="utf-8")
+    compilar_arquivo(str(entrada), str(saida), verbose=False)
+    anterior = saida.read_text()
+    assert "def main():" in anterior
+
+    entrada.write_text("int main() {\n    return ;\n}\n", encoding="utf-8")
+    with pytest.raises(SyntaxError):
+        compilar_arquivo(str(entrada), str(saida), verbose=False)
+    assert saida.read_text() == anterior
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "a.txt"]
+
+@pytest.mark.parametrize("nivel", [0, 2])
+@pytest.mark.parametrize("termos", [1000, 20000])
+def test_expressao_profunda_com_limite_de_recursao_baixo(nivel, termos):
+    # Todos os percursos usam pilha explícita: o limite de recursão não importa
+    expressao = " + ".join("x" if i % 2 else str(i % 10) for i in range(termos))
+    linhas = ["int main() {", "    int x = 1;", f"    int y = {expressao};", "    return y;", "}"]
+    chunks = []
+    limite = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        compilar_fonte(linhas, chunks, nivel=nivel)
+        code = compile("".join(chunks), "output.py", "exec")
+    finally:
+        sys.setrecursionlimit(limite)
+    retorno, _ = executar_codigo(code)
+    assert retorno == sum(1 if i % 2 else i % 10 for i in range(termos))
+
+def _erros(fonte):
+    """Mensagens de todos os erros relatados ao compilar 'fonte'."""
+    with pytest.raises((SyntaxError, NameError)) as erro:
+        analisar_fonte(fonte.splitlines())
+    return [mensagem.strip() for mensagem in str(erro.value).splitlines()]
+
+def test_varios_erros_relatados_numa_compilacao():
+    fonte = ("int main() {\n    int x = 1 @ 2;\n    int y = x;\n    z = x;\n    printf(x;\n"
+             "    return y + w;\n}\nint f() {\n    x = 2;\n    main(;\n    return 0;\n}\n")
+    assert _erros(fonte) == [
+        "6 erros encontrados:",
+        "Syntax Error at line 2: Invalid token '@'",
+        "Semantic Error at line 4: Erro: Variável 'z' não foi declarada.",
+        "Syntax Error at line 5: Expected ')', got ';'",
+        "Semantic Error at line 6: Erro: Variável 'w' não foi declarada.",
+        "Semantic Error at line 9: Erro: Variável 'x' não foi declarada.",
+        "Syntax Error at line 10: Expected identifier or literal, got ';'",
+    ]
+
+def test_analise_retoma_depois_do_ponto_e_virgula_e_da_chave():
+    linhas = ["int main() {", "    int a = 1;", "    a = a +;  printf(a);", "    int b = ;", "    return a;", "}",
+              "int f() {", "    a = (1;", "}", "int g() {", "    return 2;", "}"]
+    parser = Parser(analisar_fluxo(linhas), recuperar=True)
+    programa = parser.parse_programa()
+    assert [str(e) for e in parser.erros] == ["Syntax Error at line 3: Expected identifier or literal, got ';'",
+                                              "Syntax Error at line 4: Expected identifier or literal, got ';'",
+                                              "Syntax Error at line 8: Expected ')', got ';'"]
+    main, f, g = programa.declarations
+    assert [type(c) for c in main.body] == [VarDeclNode, ErrorNode, FuncCallStmtNode, ErrorNode, ReturnNode]
+    assert main.body[3].var_name == "b"
+    assert [type(c) for c in f.body] == [ErrorNode]
+    assert isinstance(g, FuncDeclNode) and g.name == "g"
+
+def test_erros_de_sintaxe_nao_geram_erros_semanticos_em_cascata():
+    # 'b' é declarada num comando com erro e 'f' tem o cabeçalho inválido:
+    # seus usos não são acusados
+    fonte = ("int f( {\n    return 1;\n}\nint main() {\n    int b = 1 +;\n    b = b + 1;\n"
+             "    f();\n    printf(b);\n    return b;\n}\n")
+    assert _erros(fonte) == ["2 erros encontrados:",
+                             "Syntax Error at line 1: Expected ')', got '{'",
+                             "Syntax Error at line 5: Expected identifier or literal, got ';'"]
+
+def test_cabecalho_invalido_ainda_analisa_o_corpo():
+    assert _erros("int main( {\nx = 1;\nreturn y;\n}\n") == [
+        "3 erros encontrados:",
+        "Syntax Error at line 1: Expected ')', got '{'",
+        "Semantic Error at line 2: Erro: Variável 'x' não foi declarada.",
+        "Semantic Error at line 3: Erro: Variável 'y' não foi declarada.",
+    ]
+    # Sem o '{', o corpo começa depois do ';' que encerra o cabeçalho
+    assert _erros("int main()\n    int a = 1;\n    return q;\n}\n") == [
+        "2 erros encontrados:",
+        "Syntax Error at line 2: Expected '{', got 'int'",
+        "Semantic Error at line 3: Erro: Variável 'q' não foi declarada.",
+    ]
+
+@pytest.mark.parametrize("fonte, erros", [
+    ("", ["Syntax Error at line 1: Expected type (int, real, char), got 'EOF'"]),
+    ("\n\n", ["Syntax Error at line 1: Expected type (int, real, char), got 'EOF'"]),
+    ("int main() {\n    return 1 +\n", ["2 erros encontrados:",
+                                          "Syntax Error at line 2: Expected identifier or literal, got 'EOF'",
+                                          "Syntax Error at line 2: Unexpected end of input. Expected '}' (Simbolo)."]),
+])
+def test_fim_do_arquivo_na_linha_do_ultimo_token(fonte, erros):
+    assert _erros(fonte) == erros
+
+def _arvore(expressao):
+    """Forma da árvore de 'expressao' em notação prefixa: (op esquerda direita), (op operando)."""
+    programa = Parser(analisar_fluxo(["int main() {", f"    return {expressao};", "}"])).parse_programa()
+    pilha, resultado = [programa.declarations[0].body[0].expr_node], []
+    while pilha:
+        node = pilha.pop()
+        if isinstance(node, str):
+            resultado.append(node)
+        elif isinstance(node, BinaryOpNode):
+            pilha += [")", node.right, " ", node.left, f"({node.op} "]
+        elif isinstance(node, UnaryOpNode):
+            pilha += [")", node.operand, f"({node.op} "]
+        else:
+            resultado.append(node.value)
+    return "".join(resultado)
+
+@pytest.mark.parametrize("expressao, arvore", [
+    ("a - b - c", "(- (- a b) c)"),
+    ("a / b / c", "(/ (/ a b) c)"),
+    ("a - b * c", "(- a (* b c))"),
+    ("a * b - c", "(- (* a b) c)"),
+    ("-a * b", "(* (- a) b)"),
+    ("a * -b", "(* a (- b))"),
+    ("- -a - b", "(- (- (- a)) b)"),
+    ("-(a - b) / c", "(/ (- (- a b)) c)"),
+    ("a - (b - c)", "(- a (- b c))"),
+    ("a + b * c - d / e + f", "(+ (- (+ a (* b c)) (/ d e)) f)"),
+    ("a * b + c * d * e", "(+ (* a b) (* (* c d) e))"),
+    ("1 - 2.5 / x", "(- 1 (/ 2.5 x))"),
+])
+def test_precedencia_e_associatividade(expressao, arvore):
+    assert _arvore(expressao) == arvore
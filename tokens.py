@@ -1,4 +1,6 @@
 # tokens.py
+import sys
+from array import array
 from enum import Enum
 
 class TokenType(Enum):
@@ -14,6 +16,16 @@ class TokenType(Enum):
     ERRO = "Erro"
     EOF = "EOF"  # <-- ADICIONE ESTA LINHA
 
+# Operadores de expressão (de um caractere). O parser de expressões
+# (Pratt, em sintatico.py) e os geradores de código são guiados por estas
+# tabelas: a precedência de cada operador binário (todos associativos à
+# esquerda; maior liga mais forte) e a de cada operador prefixo.
+PRECEDENCIA_BINARIA = {'+': 10, '-': 10, '*': 20, '/': 20}
+PRECEDENCIA_PREFIXA = {'-': 30}
+
+# Símbolos reconhecidos pelo analisador léxico
+SIMBOLOS = "();{}=" + "".join(sorted(set(PRECEDENCIA_BINARIA) | set(PRECEDENCIA_PREFIXA)))
+
 class Token:
     def __init__(self, tipo, valor, linha):
         self.tipo = tipo
@@ -21,4 +33,67 @@ class Token:
         self.linha = linha
 
     def __str__(self):
-        return f"{self.tipo.value} -> \"{self.valor}\" (linha {self.linha})"
\ No newline at end of file
+        return f"{self.tipo.value} -> \"{self.valor}\" (linha {self.linha})"
+
+
+# Códigos compactos (um byte) para cada TokenType, na ordem de declaração
+TIPOS = list(TokenType)
+CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+class TokenBuffer:
+    """
+    Armazena uma sequência de tokens em colunas paralelas (struct-of-arrays):
+    o código do tipo, a linha e o índice do lexema numa tabela de strings.
+    Cada lexema distinto (identificadores, palavras reservadas, símbolos...)
+    é guardado uma única vez, e nenhum objeto Token é mantido por token.
+    """
+    def __init__(self, tokens=()):
+        self.tipos = array('B')
+        self.linhas = array('I')
+        self.valores = array('I')
+        self.strings = []
+        self._indices = {}
+        self.extend(tokens)
+
+    def _internar(self, valor):
+        indice = self._indices.get(valor)
+        if indice is None:
+            indice = len(self.strings)
+            self._indices[valor] = indice
+            self.strings.append(valor)
+        return indice
+
+    def append(self, tipo, valor, linha):
+        self.tipos.append(CODIGO_TIPO[tipo])
+        self.linhas.append(linha)
+        self.valores.append(self._internar(valor))
+
+    def extend(self, tokens):
+        for token in tokens:
+            self.append(token.tipo, token.valor, token.linha)
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def tipo(self, i):
+        return TIPOS[self.tipos[i]]
+
+    def valor(self, i):
+        return self.strings[self.valores[i]]
+
+    def linha(self, i):
+        return self.linhas[i]
+
+    def __getitem__(self, i):
+        """Materializa o i-ésimo token como um objeto Token."""
+        return Token(self.tipo(i), self.valor(i), self.linha(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        """Memória aproximada ocupada pelas colunas e pela tabela de strings."""
+        colunas = sum(c.itemsize * len(c) for c in (self.tipos, self.linhas, self.valores))
+        tabela = sys.getsizeof(self.strings) + sys.getsizeof(self._indices)
+        return colunas + tabela + sum(sys.getsizeof(s) for s in self.strings)
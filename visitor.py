@@ -0,0 +1,60 @@
+# visitor.py
+from nodes import OPERACOES
+
+def pos_ordem(raiz, folha, combinar, compostos=OPERACOES):
+    """
+    Percorre a expressão 'raiz' em pós-ordem com uma pilha explícita, sem
+    recursão, de modo que a profundidade da árvore não esbarra no limite de
+    recursão do Python. Os nós das classes em 'compostos' são expandidos nos
+    seus child_fields e reduzidos com combinar(nó, [resultados dos filhos]);
+    os demais são reduzidos com folha(nó). Retorna o resultado da raiz.
+    """
+    resultados = []
+    pilha = [raiz]
+    while pilha:
+        node = pilha.pop()
+        if node.__class__ is tuple:
+            # Marcador: os filhos de node[0] já estão em 'resultados'
+            node = node[0]
+            n = len(node.child_fields)
+            filhos = resultados[-n:]
+            del resultados[-n:]
+            resultados.append(combinar(node, filhos))
+        elif isinstance(node, compostos):
+            pilha.append((node,))
+            for field in reversed(node.child_fields):
+                pilha.append(getattr(node, field))
+        else:
+            resultados.append(folha(node))
+    return resultados[0]
+
+class NodeVisitor:
+    """
+    Base comum dos visitantes da AST (SemanticAnalyzer, Optimizer,
+    CodeGenerator). O método 'visit_<Classe>' de cada classe de nó é resolvido
+    uma única vez por classe de visitante e guardado numa tabela de despacho,
+    em vez de montar o nome e chamar getattr a cada visita. Listas de nós são
+    despachadas para 'visit_list'.
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    @classmethod
+    def _resolve(cls, node_class):
+        handler = getattr(cls, f'visit_{node_class.__name__}', cls.generic_visit)
+        cls._dispatch[node_class] = handler
+        return handler
+
+    def visit(self, node):
+        handler = self._dispatch.get(node.__class__)
+        if handler is None:
+            handler = self._resolve(node.__class__)
+        return handler(self, node)
+
+    def visit_postorder(self, raiz, combinar):
+        """pos_ordem com self.visit para as folhas."""
+        return pos_ordem(raiz, self.visit, combinar)
+
+    def generic_visit(self, node):
+        raise NotImplementedError(f"Visita não implementada para o nó: {type(node).__name__}")